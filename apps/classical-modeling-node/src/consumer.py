@@ -1,20 +1,31 @@
-import json
-import pika
 import threading
 import os
 import logging
 from data_utils.schemas import TaskDefinition
 from services.model_trainer import handle_queue_requests
-from producer import send_message
+from producer import send_message, send_progress
 from dotenv import load_dotenv, find_dotenv
 from services.s3_service import S3Service
 
 load_dotenv(find_dotenv())
+
+from data_utils.cancellation import CancellationToken, JobCancelled, cancellable, cancellations
+from data_utils.codec import MessageDecodeError, decode_message
+from data_utils.job_context import JobContext
+from data_utils.job_store import JobStore, job_fingerprint, object_version, try_fingerprint
+from data_utils.progress import ProgressReporter
+from data_utils.scheduler import object_size_estimator
+from data_utils.worker_pool import WorkerPoolConsumer, cores_per_worker
+
 s3_service = S3Service()
 
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("CLASSICAL_TRAINING_REQUEST_QUEUE", "CLASSICAL_TRAINING_REQUEST_QUEUE")
 
+# Peak memory per byte of the dataset: the frame, the train/test split and the fold copies of
+# cross-validation running on every core
+TRAINING_MEMORY_FACTOR = 8
+
 # Logger Config
 logging.basicConfig(
     level=logging.INFO,
@@ -23,40 +34,71 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+job_store = JobStore()
+
+STAGE = "classical_training"
 
-def process_message(ch, method, properties, body):
-    logger.info(f"Received message: {body.decode()}")
-    try:
-        message_data = json.loads(body.decode())
-        task_info = TaskDefinition.from_dict(message_data)
-        logger.info(f"Task Definition: {task_info}")
 
+def train(task_info: TaskDefinition, cancellation: CancellationToken) -> dict:
+    # every model family is published on the progress queue as soon as it is evaluated
+    progress = ProgressReporter(send_progress, task_info.dataset_id, STAGE)
+    # the job keeps its model and scratch files to itself, so concurrent jobs never collide
+    with JobContext(
+        task_info.dataset_id, STAGE, reporter=progress, cancellation=cancellation
+    ) as context:
         # Process the feature selection task
         result = handle_queue_requests(
             dataset_key=task_info.dataset_key,
             target_column=task_info.target_column,
             task_type=task_info.task_type,
+            context=context,
+            feature_columns=task_info.feature_columns,
         )
-        model_key = result["best_model_info"]["model_uuid"]
-
-        # upload the model to S3
-        with open(result["best_model_info"]["saved_model_path"], "rb") as model_file:
-            s3_service.upload_single_file(
-                file_obj=model_file,
-                key=f"{model_key}.pkl",
-                content_type="application/octet-stream",
-                filename=f"{model_key}.pkl",
-            )
 
-        # update the key
-        result["best_model_info"]["model_uuid"] = f"{model_key}.pkl"
+        # upload the pickled model to S3 straight from memory
+        keys = context.artifacts.upload(s3_service)
+
+    # update the key
+    result["best_model_info"]["model_uuid"] = keys["model"]
+    return result
+
+
+def process_message(ch, method, properties, body):
+    logger.info(f"Received message: {len(body)} bytes ({properties.content_type or 'untyped'})")
+    try:
+        message_data = decode_message(body, properties)
+        task_info = TaskDefinition.from_dict(message_data)
+        logger.info(f"Task Definition: {task_info}")
+
+        # a redelivered request on unchanged data republishes the stored result instead of
+        # running the hyperparameter search again
+        fingerprint = try_fingerprint(
+            lambda: job_fingerprint(
+                QUEUE_NAME,
+                {
+                    "dataset_id": task_info.dataset_id,
+                    "dataset_key": task_info.dataset_key,
+                    "task_type": task_info.task_type,
+                    "target_column": task_info.target_column,
+                    "feature_columns": task_info.feature_columns,
+                },
+                [object_version(s3_service, task_info.dataset_key)],
+            )
+        )
+        # a cancellation request for the dataset stops the search after the running trial
+        with cancellable(task_info.dataset_id, STAGE) as cancellation:
+            result = job_store.run(fingerprint, lambda: train(task_info, cancellation))
 
         # publish the result to the result queue
         send_message(message={"dataset_id": task_info.dataset_id, **result})
 
         ch.basic_ack(delivery_tag=method.delivery_tag)
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding JSON: {e}")
+    except JobCancelled as e:
+        # cancelled on request, nobody waits for the result any more
+        logger.info(f"Stopped job: {e}")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+    except MessageDecodeError as e:
+        logger.error(f"Error decoding message: {e}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
     except Exception as e:
         logger.error(f"Error processing message: {e}")
@@ -64,15 +106,18 @@ def process_message(ch, method, properties, body):
 
 
 def consume():
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(host=RABBITMQ_HOST, heartbeat=10000)
-    )
-    channel = connection.channel()
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=process_message)
-    logger.info(" [*] Waiting for messages. To exit press CTRL+C")
-    channel.start_consuming()
+    # listen for cancellations before the first job starts
+    cancellations.start()
+    # small datasets run ahead of large ones, shared fairly between datasets
+    WorkerPoolConsumer(
+        QUEUE_NAME,
+        process_message,
+        RABBITMQ_HOST,
+        # cross-validation runs its folds on the job's share of the cores
+        estimator=object_size_estimator(
+            s3_service, memory_factor=TRAINING_MEMORY_FACTOR, cpus=cores_per_worker()
+        ),
+    ).run()
 
 
 def start_consumer():
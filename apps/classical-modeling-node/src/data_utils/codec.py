@@ -0,0 +1,162 @@
+import gzip
+import json
+import logging
+import os
+from typing import Any, Optional
+
+import pika
+
+from data_utils.serializer import custom_serializer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library encoder is used without it
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, messages are sent as JSON without it
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is optional, gzip is used without it
+    zstandard = None
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPES = ("application/msgpack", "application/x-msgpack")
+GZIP_ENCODING = "gzip"
+ZSTD_ENCODING = "zstd"
+
+# Encoding of the messages this node sends, "json" or "msgpack". The backend services read
+# JSON only, so other codecs are for queues consumed by the nodes themselves.
+MESSAGE_CODEC = os.environ.get("MESSAGE_CODEC", "json")
+# "zstd", "gzip" or empty to send bodies uncompressed
+MESSAGE_COMPRESSION = os.environ.get("MESSAGE_COMPRESSION", "")
+# Bodies smaller than this (bytes) are not worth compressing
+MESSAGE_COMPRESSION_MIN_SIZE = int(os.environ.get("MESSAGE_COMPRESSION_MIN_SIZE", "65536"))
+MESSAGE_COMPRESSION_LEVEL = int(os.environ.get("MESSAGE_COMPRESSION_LEVEL", "3"))
+
+
+class MessageDecodeError(ValueError):
+    """Raised when a message body cannot be decoded with the codec its headers name."""
+
+
+def dumps_json(obj: Any) -> bytes:
+    """
+    Encodes an object as compact UTF-8 JSON, with orjson when it is installed.
+
+    NaN and infinities are written as null by orjson, which keeps the output valid JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=custom_serializer,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(obj, default=custom_serializer, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(data: bytes | str) -> Any:
+    """
+    Decodes JSON, with orjson when it is installed.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects the NaN literals older producers wrote, the standard parser does not
+            pass
+    return json.loads(data)
+
+
+def _compress(data: bytes, compression: str) -> tuple[bytes, Optional[str]]:
+    if not compression or len(data) < MESSAGE_COMPRESSION_MIN_SIZE:
+        return data, None
+    if compression == ZSTD_ENCODING and zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=MESSAGE_COMPRESSION_LEVEL)
+        return compressor.compress(data), ZSTD_ENCODING
+    return gzip.compress(data, compresslevel=min(MESSAGE_COMPRESSION_LEVEL, 9)), GZIP_ENCODING
+
+
+def _decompress(body: bytes, content_encoding: Optional[str]) -> bytes:
+    if not content_encoding or content_encoding == "identity":
+        return body
+    if content_encoding == ZSTD_ENCODING:
+        if zstandard is None:
+            raise MessageDecodeError("Message is zstd compressed but zstandard is not installed")
+        # unlike decompress(), the stream reader also takes frames that do not record their size
+        with zstandard.ZstdDecompressor().stream_reader(body) as reader:
+            return reader.read()
+    if content_encoding == GZIP_ENCODING:
+        return gzip.decompress(body)
+    raise MessageDecodeError(f"Unsupported content encoding: {content_encoding}")
+
+
+def encode_message(
+    message: Any,
+    codec: str = MESSAGE_CODEC,
+    compression: str = MESSAGE_COMPRESSION,
+) -> tuple[bytes, pika.BasicProperties]:
+    """
+    Encodes a message and returns its body with persistent properties naming the codec.
+
+    The content type and content encoding headers tell consumers how to decode the body, so
+    producers and consumers can switch codecs independently.
+
+    Args:
+        message (Any): The message to send.
+        codec (str): "json" or "msgpack"; JSON is used when msgpack is not installed.
+        compression (str): "zstd", "gzip" or empty; zstd falls back to gzip when missing.
+
+    Returns:
+        tuple[bytes, pika.BasicProperties]: The body and its message properties.
+    """
+    if codec == "msgpack" and msgpack is not None:
+        body = msgpack.packb(message, default=custom_serializer)
+        content_type = MSGPACK_CONTENT_TYPES[0]
+    else:
+        if codec != "json":
+            logger.warning(f"Codec {codec} is not available, sending JSON")
+        body = dumps_json(message)
+        content_type = JSON_CONTENT_TYPE
+
+    body, content_encoding = _compress(body, compression)
+    properties = pika.BasicProperties(
+        delivery_mode=2, content_type=content_type, content_encoding=content_encoding
+    )
+    return body, properties
+
+
+def decode_message(body: bytes, properties: Optional[pika.BasicProperties] = None) -> Any:
+    """
+    Decodes a message body according to its content type and content encoding headers.
+
+    Bodies without headers, as sent by the backend services and earlier producers, are JSON.
+
+    Raises:
+        MessageDecodeError: If the codec is unsupported or the body does not decode.
+    """
+    content_type = getattr(properties, "content_type", None) or JSON_CONTENT_TYPE
+    content_encoding = getattr(properties, "content_encoding", None)
+    try:
+        data = _decompress(body, content_encoding)
+        if content_type in MSGPACK_CONTENT_TYPES:
+            if msgpack is None:
+                raise MessageDecodeError("Message is msgpack encoded but msgpack is not installed")
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        if content_type == JSON_CONTENT_TYPE or content_type.startswith("text/"):
+            return loads_json(data)
+        raise MessageDecodeError(f"Unsupported content type: {content_type}")
+    except MessageDecodeError:
+        raise
+    except Exception as e:
+        raise MessageDecodeError(f"Could not decode {content_type} message: {e}") from e
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 
 @dataclass
@@ -7,6 +8,8 @@ class TaskDefinition:
     dataset_key: str
     target_column: str
     task_type: str
+    # features chosen by feature selection, only these and the target are loaded
+    feature_columns: Optional[list[str]] = None
 
     @classmethod
     def from_dict(cls, data: dict):
@@ -15,4 +18,5 @@ class TaskDefinition:
             dataset_key=data["dataset_key"],
             target_column=data["target_column"],
             task_type=data["task_type"],
+            feature_columns=data.get("feature_columns") or None,
         )
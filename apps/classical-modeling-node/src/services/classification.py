@@ -1,8 +1,5 @@
-import json
-import os
-import pickle
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import optuna
 import pandas as pd
@@ -15,12 +12,18 @@ from sklearn.neighbors import KNeighborsClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.svm import SVC
 
+from data_utils.job_context import JobContext
+from data_utils.worker_pool import cores_per_worker
+
 # Suppress Optuna's verbose logging for each trial
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
 
 def train_and_select_best_classifier(
-    df: pd.DataFrame, target_column: str, n_trials: int = 50
+    df: pd.DataFrame,
+    target_column: str,
+    n_trials: int = 50,
+    context: Optional[JobContext] = None,
 ) -> Dict[str, Any]:
     """
     Trains, robustly optimizes with Optuna, and selects the best multiclass
@@ -30,15 +33,15 @@ def train_and_select_best_classifier(
         df (pd.DataFrame): The cleaned and prepped input DataFrame.
         target_column (str): The name of the target variable column.
         n_trials (int): The number of optimization trials for Optuna to run.
+        context (JobContext, optional): The job the search runs in. Its artifacts receive
+            the pickled best model as the "model" artifact, which is not kept without it.
+            Each model family's results are published as a "model" partial result as soon
+            as the family is evaluated, and cancellation is checked after every Optuna
+            trial; a cancelled search stops with JobCancelled.
 
     Returns:
         Dict[str, Any]: A dictionary with detailed results.
     """
-    # --- 0. Setup ---
-    if not os.path.exists("files"):
-        os.makedirs("files")
-        print("Created directory: 'files/'")
-
     # --- 1. Obtain X and y ---
     print(f"Separating features and target ('{target_column}')...")
     if target_column not in df.columns:
@@ -128,7 +131,10 @@ def train_and_select_best_classifier(
                 raise ValueError(f"Model {model_name} not recognized.")
 
             model = model_class(**params)
-            score = cross_val_score(model, X, y, cv=5, scoring="f1_weighted", n_jobs=-1)
+            # folds run on this job's share of the cores, next to the pool's other jobs
+            score = cross_val_score(
+                model, X, y, cv=5, scoring="f1_weighted", n_jobs=cores_per_worker()
+            )
             return score.mean()
 
         return objective
@@ -136,12 +142,16 @@ def train_and_select_best_classifier(
     # --- 4. Loop, Optimize, and Evaluate ---
     all_models_stats = []
     best_estimators = {}
+    # a cancelled search stops once the running trial completes
+    callbacks = []
+    if context is not None:
+        callbacks.append(lambda study, trial: context.check_cancelled())
 
-    for model_name in MODELS_MAPPING.keys():
+    for index, model_name in enumerate(MODELS_MAPPING, start=1):
         print(f"\n--- Optimizing {model_name} with Optuna ---")
         objective_func = get_objective(model_name, X_train, y_train)
         study = optuna.create_study(direction="maximize")
-        study.optimize(objective_func, n_trials=n_trials)
+        study.optimize(objective_func, n_trials=n_trials, callbacks=callbacks)
 
         best_params = study.best_params
         print(f"Best CV Weighted F1-Score: {study.best_value:.4f}")
@@ -172,6 +182,9 @@ def train_and_select_best_classifier(
             },
         }
         all_models_stats.append(model_stats)
+        if context is not None:
+            # each family is final once evaluated, no need to wait for the slowest one
+            context.partial("model", model_stats, done=index, total=len(MODELS_MAPPING))
 
     # --- 5. Select and Save Best Model ---
     print("\n--- Selecting best model based on Test Weighted F1-Score ---")
@@ -185,29 +198,25 @@ def train_and_select_best_classifier(
     print(f"Best Test Accuracy: {best_model_stats['test_set_performance']['accuracy']:.4f}")
     print(f"Best Test F1-Score: {best_model_stats['test_set_performance']['weighted_f1_score']:.4f}")
 
-    model_uuid = str(uuid.uuid4())
-    model_path = os.path.join("files", f"{model_uuid}.pkl")
-    with open(model_path, "wb") as f:
-        pickle.dump(best_model_object, f)
-    print(f"Best model saved to: {model_path}")
+    # the model is stored under the job's namespace, standalone runs get their own id
+    model_uuid = context.namespace if context is not None else str(uuid.uuid4())
+    if context is not None:
+        # pickle the model in memory, the caller streams it to storage
+        model = context.artifacts.create("model", context.key(".pkl"), "application/octet-stream")
+        model.write_pickle(best_model_object)
+        print(f"Best model serialized: {model.size} bytes")
 
     # --- 6. Save Final Report ---
     final_report = {
         "best_model_info": {
             "model_name": best_model_name,
             "model_uuid": model_uuid,
-            "saved_model_path": model_path,
             "test_set_performance": best_model_stats["test_set_performance"],
             "best_hyperparameters": best_model_stats["best_hyperparameters"],
         },
         "all_models_performance": all_models_stats,
     }
 
-    stats_path = os.path.join("files", "stats.json")
-    with open(stats_path, "w") as f:
-        json.dump(final_report, f, indent=4)
-    print(f"Full performance report saved to: {stats_path}")
-
     return final_report
 
 
@@ -1,8 +1,5 @@
-import json
-import os
-import pickle
 import uuid
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 import numpy as np
 import optuna
@@ -15,12 +12,18 @@ from sklearn.model_selection import cross_val_score, train_test_split
 from sklearn.neighbors import KNeighborsRegressor
 from sklearn.svm import SVR
 
+from data_utils.job_context import JobContext
+from data_utils.worker_pool import cores_per_worker
+
 # Suppress Optuna's verbose logging for each trial
 optuna.logging.set_verbosity(optuna.logging.WARNING)
 
 
 def train_and_select_best_model(
-    df: pd.DataFrame, target_column: str, n_trials: int = 50
+    df: pd.DataFrame,
+    target_column: str,
+    n_trials: int = 50,
+    context: Optional[JobContext] = None,
 ) -> Dict[str, Any]:
     """
     Trains, optimizes with Optuna, and selects the best regression model.
@@ -34,24 +37,25 @@ def train_and_select_best_model(
     5.  Retrains the model with the best hyperparameters on the full training set.
     6.  Evaluates the final model on the held-out test set.
     7.  Selects the best overall model based on the test set R-squared score.
-    8.  Saves the best model object to a .pkl file with a unique ID.
-    9.  Saves a detailed JSON report of all model results.
+    8.  Pickles the best model object into an artifact with a unique ID.
+    9.  Returns a detailed report of all model results.
 
     Args:
         df (pd.DataFrame): The cleaned and prepped input DataFrame.
         target_column (str): The name of the target variable column.
         n_trials (int): The number of optimization trials for Optuna to run
                         for each model.
+        context (JobContext, optional): The job the search runs in. Its artifacts
+                        receive the pickled best model as the "model" artifact,
+                        which is not kept without it. Each model family's results
+                        are published as a "model" partial result as soon as the
+                        family is evaluated, and cancellation is checked after
+                        every Optuna trial; a cancelled search stops with JobCancelled.
 
     Returns:
         Dict[str, Any]: A dictionary containing the performance statistics of
                         all models and information about the best one.
     """
-    # --- 0. Setup ---
-    if not os.path.exists("files"):
-        os.makedirs("files")
-        print("Created directory: 'files/'")
-
     # --- 1. Obtain X and y ---
     print(f"Separating features and target ('{target_column}')...")
     if target_column not in df.columns:
@@ -133,7 +137,10 @@ def train_and_select_best_model(
                 raise ValueError(f"Model {model_name} not recognized.")
 
             model = model_class(**params)
-            score = cross_val_score(model, X, y, cv=5, scoring="r2", n_jobs=-1)
+            # folds run on this job's share of the cores, next to the pool's other jobs
+            score = cross_val_score(
+                model, X, y, cv=5, scoring="r2", n_jobs=cores_per_worker()
+            )
             return score.mean()
 
         return objective
@@ -141,13 +148,17 @@ def train_and_select_best_model(
     # --- 4. Loop Through Models, Optimize, and Evaluate ---
     all_models_stats = []
     best_estimators = {}
+    # a cancelled search stops once the running trial completes
+    callbacks = []
+    if context is not None:
+        callbacks.append(lambda study, trial: context.check_cancelled())
 
-    for model_name in MODELS_MAPPING.keys():
+    for index, model_name in enumerate(MODELS_MAPPING, start=1):
         print(f"\n--- Optimizing {model_name} with Optuna ---")
 
         objective_func = get_objective(model_name, X_train, y_train)
         study = optuna.create_study(direction="maximize")
-        study.optimize(objective_func, n_trials=n_trials)
+        study.optimize(objective_func, n_trials=n_trials, callbacks=callbacks)
 
         best_params = study.best_params
         print(f"Best CV R²: {study.best_value:.4f}")
@@ -176,6 +187,9 @@ def train_and_select_best_model(
             },
         }
         all_models_stats.append(model_stats)
+        if context is not None:
+            # each family is final once evaluated, no need to wait for the slowest one
+            context.partial("model", model_stats, done=index, total=len(MODELS_MAPPING))
 
     # --- 5. Select the best model ---
     print("\n--- Selecting best model based on Test R² score ---")
@@ -187,28 +201,24 @@ def train_and_select_best_model(
     print(f"Best Test R² score: {best_model_stats['test_set_performance']['r_squared']:.4f}")
 
     # --- 6. Save Best Model and Final Report ---
-    model_uuid = str(uuid.uuid4())
-    model_path = os.path.join("files", f"{model_uuid}.pkl")
-    with open(model_path, "wb") as f:
-        pickle.dump(best_model_object, f)
-    print(f"Best model saved to: {model_path}")
+    # the model is stored under the job's namespace, standalone runs get their own id
+    model_uuid = context.namespace if context is not None else str(uuid.uuid4())
+    if context is not None:
+        # pickle the model in memory, the caller streams it to storage
+        model = context.artifacts.create("model", context.key(".pkl"), "application/octet-stream")
+        model.write_pickle(best_model_object)
+        print(f"Best model serialized: {model.size} bytes")
 
     final_report = {
         "best_model_info": {
             "model_name": best_model_name,
             "model_uuid": model_uuid,
-            "saved_model_path": model_path,
             "test_set_performance": best_model_stats["test_set_performance"],
             "best_hyperparameters": best_model_stats["best_hyperparameters"],
         },
         "all_models_performance": all_models_stats,
     }
 
-    stats_path = os.path.join("files", "stats.json")
-    with open(stats_path, "w") as f:
-        json.dump(final_report, f, indent=4)
-    print(f"Full performance report saved to: {stats_path}")
-
     return final_report
 
 
@@ -223,7 +233,10 @@ if __name__ == "__main__":
 
     # Run the main function
     print("\nStarting the model training and selection process...")
-    final_stats = train_and_select_best_model(df=sample_df, target_column="quality")
+    context = JobContext("example", "classical_training")
+    final_stats = train_and_select_best_model(
+        df=sample_df, target_column="quality", context=context
+    )
 
     # You can now work with the returned dictionary
     print("\n--- Function execution finished ---")
@@ -233,12 +246,9 @@ if __name__ == "__main__":
     )
 
     # Example of how to load the model back
-    saved_model_path = final_stats["best_model_info"]["saved_model_path"]
-    try:
-        with open(saved_model_path, "rb") as f:
-            loaded_model = pickle.load(f)
-        print(f"\nSuccessfully loaded model from {saved_model_path}")
-        print("Loaded model object:", loaded_model)
-    except FileNotFoundError as e:
-        print(f"Could not find the model file at {saved_model_path}")
-        raise e
+    import pickle
+
+    loaded_model = pickle.load(context.artifacts["model"].open())
+    print(f"\nSuccessfully loaded model {context.artifacts['model'].key}")
+    print("Loaded model object:", loaded_model)
+    context.close()
@@ -1,16 +1,23 @@
-import json
 import logging
-import pika
 import threading
 import os
 from src.data_utils import Dataset
+from src.data_utils.cancellation import JobCancelled, cancellations
+from src.data_utils.codec import MessageDecodeError, decode_message
+from src.data_utils.scheduler import JobEstimate, share_of
+from src.data_utils.worker_pool import WorkerPoolConsumer
 
 from src.profiler import perform_profiling
+from src.services.profiling_service import CHUNKED_PROFILING_MIN_BYTES
 
 # RabbitMQ Configuration
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("DATA_PROFILING_REQUEST_QUEUE", "DATA_PROFILING_REQUEST_QUEUE")
 
+# Peak memory per byte of a dataset profiled in memory: the parsed frame, its columnar copy
+# and the intermediate frames of ydata
+PROFILING_MEMORY_FACTOR = 10
+
 
 # Logger Config
 logging.basicConfig(
@@ -23,11 +30,11 @@ logger.setLevel(logging.DEBUG)
 
 def process_message(ch, method, properties, body) -> None:
     """Callback function to process received messages"""
-    logger.info(f"Received message: {body.decode()}")
+    logger.info(f"Received message: {len(body)} bytes ({properties.content_type or 'untyped'})")
 
     try:
         # Decode message
-        message_data = json.loads(body.decode())
+        message_data = decode_message(body, properties)
         dataset = Dataset.from_dict(message_data)
         logger.info(f"Received dataset: {dataset.name}")
 
@@ -36,27 +43,36 @@ def process_message(ch, method, properties, body) -> None:
 
         ch.basic_ack(delivery_tag=method.delivery_tag)  # Acknowledge the message
 
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding JSON: {e}")
+    except JobCancelled as e:
+        # cancelled on request, nobody waits for the result any more
+        logger.info(f"Stopped job: {e}")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+    except MessageDecodeError as e:
+        logger.error(f"Error decoding message: {e}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)  # Reject the message
     except Exception as e:
         logger.error(f"Error processing message: {e}")
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)  # Reject the message
 
 
-def consume():
-    """Function to start consuming messages"""
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672, heartbeat=10000)
-    )
-    channel = connection.channel()
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
+def estimate_profiling(message: dict) -> JobEstimate:
+    """Estimates a profiling request by the size of its dataset, shared fairly per project"""
+    cost = message.get("size") or (message.get("rows") or 0) * (message.get("cols") or 1)
+    # 8 bytes per cell is a lower bound for the parsed frame when the file is compressed;
+    # chunked profiling holds a bounded part of a dataset above the threshold
+    cells = (message.get("rows") or 0) * (message.get("cols") or 0)
+    loaded = max(message.get("size") or 0, cells * 8)
+    memory = min(loaded, CHUNKED_PROFILING_MIN_BYTES) * PROFILING_MEMORY_FACTOR
+    return JobEstimate(cost=cost, share=share_of(message), memory=memory, cpus=1)
 
-    channel.basic_qos(prefetch_count=1)  # Limit prefetch for fair distribution
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=process_message)
 
-    logger.info(" [*] Waiting for messages. To exit, press CTRL+C")
-    channel.start_consuming()
+def consume():
+    """Function to start consuming messages"""
+    # listen for cancellations before the first job starts
+    cancellations.start()
+    WorkerPoolConsumer(
+        QUEUE_NAME, process_message, RABBITMQ_HOST, estimator=estimate_profiling
+    ).run()
 
 
 def start_consumer():
@@ -1,4 +1,11 @@
 from .serializer import serialize, custom_serializer
 from .schemas import YDataProfilingSchema, Dataset
+from .loader import load_dataframe_from_url
 
-__all__ = ["serialize", "custom_serializer", "YDataProfilingSchema", "Dataset"]
+__all__ = [
+    "serialize",
+    "custom_serializer",
+    "YDataProfilingSchema",
+    "Dataset",
+    "load_dataframe_from_url",
+]
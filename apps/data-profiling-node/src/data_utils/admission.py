@@ -0,0 +1,157 @@
+import logging
+import os
+from typing import Optional
+
+from src.data_utils.scheduler import JobEstimate
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+# Memory (bytes) the node must stay below; defaults to a fraction of its memory limit
+ADMISSION_MEMORY_CEILING = int(os.environ.get("ADMISSION_MEMORY_CEILING", "0"))
+ADMISSION_MEMORY_FRACTION = float(os.environ.get("ADMISSION_MEMORY_FRACTION", "0.85"))
+# Load average per core tolerated before jobs wait for CPU
+ADMISSION_CPU_OVERCOMMIT = float(os.environ.get("ADMISSION_CPU_OVERCOMMIT", "1.5"))
+# Seconds a deferred message is held before it is requeued for this or another replica
+ADMISSION_RETRY_DELAY = float(os.environ.get("ADMISSION_RETRY_DELAY", "30"))
+# Jobs that never fit the node go to "<request queue><suffix>", consumed by larger replicas;
+# empty runs them alone on this node instead
+ADMISSION_LARGE_JOB_SUFFIX = os.environ.get("ADMISSION_LARGE_JOB_SUFFIX", "")
+
+ADMIT = "admit"
+DEFER = "defer"
+ROUTE = "route"
+
+# cgroup v2, then v1, limits and usage of the container
+_CGROUP_MEMORY_FILES = (
+    ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+    (
+        "/sys/fs/cgroup/memory/memory.limit_in_bytes",
+        "/sys/fs/cgroup/memory/memory.usage_in_bytes",
+    ),
+)
+# cgroup v1 reports an unlimited container as a huge page-aligned number
+_UNLIMITED = 1 << 60
+
+
+def _read_int(path: str) -> Optional[int]:
+    try:
+        with open(path) as f:
+            value = f.read().strip()
+    except OSError:
+        return None
+    return int(value) if value.isdigit() else None
+
+
+def _meminfo() -> dict[str, int]:
+    info = {}
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                info[name] = int(value.split()[0]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return info
+
+
+def memory_limit() -> int:
+    """
+    Returns the memory available to the node: its cgroup limit, or the host memory.
+    """
+    host = _meminfo().get("MemTotal", 0)
+    for limit_file, _ in _CGROUP_MEMORY_FILES:
+        limit = _read_int(limit_file)
+        if limit is not None and limit < _UNLIMITED:
+            return min(limit, host) if host else limit
+    return host
+
+
+def memory_used() -> int:
+    """
+    Returns the memory the node uses now: its cgroup usage, or the host memory in use.
+    """
+    for limit_file, usage_file in _CGROUP_MEMORY_FILES:
+        limit, usage = _read_int(limit_file), _read_int(usage_file)
+        if usage is not None and limit is not None and limit < _UNLIMITED:
+            return usage
+    info = _meminfo()
+    return info.get("MemTotal", 0) - info.get("MemAvailable", 0)
+
+
+class AdmissionController:
+    """
+    Decides whether the node can start a job now, given its estimated peak memory and cores.
+
+    A job is admitted if its memory fits below the ceiling next to the jobs already running.
+    Running jobs count with the larger of what the node uses now and what they were estimated
+    to need, since a job that just started has not reached its peak yet. A job that fits the
+    node but not now is deferred, and so is one that would overload the CPU while other jobs
+    run. A job larger than the whole node is routed to the large-job queue or, without one,
+    only started once the node is idle.
+
+    Not thread-safe; the consumer guards it with its own lock.
+
+    Args:
+        ceiling (int): Memory in bytes to stay below; 0 derives it from the memory limit.
+        cpu_overcommit (float): Load average per core tolerated.
+        large_job_queue (str, optional): Queue for jobs that never fit the node.
+    """
+
+    def __init__(
+        self,
+        ceiling: int = ADMISSION_MEMORY_CEILING,
+        cpu_overcommit: float = ADMISSION_CPU_OVERCOMMIT,
+        large_job_queue: Optional[str] = None,
+    ):
+        self.ceiling = ceiling or int(memory_limit() * ADMISSION_MEMORY_FRACTION)
+        self.cores = os.cpu_count() or 1
+        self.cpu_overcommit = cpu_overcommit
+        self.large_job_queue = large_job_queue
+        self._baseline = memory_used()
+        self._committed_memory = 0.0
+        self._committed_cpus = 0.0
+        self._running = 0
+
+    def decide(self, estimate: JobEstimate) -> str:
+        """
+        Returns ADMIT, DEFER or ROUTE for a job.
+        """
+        if not ADMISSION_ENABLED or not self.ceiling:
+            return ADMIT
+
+        used = memory_used()
+        if self._running == 0:
+            # what the idle node holds: interpreter, imports and caches
+            self._baseline = used
+
+        if estimate.memory > self.ceiling - self._baseline:
+            if self.large_job_queue:
+                return ROUTE
+            return ADMIT if self._running == 0 else DEFER
+
+        headroom = self.ceiling - max(used, self._baseline + self._committed_memory)
+        if estimate.memory > headroom:
+            return DEFER
+
+        if self._running and estimate.cpus:
+            load = max(os.getloadavg()[0], self._committed_cpus)
+            if load + estimate.cpus > self.cores * self.cpu_overcommit:
+                return DEFER
+        return ADMIT
+
+    def admit(self, estimate: JobEstimate) -> None:
+        self._running += 1
+        self._committed_memory += estimate.memory
+        self._committed_cpus += estimate.cpus
+
+    def release(self, estimate: JobEstimate) -> None:
+        self._running -= 1
+        self._committed_memory = max(0.0, self._committed_memory - estimate.memory)
+        self._committed_cpus = max(0.0, self._committed_cpus - estimate.cpus)
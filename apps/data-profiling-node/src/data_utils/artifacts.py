@@ -0,0 +1,150 @@
+import io
+import json
+import logging
+import os
+import pickle
+import tempfile
+from typing import IO, Any, Optional
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Artifacts are kept in memory up to this size, larger ones spill to a temporary file
+ARTIFACT_SPOOL_MAX_SIZE = int(os.environ.get("ARTIFACT_SPOOL_MAX_SIZE", str(64 * 1024 * 1024)))
+
+
+class Artifact:
+    """
+    A job output serialized into a spooled buffer and streamed to storage from there.
+
+    Attributes:
+        key (str): Object key the artifact is stored under.
+        content_type (str): MIME type of the artifact.
+        buffer (IO[bytes]): The serialized bytes, in memory until they outgrow the spool size.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        content_type: str,
+        max_size: int = ARTIFACT_SPOOL_MAX_SIZE,
+        directory: Optional[str] = None,
+    ):
+        self.key = key
+        self.content_type = content_type
+        self.buffer: IO[bytes] = tempfile.SpooledTemporaryFile(
+            max_size=max_size, mode="w+b", dir=directory
+        )
+
+    def write(self, data: bytes) -> "Artifact":
+        self.buffer.write(data)
+        return self
+
+    def write_text(self, text: str, encoding: str = "utf-8") -> "Artifact":
+        return self.write(text.encode(encoding))
+
+    def write_json(self, obj: Any, **kwargs) -> "Artifact":
+        return self.write_text(json.dumps(obj, **kwargs))
+
+    def write_pickle(self, obj: Any) -> "Artifact":
+        pickle.dump(obj, self.buffer)
+        return self
+
+    @property
+    def size(self) -> int:
+        position = self.buffer.tell()
+        size = self.buffer.seek(0, io.SEEK_END)
+        self.buffer.seek(position)
+        return size
+
+    def open(self) -> IO[bytes]:
+        """
+        Returns the buffer rewound to the start, ready to be read or uploaded.
+        """
+        self.buffer.seek(0)
+        return self.buffer
+
+    def close(self) -> None:
+        self.buffer.close()
+
+
+class ArtifactWriter:
+    """
+    Collects the artifacts of one job by name and uploads them to storage together.
+
+    Example:
+        with ArtifactWriter() as artifacts:
+            artifacts.create("summary", key, "text/html").write_text(page)
+            keys = artifacts.upload(s3_service)
+
+    Args:
+        max_size (int): Bytes an artifact is kept in memory before it spills to a file.
+        directory (str, optional): Where spilled artifacts are written, e.g. the scratch
+            directory of the job; the system temporary directory by default.
+    """
+
+    def __init__(
+        self, max_size: int = ARTIFACT_SPOOL_MAX_SIZE, directory: Optional[str] = None
+    ):
+        self.max_size = max_size
+        self.directory = directory
+        self.artifacts: dict[str, Artifact] = {}
+
+    def create(self, name: str, key: str, content_type: str) -> Artifact:
+        """
+        Adds an empty artifact to the job.
+
+        Args:
+            name (str): Name the artifact is looked up and reported by.
+            key (str): Object key to store it under.
+            content_type (str): MIME type of the artifact.
+
+        Returns:
+            Artifact: The artifact to serialize into.
+        """
+        artifact = Artifact(key, content_type, self.max_size, self.directory)
+        self.artifacts[name] = artifact
+        return artifact
+
+    def __getitem__(self, name: str) -> Artifact:
+        return self.artifacts[name]
+
+    def upload(self, storage, *, is_public: bool = True) -> dict[str, str]:
+        """
+        Streams every artifact to storage concurrently.
+
+        Args:
+            storage (S3Service): The storage service of the node.
+            is_public (bool): Whether the objects are publicly readable.
+
+        Returns:
+            dict[str, str]: The object key of every artifact by name.
+        """
+        names = list(self.artifacts)
+        results = storage.upload_many(
+            [
+                (artifact.open(), artifact.key, artifact.content_type)
+                for artifact in self.artifacts.values()
+            ],
+            is_public=is_public,
+        )
+        logger.info(
+            f"Uploaded {len(names)} artifacts, "
+            f"{sum(artifact.size for artifact in self.artifacts.values())} bytes"
+        )
+        return {name: result["key"] for name, result in zip(names, results)}
+
+    def close(self) -> None:
+        for artifact in self.artifacts.values():
+            artifact.close()
+
+    def __enter__(self) -> "ArtifactWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
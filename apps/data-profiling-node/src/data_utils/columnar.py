@@ -0,0 +1,96 @@
+import io
+import logging
+from typing import IO, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Datasets handed from one stage to the next are stored as Parquet
+PARQUET_EXTENSION = ".parquet"
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+
+def _column_to_arrow(series: pd.Series) -> pa.Array:
+    """
+    Converts a column to Arrow, falling back to strings for object columns holding mixed types.
+    """
+    try:
+        return pa.array(series, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        logger.warning(f"Column {series.name} has mixed types, storing it as strings")
+        return pa.array(series.map(lambda x: x if pd.isna(x) else str(x)), from_pandas=True)
+
+
+def _without_categories(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Replaces category columns by their plain values. Categories are an in-memory
+    representation of the stage that made them; Parquet dictionary-encodes the values anyway.
+    """
+    positions = [
+        position
+        for position, dtype in enumerate(dataframe.dtypes)
+        if isinstance(dtype, pd.CategoricalDtype)
+    ]
+    if not positions:
+        return dataframe
+    dataframe = dataframe.copy(deep=False)
+    for position in positions:
+        dataframe.isetitem(position, dataframe.iloc[:, position].to_numpy())
+    return dataframe
+
+
+def dataframe_to_table(dataframe: pd.DataFrame) -> pa.Table:
+    """
+    Converts a DataFrame to an Arrow table, keeping its column order and dropping the index.
+    Category columns are stored as their plain values.
+
+    Args:
+        dataframe (pd.DataFrame): The dataset to convert.
+
+    Returns:
+        pa.Table: The columnar representation of the dataset.
+    """
+    dataframe = _without_categories(dataframe)
+    try:
+        return pa.Table.from_pandas(dataframe, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.Table.from_arrays(
+            [_column_to_arrow(dataframe[col]) for col in dataframe.columns],  # pyright: ignore
+            names=[str(col) for col in dataframe.columns],
+        )
+
+
+def write_parquet(dataframe: pd.DataFrame, destination: Union[str, IO[bytes]]) -> None:
+    """
+    Writes a DataFrame as Parquet to a path or a binary file-like object.
+
+    Args:
+        dataframe (pd.DataFrame): The dataset to write.
+        destination (str | IO[bytes]): Target path or writable binary buffer.
+    """
+    pq.write_table(dataframe_to_table(dataframe), destination, compression="zstd")
+
+
+def to_parquet_buffer(dataframe: pd.DataFrame) -> io.BytesIO:
+    """
+    Serializes a DataFrame to an in-memory Parquet buffer positioned at the start.
+
+    Args:
+        dataframe (pd.DataFrame): The dataset to serialize.
+
+    Returns:
+        io.BytesIO: The Parquet bytes, ready to be uploaded.
+    """
+    buffer = io.BytesIO()
+    write_parquet(dataframe, buffer)
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import closing
+from functools import cache
+from typing import Any, Callable, Iterable, Optional
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src.data_utils.codec import dumps_json, loads_json
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+JOB_STORE_ENABLED = os.environ.get("JOB_STORE_ENABLED", "true").lower() == "true"
+# Point this at a volume to keep results across container restarts
+JOB_STORE_PATH = os.environ.get(
+    "JOB_STORE_PATH", os.path.join(tempfile.gettempdir(), "job_store.sqlite")
+)
+# Seconds a completed result is republished instead of recomputed
+JOB_STORE_TTL = float(os.environ.get("JOB_STORE_TTL", str(7 * 24 * 3600)))
+# Seconds between the liveness updates of a running job; a claim without updates for four
+# intervals is considered abandoned and taken over
+JOB_STORE_HEARTBEAT = float(os.environ.get("JOB_STORE_HEARTBEAT", "30"))
+# Seconds between checks while waiting for the same job running elsewhere
+JOB_STORE_POLL_INTERVAL = float(os.environ.get("JOB_STORE_POLL_INTERVAL", "2"))
+# Version of the code producing results; defaults to a digest of the node's sources
+JOB_CODE_VERSION = os.environ.get("JOB_CODE_VERSION", "")
+
+DONE = "done"
+RUNNING = "running"
+
+
+@cache
+def code_version() -> str:
+    """
+    Returns JOB_CODE_VERSION, or a digest of the node's Python sources when it is not set.
+    """
+    if JOB_CODE_VERSION:
+        return JOB_CODE_VERSION
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    digest = hashlib.sha256()
+    for directory, subdirectories, files in os.walk(root):
+        subdirectories[:] = sorted(d for d in subdirectories if d != "__pycache__")
+        for name in sorted(files):
+            if name.endswith(".py"):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode("utf-8"))
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def object_version(storage, key: str) -> str:
+    """
+    Identifies the content of a stored object by its ETag and size, without downloading it.
+    """
+    head = storage.s3.head_object(Bucket=storage.bucket_name, Key=key)
+    etag = head["ETag"].strip('"')
+    return f"{etag}:{head['ContentLength']}"
+
+
+def content_digest(*values: Optional[str]) -> str:
+    """
+    Returns the SHA-256 digest of inline job inputs such as a profiling report.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update((value or "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def job_fingerprint(job: str, params: dict, content: Iterable[str] = ()) -> str:
+    """
+    Identifies a job by what determines its result.
+
+    Args:
+        job (str): Name of the job, e.g. the node's request queue.
+        params (dict): Task parameters such as dataset_id, target_column and task_type.
+        content (Iterable[str]): Versions or digests of the inputs, see object_version and
+            content_digest.
+
+    Returns:
+        str: A hex digest that is equal for jobs that produce the same result.
+    """
+    document = {
+        "job": job,
+        "params": params,
+        "content": list(content),
+        "code_version": code_version(),
+    }
+    return hashlib.sha256(json.dumps(document, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class JobStore:
+    """
+    Persists job results by fingerprint so repeated and redelivered jobs are not recomputed.
+
+    A job is claimed in a SQLite table before it runs, which every worker thread and process
+    of the node shares. A second job with the same fingerprint waits for the first one and
+    returns its result; once done, the result is returned directly until it expires. Failed
+    jobs leave nothing behind, so the next delivery runs them again.
+
+    Args:
+        path (str): Path of the SQLite database.
+        ttl (float): Seconds a completed result stays valid.
+    """
+
+    def __init__(self, path: str = JOB_STORE_PATH, ttl: float = JOB_STORE_TTL):
+        self.path = path
+        self.ttl = ttl
+        with closing(self._connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "fingerprint TEXT PRIMARY KEY, status TEXT NOT NULL, result TEXT, "
+                "owner TEXT, updated_at REAL NOT NULL)"
+            )
+            connection.execute(
+                "DELETE FROM jobs WHERE status = ? AND updated_at < ?",
+                (DONE, time.time() - ttl),
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # one short-lived connection per operation, safe across threads and processes
+        return sqlite3.connect(self.path, timeout=60, isolation_level=None)
+
+    def run(self, fingerprint: Optional[str], job: Callable[[], Any]) -> Any:
+        """
+        Returns the result of a job, computing it only if no equal job has done so.
+
+        Args:
+            fingerprint (str, optional): See job_fingerprint; without one the job just runs.
+            job (Callable[[], Any]): Computes the result, which must be JSON serializable.
+
+        Returns:
+            Any: The stored or freshly computed result.
+        """
+        if not JOB_STORE_ENABLED or fingerprint is None:
+            return job()
+
+        waiting = False
+        while True:
+            try:
+                status, result = self._claim(fingerprint)
+            except sqlite3.Error as e:
+                logger.warning(f"Job store unavailable, running job {fingerprint[:12]}: {e}")
+                return job()
+            if status == DONE:
+                logger.info(f"Job {fingerprint[:12]} already done, reusing its result")
+                return result
+            if status == RUNNING:
+                if not waiting:
+                    logger.info(f"Job {fingerprint[:12]} is running elsewhere, waiting for it")
+                    waiting = True
+                time.sleep(JOB_STORE_POLL_INTERVAL)
+                continue
+            return self._execute(fingerprint, job)
+
+    def _claim(self, fingerprint: str) -> tuple[Optional[str], Any]:
+        """
+        Returns (DONE, result) or (RUNNING, None) for a known job, otherwise claims it.
+        """
+        now = time.time()
+        with closing(self._connect()) as connection:
+            # the write lock makes the lookup and the claim one atomic step across processes
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT status, result, updated_at FROM jobs WHERE fingerprint = ?",
+                (fingerprint,),
+            ).fetchone()
+            if row is not None:
+                status, result, updated_at = row
+                if status == DONE and updated_at >= now - self.ttl:
+                    connection.execute("COMMIT")
+                    return DONE, loads_json(result)
+                if status == RUNNING and updated_at >= now - 4 * JOB_STORE_HEARTBEAT:
+                    connection.execute("COMMIT")
+                    return RUNNING, None
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs (fingerprint, status, result, owner, updated_at) "
+                "VALUES (?, ?, NULL, ?, ?)",
+                (fingerprint, RUNNING, f"{socket.gethostname()}:{os.getpid()}", now),
+            )
+            connection.execute("COMMIT")
+        return None, None
+
+    def _execute(self, fingerprint: str, job: Callable[[], Any]) -> Any:
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat, args=(fingerprint, stop), name="job-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            result = job()
+        except BaseException:
+            stop.set()
+            self._release(fingerprint)
+            raise
+        stop.set()
+        self._complete(fingerprint, result)
+        return result
+
+    def _heartbeat(self, fingerprint: str, stop: threading.Event) -> None:
+        while not stop.wait(JOB_STORE_HEARTBEAT):
+            try:
+                with closing(self._connect()) as connection:
+                    connection.execute(
+                        "UPDATE jobs SET updated_at = ? WHERE fingerprint = ? AND status = ?",
+                        (time.time(), fingerprint, RUNNING),
+                    )
+            except sqlite3.Error as e:
+                logger.warning(f"Could not refresh the claim of job {fingerprint[:12]}: {e}")
+
+    def _complete(self, fingerprint: str, result: Any) -> None:
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, result = ?, updated_at = ? WHERE fingerprint = ?",
+                    (DONE, dumps_json(result).decode("utf-8"), time.time(), fingerprint),
+                )
+        except (sqlite3.Error, TypeError) as e:
+            # the result was computed, failing to remember it must not fail the job
+            logger.warning(f"Could not store the result of job {fingerprint[:12]}: {e}")
+            self._release(fingerprint)
+
+    def _release(self, fingerprint: str) -> None:
+        try:
+            with closing(self._connect()) as connection:
+                connection.execute(
+                    "DELETE FROM jobs WHERE fingerprint = ? AND status = ?",
+                    (fingerprint, RUNNING),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not release the claim of job {fingerprint[:12]}: {e}")
+
+
+def try_fingerprint(build: Callable[[], str]) -> Optional[str]:
+    """
+    Computes a fingerprint, returning None so the job runs uncached if its inputs are missing.
+    """
+    try:
+        return build()
+    except (BotoCoreError, ClientError, OSError) as e:
+        logger.warning(f"Could not fingerprint job, running it without the result store: {e}")
+        return None
@@ -0,0 +1,74 @@
+import itertools
+import logging
+import os
+import time
+from typing import Any, Callable, Optional
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Seconds a progress message waits for its publisher confirm before it is given up
+PROGRESS_PUBLISH_TIMEOUT = float(os.environ.get("PROGRESS_PUBLISH_TIMEOUT", "5"))
+# Milliseconds an unconsumed progress message stays on its queue
+PROGRESS_MESSAGE_TTL = int(os.environ.get("PROGRESS_MESSAGE_TTL", str(60 * 60 * 1000)))
+
+PROGRESS = "progress"
+PARTIAL = "partial"
+
+
+class ProgressReporter:
+    """
+    Publishes progress and partial results of a running job on a companion queue.
+
+    Messages have the form {"dataset_id", "stage", "event", "sequence", "timestamp", "data"},
+    where event is "progress" for a step being reached and "partial" for a result that is
+    already final, such as the column profile before ydata runs. The sequence orders the
+    messages of one job. The final result still goes to the result queue as before.
+
+    Publishing is best effort: a message that cannot be sent is logged and dropped, it never
+    fails the job.
+
+    Args:
+        send (Callable[[dict], None]): Publishes one message, e.g. producer.send_progress.
+        dataset_id (Any): The dataset the job works on.
+        stage (str): Name of the job, e.g. "data_profiling".
+    """
+
+    def __init__(self, send: Callable[[dict], None], dataset_id: Any, stage: str):
+        self.send = send
+        self.dataset_id = dataset_id
+        self.stage = stage
+        self._sequence = itertools.count()
+
+    def progress(self, step: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        """
+        Reports that a step was reached, optionally as done out of total steps.
+        """
+        self._emit(PROGRESS, {"step": step, "done": done, "total": total})
+
+    def partial(
+        self, name: str, result: Any, done: Optional[int] = None, total: Optional[int] = None
+    ) -> None:
+        """
+        Publishes a named part of the final result as soon as it is known.
+        """
+        self._emit(PARTIAL, {"name": name, "result": result, "done": done, "total": total})
+
+    def _emit(self, event: str, data: dict) -> None:
+        message = {
+            "dataset_id": self.dataset_id,
+            "stage": self.stage,
+            "event": event,
+            "sequence": next(self._sequence),
+            "timestamp": time.time(),
+            "data": data,
+        }
+        try:
+            self.send(message)
+        except Exception as e:
+            logger.warning(f"Could not publish {event} of {self.stage} {self.dataset_id}: {e}")
@@ -0,0 +1,243 @@
+import logging
+import os
+import threading
+from collections import deque
+from typing import Optional, Union
+
+import pika
+from pika.adapters.select_connection import IOLoop
+from pika.spec import Basic
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Seconds a publisher waits for the broker to confirm a message
+PUBLISH_CONFIRM_TIMEOUT = float(os.environ.get("RABBITMQ_PUBLISH_CONFIRM_TIMEOUT", "60"))
+# Seconds between attempts to re-establish a lost publishing connection
+PUBLISH_RECONNECT_DELAY = float(os.environ.get("RABBITMQ_PUBLISH_RECONNECT_DELAY", "2"))
+
+PERSISTENT = pika.BasicProperties(delivery_mode=2)
+
+
+class PublishError(Exception):
+    """Raised when the broker refuses to take responsibility for a message."""
+
+
+class _Delivery:
+    """
+    A message on its way to the broker, settled once the broker confirms or rejects it.
+    """
+
+    def __init__(self, queue: str, body: bytes, properties: pika.BasicProperties):
+        self.queue = queue
+        self.body = body
+        self.properties = properties
+        self.error: Optional[Exception] = None
+        self._settled = threading.Event()
+
+    def settle(self, error: Optional[Exception] = None) -> None:
+        self.error = error
+        self._settled.set()
+
+    def wait(self, timeout: float) -> None:
+        if not self._settled.wait(timeout):
+            raise TimeoutError(f"No publisher confirm for a message to {self.queue}")
+        if self.error:
+            raise self.error
+
+
+class Publisher:
+    """
+    Publishes messages over one long-lived connection per process, with publisher confirms.
+
+    The connection and its channel live on an I/O loop in a daemon thread that also answers
+    heartbeats. Any thread may publish: messages are handed to the loop, written to the channel
+    back to back, and the broker acknowledges them in batches (Basic.Ack with multiple set).
+    Each caller returns once its own message is confirmed, so a returned publish is durable.
+
+    When the connection drops it is re-established, and messages not yet confirmed are
+    published again (at-least-once delivery).
+
+    Args:
+        parameters (pika.ConnectionParameters): Where and how to connect to the broker.
+    """
+
+    def __init__(self, parameters: pika.ConnectionParameters):
+        self._parameters = parameters
+        self._lock = threading.Lock()
+        self._ioloop: Optional[IOLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[pika.SelectConnection] = None
+        self._channel = None
+        self._closing = False
+
+        # touched by caller threads (append) and the loop (popleft) only
+        self._pending: deque[_Delivery] = deque()
+        # owned by the loop thread
+        self._unconfirmed: dict[int, _Delivery] = {}
+        self._declared: set[str] = set()
+        self._delivery_tag = 0
+
+    def publish(
+        self,
+        queue: str,
+        body: Union[bytes, str],
+        properties: pika.BasicProperties = PERSISTENT,
+        timeout: float = PUBLISH_CONFIRM_TIMEOUT,
+    ) -> None:
+        """
+        Publishes a message to a durable queue and waits until the broker confirms it.
+
+        Args:
+            queue (str): Name of the queue, declared durable on first use.
+            body (bytes | str): The message body.
+            properties (pika.BasicProperties): Message properties, persistent by default.
+            timeout (float): Seconds to wait for the confirm.
+
+        Raises:
+            PublishError: If the broker rejects the message.
+            TimeoutError: If the message is not confirmed in time.
+        """
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        delivery = _Delivery(queue, body, properties)
+        self._pending.append(delivery)
+
+        ioloop = self._ensure_running()
+        ioloop.add_callback_threadsafe(self._flush)
+        delivery.wait(timeout)
+
+    def close(self) -> None:
+        """
+        Closes the connection and stops the I/O loop thread.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+            self._closing = True
+            self._ioloop.add_callback_threadsafe(self._shutdown)  # pyright: ignore
+            self._thread.join(timeout=PUBLISH_CONFIRM_TIMEOUT)
+
+    def _ensure_running(self) -> IOLoop:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._closing = False
+                self._ioloop = IOLoop()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._ioloop,), name="rabbitmq-publisher", daemon=True
+                )
+                self._thread.start()
+            return self._ioloop  # pyright: ignore
+
+    def _run(self, ioloop: IOLoop) -> None:
+        ioloop.add_callback_threadsafe(self._connect)
+        ioloop.start()
+        ioloop.close()
+
+    def _connect(self) -> None:
+        if self._closing:
+            return
+        self._connection = pika.SelectConnection(
+            self._parameters,
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_open_error,
+            on_close_callback=self._on_connection_closed,
+            custom_ioloop=self._ioloop,
+        )
+
+    def _reconnect_later(self) -> None:
+        self._channel = None
+        if self._closing:
+            self._ioloop.stop()  # pyright: ignore
+            return
+        self._ioloop.call_later(PUBLISH_RECONNECT_DELAY, self._connect)  # pyright: ignore
+
+    def _on_connection_open(self, connection) -> None:
+        logger.info("Publisher connected to RabbitMQ")
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, error) -> None:
+        logger.warning(f"Publisher could not connect to RabbitMQ, retrying: {error}")
+        self._reconnect_later()
+
+    def _on_connection_closed(self, connection, reason) -> None:
+        # messages the broker never confirmed are published again on the next connection
+        unconfirmed = [self._unconfirmed[tag] for tag in sorted(self._unconfirmed)]
+        self._unconfirmed.clear()
+        self._pending.extendleft(reversed(unconfirmed))
+        if not self._closing:
+            logger.warning(f"Publisher connection closed, reconnecting: {reason}")
+        self._reconnect_later()
+
+    def _on_channel_open(self, channel) -> None:
+        self._channel = channel
+        self._declared = set()
+        self._delivery_tag = 0
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.confirm_delivery(self._on_confirm, callback=self._on_confirm_select_ok)
+
+    def _on_confirm_select_ok(self, frame) -> None:
+        self._flush()
+
+    def _on_channel_closed(self, channel, reason) -> None:
+        if not self._closing:
+            logger.warning(f"Publisher channel closed: {reason}")
+        self._channel = None
+        # the connection close handler requeues what is unconfirmed and reconnects
+        if self._connection is not None and self._connection.is_open:
+            self._connection.close()
+
+    def _flush(self) -> None:
+        """
+        Writes every pending message to the channel; confirms arrive asynchronously.
+        """
+        channel = self._channel
+        if channel is None or not channel.is_open:
+            return
+        while self._pending:
+            delivery = self._pending.popleft()
+            if delivery.queue not in self._declared:
+                # channel methods are processed in order, so the queue exists before the publish
+                channel.queue_declare(
+                    queue=delivery.queue, durable=True, callback=self._on_queue_declared
+                )
+                self._declared.add(delivery.queue)
+            self._delivery_tag += 1
+            self._unconfirmed[self._delivery_tag] = delivery
+            channel.basic_publish(
+                exchange="",
+                routing_key=delivery.queue,
+                body=delivery.body,
+                properties=delivery.properties,
+            )
+
+    def _on_queue_declared(self, frame) -> None:
+        logger.debug(f"Publisher declared queue {frame.method.queue}")
+
+    def _on_confirm(self, frame) -> None:
+        method = frame.method
+        if method.multiple:
+            tags = [tag for tag in self._unconfirmed if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag]
+
+        error = None
+        if isinstance(method, Basic.Nack):
+            error = PublishError("The broker rejected the message")
+        for tag in tags:
+            delivery = self._unconfirmed.pop(tag, None)
+            if delivery is not None:
+                delivery.settle(error)
+
+    def _shutdown(self) -> None:
+        connection = self._connection
+        if connection is not None and not (connection.is_closed or connection.is_closing):
+            # the close callback stops the loop
+            connection.close()
+        else:
+            self._ioloop.stop()  # pyright: ignore
@@ -0,0 +1,260 @@
+import io
+import logging
+import mmap
+import os
+import re
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import IO, Optional
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+DOWNLOAD_PART_SIZE = int(os.environ.get("DOWNLOAD_PART_SIZE", str(16 * 1024 * 1024)))
+DOWNLOAD_CONCURRENCY = int(os.environ.get("DOWNLOAD_CONCURRENCY", "8"))
+DOWNLOAD_RETRIES = int(os.environ.get("DOWNLOAD_RETRIES", "3"))
+# Objects up to this size are reassembled in memory, larger ones in a memory-mapped temp file
+DOWNLOAD_IN_MEMORY_MAX_SIZE = int(
+    os.environ.get("DOWNLOAD_IN_MEMORY_MAX_SIZE", str(256 * 1024 * 1024))
+)
+
+CHUNK_SIZE = 8 * 1024 * 1024
+CONTENT_RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+@cache
+def get_http_session() -> requests.Session:
+    """
+    Returns the process-wide session, keeping enough pooled connections for a parallel download.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(DOWNLOAD_CONCURRENCY, 10))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def open_first_part(
+    url: str,
+    session: Optional[requests.Session] = None,
+    headers: Optional[dict] = None,
+    part_size: int = DOWNLOAD_PART_SIZE,
+) -> requests.Response:
+    """
+    Requests the first part of an object, which also tells its size and whether ranges work.
+
+    Conditional headers such as If-None-Match are sent along, so the same request can
+    revalidate a cached copy.
+
+    Args:
+        url (str): URL of the object.
+        session (requests.Session, optional): Session to issue the request with.
+        headers (dict, optional): Extra request headers.
+        part_size (int): Size of the first part in bytes.
+
+    Returns:
+        requests.Response: A streamed response, 206 when the server honours ranges.
+    """
+    http = session or get_http_session()
+    headers = {**(headers or {}), "Range": f"bytes=0-{part_size - 1}"}
+    return http.get(url, headers=headers, stream=True)
+
+
+def total_size(response: requests.Response) -> Optional[int]:
+    """
+    Returns the full object size of a response to open_first_part, if the server reported it.
+    """
+    if response.status_code == 206:
+        match = CONTENT_RANGE.match(response.headers.get("content-range", ""))
+        return int(match.group(3)) if match else None
+    length = response.headers.get("content-length")
+    return int(length) if length and not response.headers.get("content-encoding") else None
+
+
+def _read_into(raw, view: memoryview) -> int:
+    """
+    Fills a view from a response body, returning the number of bytes written.
+    """
+    written = 0
+    while written < len(view):
+        read = raw.readinto(view[written:])
+        if not read:
+            break
+        written += read
+    return written
+
+
+def _fetch_part(
+    url: str,
+    session: requests.Session,
+    view: memoryview,
+    start: int,
+    end: int,
+    etag: str,
+    retries: int,
+) -> None:
+    """
+    Downloads bytes start..end (inclusive) into view[start:end + 1], resuming on failure.
+    """
+    position = start
+    for attempt in range(retries + 1):
+        headers = {"Range": f"bytes={position}-{end}"}
+        if etag:
+            # fail instead of mixing two versions of an object that changed meanwhile
+            headers["If-Match"] = etag
+        try:
+            with session.get(url, headers=headers, stream=True) as response:
+                if response.status_code == 412:
+                    raise ValueError(f"Object changed while downloading: {url}")
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise IOError(f"Range request answered with {response.status_code}")
+                # count each block as it lands, so a broken connection resumes after it
+                while position <= end:
+                    read = response.raw.readinto(view[position : end + 1])
+                    if not read:
+                        break
+                    position += read
+            if position > end:
+                return
+            raise IOError(f"Connection closed at byte {position} of part {start}-{end}")
+        except ValueError:
+            raise
+        except (requests.RequestException, urllib3.exceptions.HTTPError, IOError) as e:
+            # reading the raw body raises urllib3's errors, not requests' wrappers
+            if attempt == retries:
+                raise
+            logger.warning(f"Retrying part {start}-{end} of {url} from byte {position}: {e}")
+            time.sleep(2**attempt * 0.5)
+
+
+def _fill(
+    view: memoryview,
+    response: requests.Response,
+    url: str,
+    session: requests.Session,
+    part_size: int,
+    concurrency: int,
+    retries: int,
+) -> None:
+    """
+    Writes the first part from the open response, then the remaining parts in parallel.
+    """
+    first = _read_into(response.raw, view[:part_size])
+    etag = response.headers.get("etag", "")
+    ranges = [
+        (start, min(start + part_size, len(view)) - 1)
+        for start in range(first, len(view), part_size)
+    ]
+    if not ranges:
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_fetch_part, url, session, view, start, end, etag, retries)
+            for start, end in ranges
+        ]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            pool.shutdown(cancel_futures=True)
+            raise
+
+
+def download_into_file(
+    response: requests.Response,
+    url: str,
+    destination: IO[bytes],
+    session: Optional[requests.Session] = None,
+    part_size: int = DOWNLOAD_PART_SIZE,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    retries: int = DOWNLOAD_RETRIES,
+) -> None:
+    """
+    Completes a download started with open_first_part into an empty file on disk.
+
+    The file is sized up front and memory-mapped, and every part is written straight into its
+    slice of the mapping by its own request. Servers that ignore ranges are read as a single
+    stream instead.
+
+    Args:
+        response (requests.Response): The response of open_first_part.
+        url (str): URL of the object.
+        destination (IO[bytes]): A writable file opened in binary mode.
+        session (requests.Session, optional): Session to issue the part requests with.
+        part_size (int): Size of each ranged request in bytes.
+        concurrency (int): Number of parts downloaded at the same time.
+        retries (int): Attempts per part after the first one fails.
+    """
+    size = total_size(response)
+    if response.status_code != 206 or not size:
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, destination, CHUNK_SIZE)
+        return
+
+    destination.truncate(size)
+    with mmap.mmap(destination.fileno(), size) as mapping:
+        view = memoryview(mapping)
+        try:
+            _fill(
+                view, response, url, session or get_http_session(), part_size, concurrency, retries
+            )
+        finally:
+            view.release()
+    logger.info(f"Downloaded {size} bytes from {url} in parts of {part_size} bytes")
+
+
+def download(
+    url: str,
+    session: Optional[requests.Session] = None,
+    part_size: int = DOWNLOAD_PART_SIZE,
+    concurrency: int = DOWNLOAD_CONCURRENCY,
+    retries: int = DOWNLOAD_RETRIES,
+) -> IO[bytes]:
+    """
+    Downloads an object with parallel HTTP range requests.
+
+    Objects up to DOWNLOAD_IN_MEMORY_MAX_SIZE are reassembled in a pre-sized in-memory buffer,
+    larger ones in a memory-mapped temporary file.
+
+    Args:
+        url (str): Public or presigned URL of the object.
+        session (requests.Session, optional): Session to issue the requests with.
+        part_size (int): Size of each ranged request in bytes.
+        concurrency (int): Number of parts downloaded at the same time.
+        retries (int): Attempts per part after the first one fails.
+
+    Returns:
+        IO[bytes]: A readable binary file-like object positioned at the start.
+    """
+    session = session or get_http_session()
+    with open_first_part(url, session, part_size=part_size) as response:
+        response.raise_for_status()
+        size = total_size(response)
+
+        if response.status_code == 206 and size and size <= DOWNLOAD_IN_MEMORY_MAX_SIZE:
+            buffer = io.BytesIO(bytes(size))
+            view = buffer.getbuffer()
+            try:
+                _fill(view, response, url, session, part_size, concurrency, retries)
+            finally:
+                view.release()
+        else:
+            buffer = tempfile.TemporaryFile()
+            download_into_file(response, url, buffer, session, part_size, concurrency, retries)
+
+    buffer.seek(0)
+    return buffer
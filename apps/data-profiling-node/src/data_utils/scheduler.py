@@ -0,0 +1,167 @@
+import heapq
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from botocore.exceptions import BotoCoreError, ClientError
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Messages a consumer holds to choose from; at most its worker count keeps plain FIFO
+CONSUMER_SCHEDULING_WINDOW = int(os.environ.get("CONSUMER_SCHEDULING_WINDOW", "8"))
+# Seconds after which a waiting job runs next regardless of its cost or group
+SCHEDULER_MAX_WAIT = float(os.environ.get("SCHEDULER_MAX_WAIT", "600"))
+
+
+@dataclass
+class JobEstimate:
+    """
+    What the scheduler knows about a job before running it.
+
+    Attributes:
+        cost (float): Relative cost, e.g. the dataset size in bytes; 0 when unknown.
+        share (str): Group the job is accounted to for fair share, e.g. its projectId.
+        memory (float): Estimated peak memory in bytes, for admission control; 0 when unknown.
+        cpus (float): Cores the job keeps busy, for admission control.
+    """
+
+    cost: float = 0.0
+    share: str = ""
+    memory: float = 0.0
+    cpus: float = 0.0
+
+
+def share_of(message: dict) -> str:
+    """
+    Returns the fair-share group of a request: its project, or its dataset when the request
+    does not name the project.
+    """
+    return str(message.get("projectId") or message.get("dataset_id") or "")
+
+
+def object_size_estimator(
+    storage,
+    key_field: str = "dataset_key",
+    memory_factor: float = 0.0,
+    cpus: float = 1.0,
+) -> Callable[[dict], JobEstimate]:
+    """
+    Estimates requests on a stored dataset by the size of the object they name.
+
+    Args:
+        storage (S3Service): The storage service of the node.
+        key_field (str): Message field holding the object key.
+        memory_factor (float): Peak memory of the job per byte of the stored dataset.
+        cpus (float): Cores the job keeps busy.
+
+    Returns:
+        Callable[[dict], JobEstimate]: The estimator for WorkerPoolConsumer.
+    """
+
+    def estimate(message: dict) -> JobEstimate:
+        size = 0
+        key = message.get(key_field)
+        if key:
+            try:
+                size = storage.s3.head_object(Bucket=storage.bucket_name, Key=key)["ContentLength"]
+            except (BotoCoreError, ClientError) as e:
+                logger.warning(f"Could not size {key} for scheduling: {e}")
+        return JobEstimate(
+            cost=size, share=share_of(message), memory=size * memory_factor, cpus=cpus
+        )
+
+    return estimate
+
+
+class FairShareQueue:
+    """
+    Orders the jobs waiting for a worker.
+
+    A job that has waited SCHEDULER_MAX_WAIT runs next, oldest first, so large jobs are never
+    starved. Otherwise the group that has been served the least cost goes next and, within
+    the group, its cheapest job, so short jobs overtake long ones without one project
+    crowding out the others. A group that was idle rejoins at the level of the active groups
+    rather than with the credit of its idle time.
+
+    Not thread-safe; the consumer guards it with its own lock.
+
+    Args:
+        max_wait (float): Seconds after which a job is run regardless of its cost.
+    """
+
+    def __init__(self, max_wait: float = SCHEDULER_MAX_WAIT):
+        self.max_wait = max_wait
+        # share -> heap of (cost, sequence, enqueued_at, item)
+        self._waiting: dict[str, list[tuple[float, int, float, Any]]] = {}
+        self._served: dict[str, float] = {}
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(len(jobs) for jobs in self._waiting.values())
+
+    def push(self, item: Any, estimate: JobEstimate) -> None:
+        share = estimate.share
+        if share not in self._waiting:
+            self._served[share] = max(self._served.get(share, 0.0), self._virtual_time())
+            self._waiting[share] = []
+        heapq.heappush(
+            self._waiting[share], (estimate.cost, next(self._sequence), time.monotonic(), item)
+        )
+
+    def pop(self) -> Any:
+        """
+        Removes and returns the job to run next.
+
+        Raises:
+            IndexError: If no job is waiting.
+        """
+        if not self._waiting:
+            raise IndexError("pop from an empty FairShareQueue")
+
+        share, oldest = min(
+            ((share, min(jobs, key=lambda job: job[1])) for share, jobs in self._waiting.items()),
+            key=lambda entry: entry[1][1],
+        )
+        if time.monotonic() - oldest[2] >= self.max_wait:
+            jobs = self._waiting[share]
+            jobs.remove(oldest)
+            heapq.heapify(jobs)
+            job = oldest
+            logger.info(f"Running job of {share or 'unknown group'} after its maximum wait")
+        else:
+            # least served group first, ties go to the group waiting longest
+            share = min(
+                self._waiting,
+                key=lambda s: (self._served[s], min(job[1] for job in self._waiting[s])),
+            )
+            job = heapq.heappop(self._waiting[share])
+
+        # every job counts for at least one unit so groups of unknown cost take turns
+        self._served[share] += max(job[0], 1.0)
+        if not self._waiting[share]:
+            del self._waiting[share]
+        self._forget_idle()
+        return job[3]
+
+    def _forget_idle(self) -> None:
+        # idle groups at or below the active ones would rejoin at the virtual time anyway, and
+        # once nothing waits there is no contention left to account for
+        if not self._waiting:
+            self._served.clear()
+            return
+        virtual_time = self._virtual_time()
+        for share in [s for s, served in self._served.items() if s not in self._waiting]:
+            if self._served[share] <= virtual_time:
+                del self._served[share]
+
+    def _virtual_time(self) -> float:
+        return min((self._served[share] for share in self._waiting), default=0.0)
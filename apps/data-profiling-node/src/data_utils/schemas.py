@@ -17,6 +17,9 @@ class YDataProfilingSchema:
     correlations: Optional[pd.DataFrame]
     alerts: List[str]
     samples: List[Sample]
+    # report tier of YDataProfiler, and the rows a sampled or minimal report was built from
+    tier: str = "full"
+    sample_rows: Optional[int] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -29,6 +32,8 @@ class YDataProfilingSchema:
             else self.correlations,
             "alerts": self.alerts,
             "samples": [s.__dict__ if hasattr(s, "__dict__") else str(s) for s in self.samples],
+            "tier": self.tier,
+            "sample_rows": self.sample_rows,
         }
 
 
@@ -1,7 +1,7 @@
 import json
 import numpy as np
 import pandas as pd
-from typing import Any
+from typing import Any, Optional
 from datetime import datetime
 from enum import Enum
 from uuid import UUID
@@ -29,10 +29,12 @@ def custom_serializer(obj):
     return obj
 
 
-def serialize(obj: Any) -> str:
+def serialize(obj: Any, indent: Optional[int] = 2) -> str:
     """
     Serialize an object to a JSON string using a custom serializer.
+
+    Pass indent=None for compact output, e.g. for strings embedded in messages.
     """
     return json.dumps(
-        obj, default=custom_serializer, indent=2
+        obj, default=custom_serializer, indent=indent
     )  # indent=2 instead of indent=4 to avoid additional spaces
@@ -1,12 +1,19 @@
 import logging
 import pika
 import os
-import json
+
+from src.data_utils.codec import encode_message
+from src.data_utils.progress import PROGRESS_MESSAGE_TTL, PROGRESS_PUBLISH_TIMEOUT
+from src.data_utils.publisher import Publisher
 
 
 # RabbitMQ Configuration
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("DATA_PROFILING_RESULT_QUEUE", "DATA_PROFILING_RESULT_QUEUE")
+# Companion queue for progress and partial results of running jobs
+PROGRESS_QUEUE_NAME = os.environ.get(
+    "DATA_PROFILING_PROGRESS_QUEUE", "DATA_PROFILING_PROGRESS_QUEUE"
+)
 
 # Logger Config
 logging.basicConfig(
@@ -16,32 +23,31 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+# One connection and channel per process, shared by every result this node sends
+publisher = Publisher(pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672))
+
 
 def send_message(message: dict):
-    """Sends a message to the RabbitMQ queue"""
-    connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672))
-    channel = connection.channel()
-
-    # Declare queue (must match the consumer queue)
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
-
-    # Convert message to JSON string
-    message_json = json.dumps(message)
-
-    # Publish message
-    channel.basic_publish(
-        exchange="",
-        routing_key=QUEUE_NAME,
-        body=message_json,
-        properties=pika.BasicProperties(
-            delivery_mode=2  # Make message persistent
-        ),
-    )
-
-    logger.info(f" [x] Sent: {message_json}")
-
-    # Close connection
-    connection.close()
+    """Sends a message to the RabbitMQ queue and waits until the broker confirms it"""
+    # Encode the message, the properties name the codec for the consumer
+    body, properties = encode_message(message)
+
+    # Publish a persistent message over the process-wide connection
+    publisher.publish(QUEUE_NAME, body, properties)
+
+    logger.info(f" [x] Sent {len(body)} bytes ({properties.content_type}): {message}")
+
+
+def send_progress(message: dict):
+    """Sends a progress message of a running job, which expires if nobody consumes it"""
+    body, properties = encode_message(message)
+
+    # progress is stale once the job finishes, so it is neither persisted nor kept forever
+    properties.delivery_mode = 1
+    properties.expiration = str(PROGRESS_MESSAGE_TTL)
+    publisher.publish(PROGRESS_QUEUE_NAME, body, properties, timeout=PROGRESS_PUBLISH_TIMEOUT)
+
+    logger.info(f" [x] Sent progress {message['event']} of {message['stage']}: {len(body)} bytes")
 
 
 if __name__ == "__main__":
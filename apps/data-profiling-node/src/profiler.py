@@ -1,9 +1,14 @@
 import logging
-from src.data_utils import Dataset, serialize
+from src.data_utils import Dataset
+from src.data_utils.cancellation import CancellationToken, cancellable
+from src.data_utils.claim_check import check_in
+from src.data_utils.codec import dumps_json
+from src.data_utils.job_store import JobStore, job_fingerprint, object_version, try_fingerprint
+from src.data_utils.progress import ProgressReporter
 from src.services.profiling_service import ProfilingService
 from src.services.s3_service import S3Service
 
-from src.producer import send_message
+from src.producer import send_message, send_progress
 
 # Logger Config
 logging.basicConfig(
@@ -16,12 +21,39 @@ logger.setLevel(logging.DEBUG)
 
 s3_service = S3Service()
 profiling_service = ProfilingService()
+job_store = JobStore()
 
+REPORT_INLINE_FIELDS = ("eda_object_name", "columnar_object_name", "profiling_mode", "bytes_saved")
+STAGE = "data_profiling"
 
-def perform_profiling(dataset: Dataset):
-    report = profiling_service.profile_dataset(dataset=dataset, s3_storage=s3_service)
+
+def profile_dataset(dataset: Dataset, cancellation: CancellationToken) -> dict:
+    # the cheap profiles are published on the progress queue long before ydata finishes
+    progress = ProgressReporter(send_progress, dataset.id, STAGE)
+    report = profiling_service.profile_dataset(
+        dataset=dataset, s3_storage=s3_service, progress=progress, cancellation=cancellation
+    )
     logger.info(f"Processed dataset: {dataset.name}, Report: {report}")
 
-    payload = {"id": dataset.id, "report": serialize(report)}
+    # large sections such as the ydata profile travel by reference; the keys the backend
+    # and later stages read directly stay inline
+    report = check_in(report, s3_service, keep=REPORT_INLINE_FIELDS)
+
+    # the backend stores the report as a JSON string; compact, it escapes no indentation
+    return {"id": dataset.id, "report": dumps_json(report).decode("utf-8")}
+
+
+def perform_profiling(dataset: Dataset):
+    # a redelivered or re-enqueued request for unchanged data republishes the stored result
+    fingerprint = try_fingerprint(
+        lambda: job_fingerprint(
+            STAGE,
+            {"dataset_id": dataset.id, "file": dataset.file, "name": dataset.name},
+            [object_version(s3_service, dataset.file)],
+        )
+    )
+    # a cancellation request for the dataset stops the job at its next stage boundary
+    with cancellable(dataset.id, STAGE) as cancellation:
+        payload = job_store.run(fingerprint, lambda: profile_dataset(dataset, cancellation))
 
     send_message(payload)
@@ -0,0 +1,497 @@
+import logging
+import math
+import os
+import warnings
+from collections import Counter
+from typing import Callable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.profilers.column_profiling import ColumnProfiler
+from src.profilers.duplicates import DuplicateDetector, DuplicateRows
+from src.profilers.numeric_stats import NUMERICAL_SUMMARY_KEYS
+from src.profilers.sketches import FrequentItems, HyperLogLog, KLLSketch
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+PROFILING_CHUNK_ROWS = int(os.environ.get("PROFILING_CHUNK_ROWS", "100000"))
+# Uniform row sample used for quantiles, modes and the ydata report
+PROFILING_SAMPLE_ROWS = int(os.environ.get("PROFILING_SAMPLE_ROWS", "100000"))
+# Distinct values counted per non-numeric column before its counts are frozen
+PROFILING_MAX_TRACKED_VALUES = int(os.environ.get("PROFILING_MAX_TRACKED_VALUES", "100000"))
+# Sketch mode: quantiles, distinct counts, top values and duplicate rows are estimated by
+# mergeable sketches in fixed memory, with their error bounds added to the profile
+PROFILING_SKETCHES = os.environ.get("PROFILING_SKETCHES", "false").lower() == "true"
+PROFILING_SKETCH_QUANTILE_K = int(os.environ.get("PROFILING_SKETCH_QUANTILE_K", "200"))
+PROFILING_SKETCH_TOP_VALUES = int(os.environ.get("PROFILING_SKETCH_TOP_VALUES", "1000"))
+PROFILING_SKETCH_HLL_PRECISION = int(os.environ.get("PROFILING_SKETCH_HLL_PRECISION", "14"))
+
+
+class MomentAccumulator:
+    """
+    Count, mean, central moments and extremes of a numeric column, merged chunk by chunk.
+
+    Central moments are combined with the pairwise update formulas of Pébay (2008), which stay
+    numerically stable where raw sums of powers would cancel catastrophically.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Adds the non-missing float64 values of a chunk.
+        """
+        n = len(values)
+        if not n:
+            return
+        mean = float(values.mean())
+        deviations = values - mean
+        squared = deviations * deviations
+        self._merge(
+            n,
+            mean,
+            float(squared.sum()),
+            float((squared * deviations).sum()),
+            float((squared * squared).sum()),
+        )
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+    def _merge(self, n_b: int, mean_b: float, m2_b: float, m3_b: float, m4_b: float) -> None:
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        delta_n = delta / n
+
+        m4 = (
+            self.m4
+            + m4_b
+            + delta * delta_n**3 * n_a * n_b * (n_a * n_a - n_a * n_b + n_b * n_b)
+            + 6 * delta_n**2 * (n_a * n_a * m2_b + n_b * n_b * self.m2)
+            + 4 * delta_n * (n_a * m3_b - n_b * self.m3)
+        )
+        m3 = (
+            self.m3
+            + m3_b
+            + delta * delta_n**2 * n_a * n_b * (n_a - n_b)
+            + 3 * delta_n * (n_a * m2_b - n_b * self.m2)
+        )
+        m2 = self.m2 + m2_b + delta * delta_n * n_a * n_b
+
+        self.count = n
+        self.mean += delta_n * n_b
+        self.m2, self.m3, self.m4 = m2, m3, m4
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (ddof=1), like pandas."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def population_std(self) -> float:
+        """Population standard deviation (ddof=0), like scipy's zscore."""
+        return math.sqrt(self.m2 / self.count) if self.count else math.nan
+
+    @property
+    def skewness(self) -> float:
+        """Adjusted Fisher-Pearson skewness, like pandas."""
+        n = self.count
+        if n < 3:
+            return math.nan
+        if self.m2 == 0:
+            return 0.0
+        return (n * (n - 1) ** 0.5 / (n - 2)) * (self.m3 / self.m2**1.5)
+
+    @property
+    def kurtosis(self) -> float:
+        """Excess kurtosis with the bias correction pandas applies."""
+        n = self.count
+        if n < 4:
+            return math.nan
+        if self.m2 == 0:
+            return 0.0
+        adjustment = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        return (n * (n + 1) * (n - 1) * self.m4) / ((n - 2) * (n - 3) * self.m2**2) - adjustment
+
+
+class ColumnAccumulator:
+    """
+    Everything ColumnProfiler derives from a column, gathered one chunk at a time.
+
+    Chunks are read with per-chunk type inference, so a column may be numeric in one chunk and
+    text in the next; chunks without any value do not count towards either kind.
+
+    With sketches, quantiles come from a KLL sketch instead of the row sample, and value
+    counts are kept for the most frequent values only, next to a HyperLogLog distinct count.
+    """
+
+    def __init__(self, name, sketches: bool = PROFILING_SKETCHES):
+        self.name = name
+        self.rows = 0
+        self.missing = 0
+        self.numeric_chunks = 0
+        self.boolean_chunks = 0
+        self.other_chunks = 0
+        self.moments = MomentAccumulator()
+        self.type_counts: Counter = Counter()
+        self.value_counts: Counter = Counter()
+        self.values_overflowed = False
+        self.string_count = 0
+        self.bool_like_count = 0
+        self.datetime_seen = False
+        self.quantiles = KLLSketch(PROFILING_SKETCH_QUANTILE_K) if sketches else None
+        self.frequent = FrequentItems(PROFILING_SKETCH_TOP_VALUES) if sketches else None
+        self.distinct = HyperLogLog(PROFILING_SKETCH_HLL_PRECISION) if sketches else None
+
+    def update(self, series: pd.Series) -> None:
+        """
+        Adds a chunk of the column.
+        """
+        missing = int(series.isna().sum())
+        present = len(series) - missing
+        self.rows += len(series)
+        self.missing += missing
+        self.type_counts["NoneType"] += missing
+        if not present:
+            return
+
+        if pd.api.types.is_bool_dtype(series.dtype):
+            self.boolean_chunks += 1
+            self.type_counts["bool"] += present
+            self.bool_like_count += present
+            self._count_values(series)
+        elif pd.api.types.is_numeric_dtype(series.dtype):
+            self.numeric_chunks += 1
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            values = values[~np.isnan(values)]
+            self.moments.update(values)
+            if self.quantiles is not None:
+                self.quantiles.update(values)
+            type_name = "int" if pd.api.types.is_integer_dtype(series.dtype) else "float"
+            self.type_counts[type_name] += present
+        else:
+            self.other_chunks += 1
+            present_values = series.dropna()
+            self.type_counts.update(
+                present_values.astype(object).map(ColumnProfiler.type_name).value_counts().to_dict()
+            )
+            self.string_count += int(present_values.map(lambda x: isinstance(x, str)).sum())
+            self.bool_like_count += int(
+                present_values.map(lambda x: x in ColumnProfiler.BOOL_LIKE_VALUES).sum()
+            )
+            self._count_values(series)
+            if not self.datetime_seen:
+                try:
+                    with warnings.catch_warnings():
+                        # the per-element parsing fallback warns once per chunk
+                        warnings.simplefilter("ignore", UserWarning)
+                        converted = pd.to_datetime(series, errors="coerce")
+                    self.datetime_seen = bool(converted.notna().any())
+                except Exception:
+                    pass
+
+    def _count_values(self, series: pd.Series) -> None:
+        if self.frequent is not None:
+            self.frequent.update(series.value_counts(dropna=True).to_dict())
+            self.distinct.update(series)
+            return
+        if self.values_overflowed:
+            return
+        self.value_counts.update(series.value_counts(dropna=True).to_dict())
+        if len(self.value_counts) > PROFILING_MAX_TRACKED_VALUES:
+            logger.warning(
+                f"Column {self.name} has more than {PROFILING_MAX_TRACKED_VALUES} distinct values, "
+                "its value counts are truncated"
+            )
+            self.values_overflowed = True
+
+    def classify(self) -> tuple[Optional[str], Optional[dict]]:
+        """
+        Applies ColumnProfiler.classify_columns' rules to the accumulated column.
+
+        Returns:
+            tuple: (str | None, dict | None) The class ("numeric", "boolean", "categorical",
+                "datetime", "mixed" or None when no rule applies) and, for mixed columns, the
+                percentage of each value type.
+        """
+        if not self.other_chunks and not self.boolean_chunks:
+            return "numeric", None
+        if not self.other_chunks and not self.numeric_chunks:
+            return "boolean", None
+
+        type_percentages = {
+            name: count * 100 / self.rows for name, count in self.type_counts.items() if count
+        }
+        types = list(type_percentages.keys())
+        if not (len(types) == 1 or (len(types) == 2 and "NoneType" in types)):
+            return "mixed", type_percentages
+
+        if self.datetime_seen:
+            return "datetime", None
+        if self.bool_like_count / self.rows > 0.8:
+            return "boolean", None
+        if self.distinct is not None:
+            low_cardinality = self.distinct.estimate() / self.rows < 0.1
+        else:
+            low_cardinality = (
+                not self.values_overflowed and len(self.value_counts) / self.rows < 0.1
+            )
+        if low_cardinality or self.string_count == self.rows:
+            return "categorical", None
+        return None, None
+
+    def categorical_summary(self) -> dict:
+        """
+        Same output as ColumnProfiler._categorical_summary, built from the value counts.
+
+        With sketches, the counts cover the most frequent values only and may each be up to
+        error_bounds["count"] too low; the cardinality is an estimate with the relative
+        standard error error_bounds["cardinality"].
+        """
+        if self.frequent is not None:
+            category_counts = dict(self.frequent.counts.most_common())
+            cardinality = round(self.distinct.estimate())
+        else:
+            category_counts = dict(self.value_counts.most_common())
+            cardinality = len(category_counts)
+        top = max(category_counts.values(), default=0)
+        summary = {
+            "mode": sorted(
+                (value for value, count in category_counts.items() if count == top), key=str
+            ),
+            "missing_values": int(self.missing * 100) / self.rows,
+            "cardinality": cardinality,
+            "frequency_distribution": {
+                value: count * 100 / self.rows for value, count in category_counts.items()
+            },
+            "category_counts": category_counts,
+        }
+        if self.frequent is not None:
+            summary["error_bounds"] = {
+                "count": self.frequent.error,
+                "cardinality": self.distinct.relative_error,
+            }
+        return summary
+
+    def numerical_summary(self, sample: pd.Series) -> dict:
+        """
+        Same output as profile_numeric_block's "summary". Moments and extremes are exact, the
+        median and mode are taken from the row sample. With sketches, the median comes from
+        the quantile sketch, its rank off by at most error_bounds["quantile_rank"].
+        """
+        moments = self.moments
+        if not moments.count:
+            # a column without values is numeric to pandas too, all of its statistics are NaN
+            return {key: math.nan for key in NUMERICAL_SUMMARY_KEYS}
+        if self.quantiles is not None:
+            (median,) = self.quantiles.quantiles([0.5])
+        else:
+            median = float(sample.median())
+        summary = {
+            "mean": moments.mean,
+            "median": median,
+            "mode": list(sample.mode(dropna=True).value_counts().to_dict().keys()),
+            "min": moments.min,
+            "max": moments.max,
+            "range": moments.max - moments.min,
+            "variance": moments.variance,
+            "std": math.sqrt(moments.variance),
+            "skewness": moments.skewness,
+            "kurtosis": moments.kurtosis,
+        }
+        if self.quantiles is not None:
+            summary["error_bounds"] = {"quantile_rank": self.quantiles.rank_error}
+        return summary
+
+
+class ChunkedProfiler:
+    """
+    Profiles datasets that do not fit in memory by walking them in row chunks.
+
+    Produces the same dataset_profile and column_profile structure as the in-memory path.
+    Counts, missing values, moments, extremes, category counts and duplicate rows are exact;
+    quantiles and modes come from a uniform row sample, which is also what ydata profiles.
+
+    In sketch mode, memory no longer grows with the rows: quantiles, category counts,
+    cardinalities and duplicate rows are estimated by mergeable sketches, and each estimate
+    carries its error bound under "error_bounds".
+    """
+
+    @staticmethod
+    def _sample_rows(
+        sample: Optional[pd.DataFrame],
+        priorities: np.ndarray,
+        chunk: pd.DataFrame,
+        rng: np.random.Generator,
+    ) -> tuple[pd.DataFrame, np.ndarray]:
+        """
+        Keeps the rows with the smallest random priorities, a uniform sample of all rows seen.
+        """
+        chunk_priorities = rng.random(len(chunk))
+        if sample is None:
+            combined, priorities = chunk, chunk_priorities
+        else:
+            combined = pd.concat([sample, chunk], ignore_index=True)
+            priorities = np.concatenate([priorities, chunk_priorities])
+        if len(combined) > PROFILING_SAMPLE_ROWS:
+            keep = np.argpartition(priorities, PROFILING_SAMPLE_ROWS)[:PROFILING_SAMPLE_ROWS]
+            combined, priorities = combined.iloc[keep], priorities[keep]
+        return combined.reset_index(drop=True), priorities
+
+    @staticmethod
+    def _count_outliers(
+        chunks: Iterator[pd.DataFrame], numeric: list, accumulators: dict, quartiles: dict
+    ) -> dict:
+        """
+        Second pass over the data counting IQR and z-score outliers of the numeric columns.
+        """
+        counts = {col: Counter() for col in numeric}
+        for chunk in chunks:
+            for col in numeric:
+                values = pd.to_numeric(chunk[col], errors="coerce")
+                first_quartile, third_quartile = quartiles[col]
+                # same whiskers as profile_numeric_block
+                left_whisker = first_quartile - (1.5 * first_quartile)
+                right_whisker = third_quartile + (1.5 * third_quartile)
+                moments = accumulators[col].moments
+                z_scores = (values - moments.mean) / moments.population_std
+
+                counts[col]["left"] += int((values < left_whisker).sum())
+                counts[col]["right"] += int((values > right_whisker).sum())
+                counts[col]["z_left"] += int((z_scores < -3).sum())
+                counts[col]["z_right"] += int((z_scores > 3).sum())
+
+        return {
+            col: {
+                "iqr": {
+                    "Q1": float(quartiles[col][0]),
+                    "Q3": float(quartiles[col][1]),
+                    "IQR": float(quartiles[col][1] - quartiles[col][0]),
+                    "left_outliers": counts[col]["left"],
+                    "right_outliers": counts[col]["right"],
+                },
+                "z-score": {
+                    "left_outliers": counts[col]["z_left"],
+                    "right_outliers": counts[col]["z_right"],
+                },
+            }
+            for col in numeric
+        }
+
+    @staticmethod
+    def profile(
+        chunks: Callable[[], Iterator[pd.DataFrame]],
+        seed: int = 0,
+        sketches: bool = PROFILING_SKETCHES,
+    ) -> tuple[dict, dict, pd.DataFrame, DuplicateRows]:
+        """
+        Profiles a dataset given as a re-iterable source of row chunks.
+
+        Args:
+            chunks (Callable): Returns a fresh iterator over the dataset's row chunks; it is
+                called twice, once for the aggregates and once for the outlier counts.
+            seed (int): Seed of the row sampler.
+            sketches (bool): Estimate with sketches in fixed memory instead of exactly.
+
+        Returns:
+            tuple: (dict, dict, pd.DataFrame, DuplicateRows) The dataset profile, the column
+                profile, the row sample and the duplicate rows of the whole dataset.
+        """
+        rng = np.random.default_rng(seed)
+        accumulators: dict = {}
+        detector = DuplicateDetector(approximate=sketches, precision=PROFILING_SKETCH_HLL_PRECISION)
+        rows = 0
+        missing_cells = 0
+        sample, priorities = None, np.empty(0)
+
+        for chunk in chunks():
+            if not accumulators:
+                accumulators = {col: ColumnAccumulator(col, sketches) for col in chunk.columns}
+            rows += len(chunk)
+            missing_cells += int(chunk.isna().sum().sum())
+            detector.update(chunk)
+            for col, accumulator in accumulators.items():
+                accumulator.update(chunk[col])
+            sample, priorities = ChunkedProfiler._sample_rows(sample, priorities, chunk, rng)
+            logger.debug(f"Profiled {rows} rows")
+
+        if sample is None:
+            raise ValueError("Dataset has no rows to profile")
+
+        num_columns = len(accumulators)
+        duplicates = detector.result()
+        dataset_profile = {
+            "num_columns": num_columns,
+            "num_observations": rows,
+            "missing_cell_percentage": (missing_cells / (rows * num_columns)) * 100
+            if rows * num_columns > 0
+            else 0,
+            "duplicate_row_percentage": duplicates.percentage,
+            "duplicates": duplicates.to_dict(),
+        }
+        if not duplicates.exact:
+            # the standard error of the distinct row estimate, in percent of the rows
+            dataset_profile["error_bounds"] = {
+                "duplicate_row_percentage": (duplicates.error / rows) * 100
+            }
+
+        classifications = {
+            "numeric": [],
+            "boolean": [],
+            "categorical": [],
+            "datetime": [],
+            "mixed": [],
+        }
+        for col, accumulator in accumulators.items():
+            kind, type_percentages = accumulator.classify()
+            if kind == "mixed":
+                classifications["mixed"].append({col: type_percentages})
+            elif kind:
+                classifications[kind].append(col)
+        logger.info(f"Classified columns: {classifications}")
+
+        numeric = classifications["numeric"]
+        numeric_sample = {col: pd.to_numeric(sample[col], errors="coerce") for col in numeric}
+        if sketches:
+            quartiles = {
+                col: tuple(accumulators[col].quantiles.quantiles([0.25, 0.75])) for col in numeric
+            }
+        else:
+            quartiles = {
+                col: tuple(numeric_sample[col].quantile([0.25, 0.75])) for col in numeric
+            }
+        outliers = (
+            ChunkedProfiler._count_outliers(chunks(), numeric, accumulators, quartiles)
+            if numeric
+            else {}
+        )
+
+        column_profile = {
+            "classification": classifications,
+            "categorical": {
+                col: accumulators[col].categorical_summary()
+                for col in classifications["categorical"]
+            },
+            "numerical": {
+                col: {
+                    "summary": accumulators[col].numerical_summary(numeric_sample[col]),
+                    "outliers": outliers[col],
+                }
+                for col in numeric
+            },
+        }
+        return dataset_profile, column_profile, sample, duplicates
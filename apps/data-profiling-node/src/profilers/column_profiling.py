@@ -1,8 +1,14 @@
-from typing import List
+from typing import List, Optional
 import pandas as pd
 import numpy as np
-from scipy.stats import zscore
+from pandas.api.types import infer_dtype
+from pandas.tseries.api import guess_datetime_format
 import logging
+import os
+import re
+import warnings
+
+from src.profilers.numeric_stats import profile_numeric_block
 
 # Logger Config
 logging.basicConfig(
@@ -12,8 +18,44 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+# Rows, spread evenly over the column, a column's classification is decided on
+PROFILING_CLASSIFICATION_SAMPLE_ROWS = int(
+    os.environ.get("PROFILING_CLASSIFICATION_SAMPLE_ROWS", "10000")
+)
+
+# infer_dtype results of columns holding more than one type besides missing values
+MIXED_INFERRED_TYPES = {"mixed", "mixed-integer", "mixed-integer-float", "unknown-array"}
+
+# Datetime format guessed for each value layout (digits masked), shared by all columns
+_DATETIME_FORMATS: dict[str, Optional[str]] = {}
+_MAX_DATETIME_LAYOUTS = 1024
+
+
+def _datetime_format(value: str) -> Optional[str]:
+    """
+    Returns the strftime format of a date string, guessed once per layout such as 0000-00-00.
+    """
+    layout = re.sub(r"\d", "0", value)
+    if layout not in _DATETIME_FORMATS:
+        if len(_DATETIME_FORMATS) >= _MAX_DATETIME_LAYOUTS:
+            return guess_datetime_format(value)
+        _DATETIME_FORMATS[layout] = guess_datetime_format(value)
+    return _DATETIME_FORMATS[layout]
+
 
 class ColumnProfiler:
+    BOOL_LIKE_VALUES = {0, 1, "True", "False", "true", "false", True, False}
+
+    @staticmethod
+    def type_name(value) -> str:
+        """
+        Returns the type name of a cell; categorical and string columns hold NaN/pd.NA where
+        object columns may hold None, so every missing marker is reported as NoneType.
+        """
+        if value is None or value is pd.NA or value != value:
+            return "NoneType"
+        return type(value).__name__
+
     @staticmethod
     def calculate_mixed_dtype_percentage(series: pd.Series):
         """
@@ -25,7 +67,9 @@ class ColumnProfiler:
         Returns:
             dict: A dictionary mapping data types to their percentage occurrence in the column.
         """
-        dtype_counts = series.map(lambda x: type(x).__name__).value_counts(normalize=True) * 100
+        dtype_counts = (
+            series.astype(object).map(ColumnProfiler.type_name).value_counts(normalize=True) * 100
+        )
         return dtype_counts.to_dict()
 
     @staticmethod
@@ -39,10 +83,59 @@ class ColumnProfiler:
         Returns:
             float: The ratio of values that can be converted to boolean.
         """
-        bool_like_values = {0, 1, "True", "False", "true", "false", True, False}
-        valid_count = series.dropna().map(lambda x: x in bool_like_values).sum()
+        valid_count = series.isin(list(ColumnProfiler.BOOL_LIKE_VALUES)).sum()
         return valid_count / len(series)
 
+    @staticmethod
+    def _stratified_sample(series: pd.Series) -> pd.Series:
+        """
+        Returns a random row from each of PROFILING_CLASSIFICATION_SAMPLE_ROWS equal slices of
+        the column, or the whole column when it is shorter. Random offsets keep a sample of a
+        periodic column from landing on the same phase every time.
+        """
+        if len(series) <= PROFILING_CLASSIFICATION_SAMPLE_ROWS:
+            return series
+        edges = np.linspace(0, len(series), PROFILING_CLASSIFICATION_SAMPLE_ROWS + 1)
+        offsets = np.random.default_rng(0).random(PROFILING_CLASSIFICATION_SAMPLE_ROWS)
+        positions = (edges[:-1] + offsets * np.diff(edges)).astype(np.int64)
+        return series.iloc[positions]
+
+    @staticmethod
+    def _inferred_type(series: pd.Series) -> str:
+        """
+        Returns pandas' inferred type of the column's values, ignoring missing ones.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            return infer_dtype(series.cat.categories, skipna=True)
+        return infer_dtype(series, skipna=True)
+
+    @staticmethod
+    def _looks_like_datetime(sample: pd.Series) -> bool:
+        """
+        Checks whether any value of the sample parses as a date.
+
+        String values are parsed with the format guessed from the first one, which is cached
+        per layout; only when that parses nothing is each distinct value parsed on its own.
+        """
+        if pd.api.types.is_datetime64_any_dtype(sample.dtype):
+            return True
+        try:
+            values = sample.dropna().astype(object).drop_duplicates()
+            if not len(values):
+                return False
+            if isinstance(values.iloc[0], str):
+                date_format = _datetime_format(values.iloc[0])
+                if date_format and pd.to_datetime(
+                    values, format=date_format, errors="coerce"
+                ).notna().any():
+                    return True
+            with warnings.catch_warnings():
+                # the per-element parsing fallback warns once per column
+                warnings.simplefilter("ignore", UserWarning)
+                return bool(pd.to_datetime(values, errors="coerce").notna().any())
+        except Exception:
+            return False
+
     @staticmethod
     def classify_columns(dataframe: pd.DataFrame):
         """
@@ -69,38 +162,39 @@ class ColumnProfiler:
         )
         to_be_tested = []
 
+        # every decision is taken on a sample and confirmed on the whole column with vectorized
+        # checks, so the time spent in Python per column does not grow with its rows
         for col in remaining_cols:
-            mixed_type_percentage = ColumnProfiler.calculate_mixed_dtype_percentage(
-                series=dataframe[col]  # pyright: ignore
-            )
-            types = list(mixed_type_percentage.keys())
-            if len(types) == 1:
-                to_be_tested.append(col)
-            elif len(types) == 2 and "NoneType" in types:
-                to_be_tested.append(col)
+            series = dataframe[col]
+            sample = ColumnProfiler._stratified_sample(series)  # pyright: ignore
+            if ColumnProfiler._inferred_type(sample) in MIXED_INFERRED_TYPES:
+                mixed.append({col: ColumnProfiler.calculate_mixed_dtype_percentage(sample)})
+            # a homogeneous sample is confirmed on the column, infer_dtype stops at the first
+            # value of another type
+            elif ColumnProfiler._inferred_type(series) in MIXED_INFERRED_TYPES:  # pyright: ignore
+                mixed.append({col: ColumnProfiler.calculate_mixed_dtype_percentage(series)})
             else:
-                mixed.append({col: mixed_type_percentage})
+                to_be_tested.append(col)
 
         for col in to_be_tested:
-            try:
-                converted = pd.to_datetime(dataframe[col], errors="coerce")
-                datetime_ratio = converted.notna().mean()
-            except Exception:
-                datetime_ratio = 0
-
-            if datetime_ratio > 0:
+            series = dataframe[col]
+            sample = ColumnProfiler._stratified_sample(series)  # pyright: ignore
+            if ColumnProfiler._looks_like_datetime(sample):
                 classifications["datetime"].append(col)
                 continue
 
-            bool_ratio = ColumnProfiler.is_boolean_convertible(series=dataframe[col])
-            if bool_ratio > 0.8:
+            if (
+                ColumnProfiler.is_boolean_convertible(series=sample) > 0.8
+                and ColumnProfiler.is_boolean_convertible(series=series) > 0.8  # pyright: ignore
+            ):
                 classifications["boolean"].append(col)
                 continue
 
-            unique_ratio = dataframe[col].nunique() / len(dataframe[col])
-            if unique_ratio < 0.1 or dataframe[col].map(lambda x: isinstance(x, str)).sum() == len(
-                dataframe[col]
-            ):
+            all_strings = bool(series.notna().all()) and (
+                ColumnProfiler._inferred_type(series) == "string"  # pyright: ignore
+            )
+            unique_ratio = series.nunique() / len(series)
+            if unique_ratio < 0.1 or all_strings:
                 classifications["categorical"].append(col)
                 continue
 
@@ -119,9 +213,11 @@ class ColumnProfiler:
         Returns:
             dict: A dictionary with summary statistics for the categorical column.
         """
-        mode_without_na = list(series.mode(dropna=True).value_counts().to_dict().keys())
+        mode_without_na = series.mode(dropna=True).tolist()
         missing_values = int(series.isnull().sum() * 100) / series.size
         category_counts = series.value_counts(dropna=True)
+        # category columns also count the categories that never occur
+        category_counts = category_counts[category_counts > 0]
         frequency_distribution_without_na = (category_counts * 100 / series.size).to_dict()
         cardinality_without_na = len(frequency_distribution_without_na.keys())
 
@@ -150,69 +246,14 @@ class ColumnProfiler:
             for col in categorical_cols
         }
 
-    @staticmethod
-    def _numerical_summary(series: pd.Series) -> dict:
-        """
-        Computes a summary of numerical columns, including central tendencies, variance, and distribution measures.
-
-        Args:
-            series (pd.Series): The numerical column to analyze.
-
-        Returns:
-            dict: A dictionary containing summary statistics for the numerical column.
-        """
-        return {
-            "mean": float(series.mean()),
-            "median": float(series.median()),
-            "mode": list(series.mode(dropna=True).value_counts().to_dict().keys()),
-            "min": float(series.min()),
-            "max": float(series.max()),
-            "range": float(series.max() - series.min()),
-            "variance": float(series.var()),  # pyright: ignore
-            "std": float(series.std()),
-            "skewness": float(series.skew()),  # pyright: ignore
-            "kurtosis": float(series.kurtosis()),  # pyright: ignore
-        }
-
-    @staticmethod
-    def _detect_outliers(series: pd.Series) -> dict:
-        """
-        Detects outliers in a numerical column using the IQR and z-score methods.
-
-        Args:
-            series (pd.Series): The numerical column to analyze.
-
-        Returns:
-            dict: A dictionary containing outlier statistics using IQR and z-score methods.
-        """
-        first_quartile, third_quartile = series.quantile([0.25, 0.75])
-        iqr = third_quartile - first_quartile
-        left_whisker = first_quartile - (1.5 * first_quartile)
-        right_whisker = third_quartile + (1.5 * third_quartile)
-        z_scores = zscore(series)
-
-        left_outliers = int(series[series < left_whisker].count())  # pyright: ignore
-        right_outliers = int(series[series > right_whisker].count())  # pyright: ignore
-
-        return {
-            "iqr": {
-                "Q1": float(first_quartile),
-                "Q3": float(third_quartile),
-                "IQR": float(iqr),
-                "left_outliers": left_outliers,
-                "right_outliers": right_outliers,
-            },
-            "z-score": {
-                "left_outliers": int((z_scores < -3).sum()),
-                "right_outliers": int((z_scores > 3).sum()),
-            },
-        }
-
     @staticmethod
     def profile_numerical_columns(dataframe: pd.DataFrame, numerical_columns: List[str]) -> dict:
         """
         Profiles numerical columns by computing summary statistics and outlier detection.
 
+        All columns are profiled together on a float64 block, see profile_numeric_block, with
+        missing values left out of every statistic including the z-scores.
+
         Args:
             dataframe (pd.DataFrame): The dataframe containing numerical columns.
             numerical_columns (List[str]): List of numerical column names.
@@ -220,13 +261,7 @@ class ColumnProfiler:
         Returns:
             dict: A dictionary with profiles for each numerical column.
         """
-        return {
-            col: {
-                "summary": ColumnProfiler._numerical_summary(dataframe[col]),  # pyright: ignore
-                "outliers": ColumnProfiler._detect_outliers(dataframe[col]),  # pyright: ignore
-            }
-            for col in numerical_columns
-        }
+        return profile_numeric_block(dataframe, numerical_columns)
 
     @staticmethod
     def profile_datetime_columns(dataframe: pd.DataFrame) -> str: ...
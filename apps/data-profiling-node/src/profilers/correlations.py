@@ -0,0 +1,107 @@
+import itertools
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _codes(series: pd.Series, numeric: bool, bins: int) -> tuple[np.ndarray, int]:
+    """
+    Integer codes of a column's values, -1 for missing ones, and the number of codes.
+    Numeric columns are cut into equal width bins first.
+    """
+    if numeric:
+        binned = pd.cut(series, bins=bins, labels=False, duplicates="drop")
+        codes = np.nan_to_num(np.asarray(binned, dtype=np.float64), nan=-1).astype(np.int64)
+        return codes, bins
+    codes, levels = pd.factorize(series)
+    return codes.astype(np.int64), len(levels)
+
+
+def _chi2(table: np.ndarray) -> float:
+    """
+    Pearson's chi-squared statistic of a contingency table without empty rows or columns,
+    with Yates' continuity correction on 2x2 tables, like scipy's chi2_contingency.
+    """
+    n = table.sum()
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    observed = table.astype(np.float64)
+    dof = (table.shape[0] - 1) * (table.shape[1] - 1)
+    if dof == 0:
+        return 0.0
+    if dof == 1:
+        difference = expected - observed
+        observed = observed + np.sign(difference) * np.minimum(0.5, np.abs(difference))
+    return float((((observed - expected) ** 2) / expected).sum())
+
+
+def _cramers_v(first: tuple[np.ndarray, int], second: tuple[np.ndarray, int]) -> float:
+    """
+    Bias corrected Cramér's V of two coded columns, over the rows where both are present.
+    """
+    (codes_a, levels_a), (codes_b, levels_b) = first, second
+    present = (codes_a >= 0) & (codes_b >= 0)
+    counts = np.bincount(
+        codes_a[present] * levels_b + codes_b[present], minlength=levels_a * levels_b
+    ).reshape(levels_a, levels_b)
+    # only the values that occur together make up the contingency table
+    table = counts[counts.any(axis=1)][:, counts.any(axis=0)]
+    if not table.size:
+        return 0.0
+
+    chi2 = _chi2(table)
+    n = table.sum()
+    r, k = table.shape
+    with np.errstate(divide="ignore", invalid="ignore"):
+        phi2 = max(0.0, chi2 / n - ((k - 1.0) * (r - 1.0)) / (n - 1.0))
+        r_corrected = r - ((r - 1.0) ** 2.0) / (n - 1.0)
+        k_corrected = k - ((k - 1.0) ** 2.0) / (n - 1.0)
+        denominator = min(k_corrected - 1.0, r_corrected - 1.0)
+        return 1.0 if denominator == 0.0 else float(np.sqrt(phi2 / denominator))
+
+
+def auto_correlations(
+    dataframe: pd.DataFrame,
+    numerical_columns: list[str],
+    categorical_columns: list[str],
+    bins: int = 10,
+) -> Optional[pd.DataFrame]:
+    """
+    Correlation matrix in the layout of ydata's "auto" correlations.
+
+    Pairs of numeric columns get their Spearman correlation, computed for all of them at
+    once; pairs involving a categorical column get the bias corrected Cramér's V, with
+    numeric columns cut into equal width bins. Each column is coded once and the contingency
+    tables are counted with bincount, instead of a crosstab per pair.
+
+    Args:
+        dataframe (pd.DataFrame): The dataframe holding the columns.
+        numerical_columns (list[str]): Numeric columns with more than one distinct value.
+        categorical_columns (list[str]): Categorical and boolean columns with more than one,
+            and not too many, distinct values.
+        bins (int): Bins numeric columns are cut into when paired with a categorical one.
+
+    Returns:
+        pd.DataFrame: The symmetric matrix over the sorted column names, None with fewer
+            than two columns.
+    """
+    columns = sorted(numerical_columns + categorical_columns)
+    if len(columns) <= 1:
+        return None
+
+    numeric = set(numerical_columns)
+    matrix = pd.DataFrame(np.ones((len(columns), len(columns))), index=columns, columns=columns)
+    if len(numeric) > 1:
+        spearman = dataframe[sorted(numeric)].corr(method="spearman")
+        matrix.loc[spearman.index, spearman.columns] = spearman
+
+    codes = {}
+    for first, second in itertools.combinations(columns, 2):
+        if first in numeric and second in numeric:
+            continue
+        for col in (first, second):
+            if col not in codes:
+                codes[col] = _codes(dataframe[col], col in numeric, bins)
+        score = _cramers_v(codes[first], codes[second])
+        matrix.loc[first, second] = matrix.loc[second, first] = score
+    return matrix
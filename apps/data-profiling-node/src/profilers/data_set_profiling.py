@@ -1,5 +1,9 @@
+from typing import Optional
+
 import pandas as pd
 
+from src.profilers.duplicates import DuplicateDetector, DuplicateRows
+
 
 class DatasetProfiler:
     @staticmethod
@@ -20,23 +24,33 @@ class DatasetProfiler:
         return (missing_cells / total_cells) * 100 if total_cells > 0 else 0
 
     @staticmethod
-    def get_duplicate_row_percentage(dataframe: pd.DataFrame) -> float:
-        """Returns the percentage of duplicate rows in the dataset."""
-        total_rows = dataframe.shape[0]
-        duplicate_rows = dataframe.duplicated().sum()
-        return (duplicate_rows / total_rows) * 100 if total_rows > 0 else 0
+    def get_duplicate_row_percentage(
+        dataframe: pd.DataFrame, duplicates: Optional[DuplicateRows] = None
+    ) -> float:
+        """Returns the percentage of duplicate rows in the dataset, found from row hashes
+        unless the run already did."""
+        if duplicates is None:
+            duplicates = DuplicateDetector.detect(dataframe)
+        return duplicates.percentage
 
     @staticmethod
-    def profile_dataset(dataframe: pd.DataFrame) -> dict:
+    def profile_dataset(
+        dataframe: pd.DataFrame, duplicates: Optional[DuplicateRows] = None
+    ) -> dict:
         """Generates a structured profile summary of the dataset."""
+        if duplicates is None:
+            duplicates = DuplicateDetector.detect(dataframe)
         num_columns = DatasetProfiler.get_columns(dataframe)
         num_observations = DatasetProfiler.get_num_observations(dataframe)
         missing_cell_percentage = DatasetProfiler.get_missing_cell_percentage(dataframe)
-        duplicate_row_percentage = DatasetProfiler.get_duplicate_row_percentage(dataframe)
+        duplicate_row_percentage = DatasetProfiler.get_duplicate_row_percentage(
+            dataframe, duplicates
+        )
 
         return {
             "num_columns": num_columns,
             "num_observations": num_observations,
             "missing_cell_percentage": missing_cell_percentage,
             "duplicate_row_percentage": duplicate_row_percentage,
+            "duplicates": duplicates.to_dict(),
         }
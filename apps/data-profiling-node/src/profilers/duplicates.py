@@ -0,0 +1,193 @@
+import logging
+import numbers as numbers_abc
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.profilers.sketches import HyperLogLog
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Most repeated duplicate groups reported, and row positions listed per group
+PROFILING_DUPLICATE_GROUPS = int(os.environ.get("PROFILING_DUPLICATE_GROUPS", "10"))
+PROFILING_DUPLICATE_GROUP_ROWS = int(os.environ.get("PROFILING_DUPLICATE_GROUP_ROWS", "5"))
+
+
+def _float_hashes(values: np.ndarray) -> np.ndarray:
+    # adding 0.0 turns -0.0 into 0.0, which pandas also treats as equal
+    return pd.util.hash_array(values.astype(np.float64) + 0.0)
+
+
+def _column_hashes(series: pd.Series) -> np.ndarray:
+    """
+    64-bit hashes of a column's values, equal where DataFrame.duplicated sees equal values
+    and independent of the numeric dtype the chunk was read with: numbers and booleans hash
+    as their float64 value, missing values alike whatever their marker, and text as itself,
+    so "01234" and 1234 stay different values.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_numeric_dtype(dtype):
+        hashes = _float_hashes(series.to_numpy(dtype=np.float64, na_value=np.nan))
+        if isinstance(dtype, np.dtype) and dtype.kind in "iu":
+            # integers float64 cannot hold exactly keep their own hash
+            integers = series.to_numpy()
+            inexact = (integers > 2**53) | (integers < -(2**53))
+            if inexact.any():
+                hashes[inexact] = pd.util.hash_array(integers[inexact])
+        return hashes
+
+    # each distinct value is hashed once, missing values get code -1
+    codes, values = pd.factorize(series)
+    values = np.asarray(values, dtype=object)
+    kind = pd.api.types.infer_dtype(values, skipna=False)
+    if kind in ("string", "bytes", "empty"):
+        numbers = np.zeros(len(values), dtype=bool)
+    elif kind in ("integer", "floating", "mixed-integer-float", "boolean"):
+        numbers = np.ones(len(values), dtype=bool)
+    else:
+        # an object column mixing numbers with other values, where 1 == 1.0 == True
+        numbers = np.fromiter(
+            (isinstance(value, (numbers_abc.Real, np.bool_)) for value in values),
+            dtype=bool,
+            count=len(values),
+        )
+    hashes = np.empty(len(values) + 1, dtype=np.uint64)
+    hashes[-1] = _float_hashes(np.array([np.nan]))[0]
+    hashes[:-1][numbers] = _float_hashes(values[numbers])
+    hashes[:-1][~numbers] = pd.util.hash_array(values[~numbers].astype(str))
+    return hashes[codes]
+
+
+def row_hashes(chunk: pd.DataFrame) -> np.ndarray:
+    """
+    64-bit hashes of a chunk's rows, equal for equal rows of chunks read with other dtypes,
+    e.g. an int64 column that becomes float64 once a chunk holds missing values.
+    """
+    hashes = np.full(len(chunk), 0x345678, dtype=np.uint64)
+    multiplier = np.uint64(1000003)
+    for position in range(chunk.shape[1]):
+        # the column hashes are folded in order, as pandas combines them
+        hashes ^= _column_hashes(chunk.iloc[:, position])
+        hashes *= multiplier
+        multiplier += np.uint64(82520 + 2 * (chunk.shape[1] - position))
+    return hashes
+
+
+@dataclass
+class DuplicateRows:
+    """
+    Duplicate rows of a dataset, found once and shared by every part of the profiling run.
+
+    Attributes:
+        rows (int): Rows in the dataset.
+        duplicate_rows (int): Rows repeating an earlier row, as DataFrame.duplicated counts them.
+        groups (list): The most repeated rows, most frequent first, as {"count", "rows"} with
+            the positions of the first few copies. Empty for estimates.
+        exact (bool): False when duplicate_rows is estimated from a distinct count sketch.
+        error (float): Standard error of an estimated duplicate_rows, in rows.
+    """
+
+    rows: int
+    duplicate_rows: int
+    groups: list = field(default_factory=list)
+    exact: bool = True
+    error: float = 0.0
+
+    @property
+    def percentage(self) -> float:
+        return (self.duplicate_rows / self.rows) * 100 if self.rows > 0 else 0
+
+    def to_dict(self) -> dict:
+        return {
+            "duplicate_rows": self.duplicate_rows,
+            "exact": self.exact,
+            "error": self.error,
+            "groups": self.groups,
+        }
+
+
+class DuplicateDetector:
+    """
+    Finds duplicate rows from 64-bit row hashes, one chunk at a time.
+
+    Rows are hashed column by column with row_hashes, so no multi-column factorization is
+    built however wide the table is, and equal rows of chunks inferred with different dtypes
+    hash alike. The exact detector keeps 8 bytes per
+    row and sorts the hashes once at the end, which also yields the most repeated groups; the
+    approximate one feeds a HyperLogLog and stays in fixed memory. Two different rows share a
+    hash with a probability of about rows**2 / 2**65, negligible below billions of rows.
+
+    Args:
+        approximate (bool): Estimate the count in fixed memory instead of keeping the hashes.
+        precision (int): Register bits of the HyperLogLog used when approximate.
+    """
+
+    def __init__(self, approximate: bool = False, precision: int = 14):
+        self.rows = 0
+        self._hashes: list[np.ndarray] = []
+        self._distinct: Optional[HyperLogLog] = HyperLogLog(precision) if approximate else None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Adds the next rows of the dataset.
+        """
+        self.update_hashes(row_hashes(chunk))
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Adds the next rows of the dataset, already hashed with row_hashes.
+        """
+        self.rows += len(hashes)
+        if self._distinct is not None:
+            self._distinct.update_hashes(hashes)
+        else:
+            self._hashes.append(hashes)
+
+    def result(self) -> DuplicateRows:
+        if self._distinct is not None:
+            distinct = self._distinct.estimate()
+            return DuplicateRows(
+                rows=self.rows,
+                duplicate_rows=max(0, self.rows - round(distinct)),
+                exact=False,
+                error=self._distinct.relative_error * min(distinct, self.rows),
+            )
+
+        if not self.rows:
+            return DuplicateRows(rows=0, duplicate_rows=0)
+        hashes = np.concatenate(self._hashes)
+        order = np.argsort(hashes, kind="stable")
+        ordered = hashes[order]
+        # copies of a row sit next to each other once sorted, in their original row order
+        starts = np.flatnonzero(np.r_[True, ordered[1:] != ordered[:-1]])
+        lengths = np.diff(np.r_[starts, len(hashes)])
+
+        groups = []
+        repeated = np.flatnonzero(lengths > 1)
+        top = repeated[np.argsort(-lengths[repeated], kind="stable")][:PROFILING_DUPLICATE_GROUPS]
+        for group in top:
+            start = starts[group]
+            positions = order[start : start + min(lengths[group], PROFILING_DUPLICATE_GROUP_ROWS)]
+            groups.append({"count": int(lengths[group]), "rows": positions.tolist()})
+
+        return DuplicateRows(
+            rows=self.rows, duplicate_rows=int(self.rows - len(lengths)), groups=groups
+        )
+
+    @staticmethod
+    def detect(dataframe: pd.DataFrame) -> DuplicateRows:
+        """
+        Returns the exact duplicate rows of an in-memory dataframe.
+        """
+        detector = DuplicateDetector()
+        detector.update(dataframe)
+        return detector.result()
@@ -0,0 +1,238 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Cells per float64 block the numeric columns are profiled in; the block, its sorted copy and a
+# few temporaries of the same shape are held at once
+PROFILING_STATS_BLOCK_CELLS = int(
+    os.environ.get("PROFILING_STATS_BLOCK_CELLS", str(8 * 1024 * 1024))
+)
+
+QUARTILES = np.array([0.25, 0.5, 0.75])
+
+# Keys of a numeric column's "summary", in order
+NUMERICAL_SUMMARY_KEYS = (
+    "mean",
+    "median",
+    "mode",
+    "min",
+    "max",
+    "range",
+    "variance",
+    "std",
+    "skewness",
+    "kurtosis",
+)
+
+
+def _quantiles(ordered: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """
+    Linearly interpolated quantiles, like pandas, of columns sorted with NaN last.
+
+    Returns:
+        np.ndarray: One row per quantile in QUARTILES, one entry per column.
+    """
+    columns = np.arange(ordered.shape[0])
+    last = np.maximum(counts - 1, 0)
+    positions = QUARTILES[:, None] * last
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, last)
+    low_values = ordered[columns, lower]
+    high_values = ordered[columns, upper]
+    quantiles = low_values + (high_values - low_values) * (positions - lower)
+    return np.where(counts > 0, quantiles, np.nan)
+
+
+def _modes(ordered: np.ndarray) -> list[np.ndarray]:
+    """
+    All most frequent values of each column sorted with NaN last, in ascending order like
+    pandas' Series.mode.
+    """
+    width, rows = ordered.shape
+    flat = ordered.ravel()
+    # a run of equal values starts wherever the value changes and at every column's first row
+    starts = np.empty(flat.size, dtype=bool)
+    starts[0] = True
+    np.not_equal(flat[1:], flat[:-1], out=starts[1:])
+    starts[::rows] = True
+    run_starts = np.flatnonzero(starts)
+    run_lengths = np.diff(run_starts, append=flat.size)
+    run_values = flat[run_starts]
+    run_columns = run_starts // rows
+    # missing values never count as a mode
+    run_lengths[np.isnan(run_values)] = 0
+
+    top = np.zeros(width, dtype=run_lengths.dtype)
+    np.maximum.at(top, run_columns, run_lengths)
+    is_mode = (run_lengths == top[run_columns]) & (run_lengths > 0)
+    split = np.searchsorted(run_columns[is_mode], np.arange(1, width))
+    return np.split(run_values[is_mode], split)
+
+
+def _count_below(ordered: np.ndarray, counts: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """
+    Number of values of each sorted column strictly below its bound, by binary search.
+    """
+    return np.array(
+        [
+            np.searchsorted(values[:count], bound)
+            for values, count, bound in zip(ordered, counts, bounds)
+        ]
+    )
+
+
+def _count_above(ordered: np.ndarray, counts: np.ndarray, bounds: np.ndarray) -> np.ndarray:
+    """
+    Number of values of each sorted column strictly above its bound, by binary search.
+    """
+    return counts - np.array(
+        [
+            np.searchsorted(values[:count], bound, side="right")
+            for values, count, bound in zip(ordered, counts, bounds)
+        ]
+    )
+
+
+def _block_profiles(block: np.ndarray) -> dict:
+    """
+    Statistics of every column of a float64 block holding one column per row, with NaN for
+    missing values.
+
+    Returns:
+        dict: Arrays with one entry per column, plus "modes", a list of arrays.
+    """
+    if not block.shape[1]:
+        # an empty frame profiles like a column holding only a missing value
+        block = np.full((block.shape[0], 1), np.nan)
+    valid = ~np.isnan(block)
+    counts = valid.sum(axis=1)
+    safe_counts = np.maximum(counts, 1)
+
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        mean = np.where(valid, block, 0.0).sum(axis=1) / safe_counts
+        deviations = block - mean[:, None]
+        deviations[~valid] = 0.0
+        squared = deviations * deviations
+        m2 = squared.sum(axis=1)
+        m3 = (squared * deviations).sum(axis=1)
+        m4 = (squared * squared).sum(axis=1)
+        del deviations, squared, valid
+
+        n = counts.astype(np.float64)
+        variance = np.where(counts > 1, m2 / np.maximum(n - 1, 1), np.nan)
+        # adjusted Fisher-Pearson skewness and bias corrected excess kurtosis, like pandas
+        skewness = np.where(m2 == 0, 0.0, (n * np.sqrt(n - 1) / (n - 2)) * (m3 / m2**1.5))
+        skewness = np.where(counts < 3, np.nan, skewness)
+        kurtosis = np.where(
+            m2 == 0,
+            0.0,
+            (n * (n + 1) * (n - 1) * m4) / ((n - 2) * (n - 3) * m2**2)
+            - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)),
+        )
+        kurtosis = np.where(counts < 4, np.nan, kurtosis)
+
+        # sorting puts NaN last, leaving the values of each column in its first count entries
+        ordered = np.sort(block, axis=1)
+        columns = np.arange(block.shape[0])
+        minimum = np.where(counts > 0, ordered[:, 0], np.nan)
+        maximum = np.where(counts > 0, ordered[columns, np.maximum(counts - 1, 0)], np.nan)
+        first_quartile, median, third_quartile = _quantiles(ordered, counts)
+
+        # the sorted values also count the outliers, one binary search per bound and column
+        left_whisker = first_quartile - (1.5 * first_quartile)
+        right_whisker = third_quartile + (1.5 * third_quartile)
+        # z-scores against the population standard deviation, like scipy's zscore
+        population_std = np.sqrt(m2 / safe_counts)
+        z_left = mean - 3 * population_std
+        z_right = mean + 3 * population_std
+
+        return {
+            "mean": np.where(counts > 0, mean, np.nan),
+            "median": median,
+            "modes": _modes(ordered),
+            "min": minimum,
+            "max": maximum,
+            "variance": variance,
+            "std": np.sqrt(variance),
+            "skewness": skewness,
+            "kurtosis": kurtosis,
+            "Q1": first_quartile,
+            "Q3": third_quartile,
+            "iqr_left": _count_below(ordered, counts, left_whisker),
+            "iqr_right": _count_above(ordered, counts, right_whisker),
+            # a column without spread has no z-scores, so no z-score outliers either
+            "z_left": np.where(population_std > 0, _count_below(ordered, counts, z_left), 0),
+            "z_right": np.where(population_std > 0, _count_above(ordered, counts, z_right), 0),
+        }
+
+
+def profile_numeric_block(dataframe: pd.DataFrame, numerical_columns: list[str]) -> dict:
+    """
+    Summaries and outlier counts of numeric columns, computed a block of columns at a time.
+
+    The columns are converted to one float64 matrix and every statistic is taken along its
+    rows at once, instead of a dozen scans per column. Missing values are left out of every
+    statistic, including the z-scores. Mode values keep the column's own type.
+
+    Args:
+        dataframe (pd.DataFrame): The dataframe containing numerical columns.
+        numerical_columns (list[str]): List of numerical column names.
+
+    Returns:
+        dict: Per column, {"summary": ..., "outliers": ...} in ColumnProfiler's layout.
+    """
+    profiles = {}
+    rows = max(len(dataframe), 1)
+    width = max(1, PROFILING_STATS_BLOCK_CELLS // rows)
+    for start in range(0, len(numerical_columns), width):
+        columns = numerical_columns[start : start + width]
+        block = np.empty((len(columns), len(dataframe)), dtype=np.float64)
+        for index, col in enumerate(columns):
+            block[index] = dataframe[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        stats = _block_profiles(block)
+        del block
+
+        for index, col in enumerate(columns):
+            dtype = dataframe[col].dtype
+            modes = stats["modes"][index]
+            if pd.api.types.is_integer_dtype(dtype):
+                modes = modes.astype(np.int64)
+            minimum, maximum = float(stats["min"][index]), float(stats["max"][index])
+            profiles[col] = {
+                "summary": {
+                    "mean": float(stats["mean"][index]),
+                    "median": float(stats["median"][index]),
+                    "mode": modes.tolist(),
+                    "min": minimum,
+                    "max": maximum,
+                    "range": maximum - minimum,
+                    "variance": float(stats["variance"][index]),
+                    "std": float(stats["std"][index]),
+                    "skewness": float(stats["skewness"][index]),
+                    "kurtosis": float(stats["kurtosis"][index]),
+                },
+                "outliers": {
+                    "iqr": {
+                        "Q1": float(stats["Q1"][index]),
+                        "Q3": float(stats["Q3"][index]),
+                        "IQR": float(stats["Q3"][index] - stats["Q1"][index]),
+                        "left_outliers": int(stats["iqr_left"][index]),
+                        "right_outliers": int(stats["iqr_right"][index]),
+                    },
+                    "z-score": {
+                        "left_outliers": int(stats["z_left"][index]),
+                        "right_outliers": int(stats["z_right"][index]),
+                    },
+                },
+            }
+    return profiles
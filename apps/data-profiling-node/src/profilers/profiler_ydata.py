@@ -1,7 +1,33 @@
+import logging
+import os
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 from ydata_profiling import ProfileReport
+from ydata_profiling.model.alerts import DuplicatesAlert
 
 from src.data_utils import YDataProfilingSchema
+from src.profilers.correlations import auto_correlations
+from src.profilers.duplicates import DuplicateRows
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# How much of ydata's report is built: "full" profiles every row with every feature,
+# "sampled" does the same on a uniform row sample, and "minimal" builds the per-column report
+# on the sample, with correlations computed by auto_correlations. "auto" picks the first tier
+# whose frame fits in YDATA_FULL_MAX_CELLS, the cost of the full report growing with the rows
+# and the square of the columns.
+YDATA_PROFILING_TIERS = ("full", "sampled", "minimal")
+YDATA_PROFILING_TIER = os.environ.get("YDATA_PROFILING_TIER", "auto")
+YDATA_FULL_MAX_CELLS = int(os.environ.get("YDATA_FULL_MAX_CELLS", "1000000"))
+YDATA_SAMPLE_ROWS = int(os.environ.get("YDATA_SAMPLE_ROWS", "20000"))
 
 
 class YDataProfiler:
@@ -38,42 +64,151 @@ class YDataProfiler:
             raise ValueError("Unsupported file format")
 
     @staticmethod
-    def generate_eda_html(profile: ProfileReport, file_name: str) -> str:
+    def generate_eda_html(profile: ProfileReport) -> str:
         """
-        Generates an HTML report from the profile report.
+        Renders the profile report as an HTML page.
 
         Args:
             profile (ProfileReport): The profile report to be converted to HTML.
-            file_name (str): The name of the file to save the HTML report.
 
         Returns:
-            str: The path to the saved HTML report.
+            str: The HTML report.
+        """
+        return profile.to_html()
+
+    @staticmethod
+    def select_tier(rows: int, columns: int) -> str:
+        """
+        Returns the report tier for a dataframe of the given shape, see YDATA_PROFILING_TIER.
         """
-        html_file_path = f"{file_name}.html"
-        profile.to_file(html_file_path)
-        return html_file_path
+        if YDATA_PROFILING_TIER != "auto":
+            if YDATA_PROFILING_TIER not in YDATA_PROFILING_TIERS:
+                raise ValueError(f"Unknown ydata profiling tier: {YDATA_PROFILING_TIER}")
+            return YDATA_PROFILING_TIER
+        if rows * columns <= YDATA_FULL_MAX_CELLS:
+            return "full"
+        if min(rows, YDATA_SAMPLE_ROWS) * columns <= YDATA_FULL_MAX_CELLS:
+            return "sampled"
+        return "minimal"
+
+    @staticmethod
+    def _sample(dataframe: pd.DataFrame) -> pd.DataFrame:
+        """
+        Returns YDATA_SAMPLE_ROWS rows drawn uniformly, in their original order.
+        """
+        if len(dataframe) <= YDATA_SAMPLE_ROWS:
+            return dataframe
+        rng = np.random.default_rng(0)
+        positions = np.sort(rng.choice(len(dataframe), YDATA_SAMPLE_ROWS, replace=False))
+        return dataframe.iloc[positions]
+
+    @staticmethod
+    def _add_correlations(profile: ProfileReport, dataframe: pd.DataFrame) -> None:
+        """
+        Puts the "auto" correlations, which minimal reports leave out, into the description.
+        Columns are selected from ydata's variable summaries as ydata itself does, which
+        needs the report to infer types like the full one, see generate_yprofile_report.
+        """
+        description = profile.get_description()
+        max_distinct = profile.config.categorical_maximum_correlation_distinct
+        numerical_columns = [
+            col
+            for col, summary in description.variables.items()
+            if summary["type"] in {"Numeric", "TimeSeries"} and summary["n_distinct"] > 1
+        ]
+        categorical_columns = [
+            col
+            for col, summary in description.variables.items()
+            if summary["type"] in {"Categorical", "Boolean"}
+            and 1 < summary["n_distinct"] <= max_distinct
+        ]
+        correlations = auto_correlations(
+            dataframe,
+            numerical_columns,
+            categorical_columns,
+            bins=profile.config.correlations["auto"].n_bins,
+        )
+        if correlations is not None:
+            description.correlations["auto"] = correlations
+
+    @staticmethod
+    def _use_duplicates(
+        profile: ProfileReport, dataframe: pd.DataFrame, duplicates: DuplicateRows
+    ) -> None:
+        """
+        Puts duplicate rows found by the profiling run into ydata's description, in place of
+        those ydata would find by grouping the frame on every column.
+
+        n_duplicates counts the rows repeating an earlier row, like the dataset profile. The
+        duplicates must have been found on the dataframe itself, as they are reported against
+        its row count and their group row positions refer to it.
+        """
+        description = profile.get_description()
+        description.table["n_duplicates"] = duplicates.duplicate_rows
+        description.table["p_duplicates"] = duplicates.percentage / 100
+        if duplicates.duplicate_rows:
+            # dataset alerts come first, as in ydata's own list
+            description.alerts.insert(0, DuplicatesAlert(values=description.table))
+
+        if duplicates.groups:
+            first_rows = [group["rows"][0] for group in duplicates.groups]
+            most_repeated = dataframe.iloc[first_rows].reset_index(drop=True)
+            most_repeated[profile.config.duplicates.key] = [
+                group["count"] for group in duplicates.groups
+            ]
+            description.duplicates = most_repeated
 
     @staticmethod
     def generate_yprofile_report(
-        dataframe: pd.DataFrame, title: str
+        dataframe: pd.DataFrame, title: str, duplicates: Optional[DuplicateRows] = None
     ) -> tuple[YDataProfilingSchema, str]:
         """
-        Generates a profile report for the given dataframe.
+        Generates a profile report for the given dataframe, in the tier select_tier picks for
+        its size.
 
         Args:
             dataframe (pd.DataFrame): The dataframe to be profiled.
             title (str): The title of the profile report.
+            duplicates (DuplicateRows, optional): Duplicate rows the profiling run already
+                found; ydata then skips its own duplicate detection and reports these. Sampled
+                tiers ignore them and let ydata count the duplicates of the sample, so the
+                counts stay consistent with the report's row count.
 
         Returns:
-            DataProfilingSchema: The generated profile report.
+            tuple: (YDataProfilingSchema, str) The generated profile report and its HTML page.
+                The report records its tier and, unless full, the rows it was built from.
         """
+        tier = YDataProfiler.select_tier(*dataframe.shape)
+        frame = dataframe if tier == "full" else YDataProfiler._sample(dataframe)
+        logger.info(f"YData profiling tier {tier} on {len(frame)} of {len(dataframe)} rows")
+
+        if duplicates is not None and duplicates.rows != len(frame):
+            duplicates = None
+
+        settings = {}
+        if tier == "minimal":
+            # minimal reports leave out correlations, which _add_correlations puts back;
+            # rendering is then mostly per-column plots, categorical value tables are kept.
+            # Types are still inferred, or low-cardinality strings would be Text and
+            # low-cardinality numbers Numeric, unlike in the full report.
+            settings = {
+                "minimal": True,
+                "infer_dtypes": True,
+                "plot": {"cat_freq": {"show": False}},
+            }
+        if duplicates is not None:
+            # no duplicate rows to list turns ydata's detection off
+            settings["duplicates"] = {"head": 0}
+
         # Generate the profile report
-        profile = ProfileReport(
-            dataframe, title=title
-        )  # minimal=True, will remove some features from the profile like correlations (which we need)
+        profile = ProfileReport(frame, title=title, **settings)
+        if tier == "minimal":
+            YDataProfiler._add_correlations(profile, frame)
+        if duplicates is not None:
+            YDataProfiler._use_duplicates(profile, frame, duplicates)
 
         # generate eda html report
-        eda_path = YDataProfiler.generate_eda_html(profile, title)
+        eda_html = YDataProfiler.generate_eda_html(profile)
 
         description = profile.get_description()
 
@@ -85,4 +220,6 @@ class YDataProfiler:
             else None,
             alerts=[str(alert) for alert in description.alerts],
             samples=description.sample,
-        ), eda_path
+            tier=tier,
+            sample_rows=None if tier == "full" else len(frame),
+        ), eda_html
@@ -0,0 +1,204 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+class KLLSketch:
+    """
+    Mergeable quantile sketch of Karnin, Lang and Liberty (2016).
+
+    Values are kept in levels of compactors, level h holding items of weight 2**h. A level
+    that outgrows its capacity is sorted and every other item, from a random start, moves up
+    one level. Capacities shrink by 2/3 per level below the top one, so the sketch holds
+    O(k log(n / k)) values for n updates, while a quantile's rank is off by about rank_error
+    times n.
+
+    Args:
+        k (int): Capacity of the top level; the rank error falls roughly as 1/k.
+        seed (int): Seed of the compaction coin flips.
+    """
+
+    def __init__(self, k: int = 200, seed: int = 0):
+        self.k = k
+        self.count = 0
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * (2 / 3) ** depth))
+
+    def update(self, values: np.ndarray) -> None:
+        """
+        Adds float values, missing ones are skipped.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def merge(self, other: "KLLSketch") -> None:
+        """
+        Adds everything another sketch has seen, e.g. one built from another chunk or worker.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+
+    def _compress(self) -> None:
+        # adding a level lowers the capacity of those below it, so repeat until all fit
+        compacted = True
+        while compacted:
+            compacted = False
+            for level in range(len(self.levels)):
+                items = self.levels[level]
+                if len(items) <= self._capacity(level):
+                    continue
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # with an odd number of items, the smallest one stays behind
+                odd = len(items) % 2
+                promoted = items[odd + int(self._rng.integers(2)) :: 2]
+                self.levels[level] = items[:odd]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                compacted = True
+
+    def quantiles(self, fractions) -> list[float]:
+        """
+        Returns the values at the given fractions of the ranks, NaN when nothing was added.
+        """
+        if not self.count:
+            return [math.nan for _ in fractions]
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(level), 2.0**height) for height, level in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        items, cumulative = items[order], np.cumsum(weights[order])
+        ranks = np.asarray(fractions, dtype=np.float64) * cumulative[-1]
+        positions = np.minimum(np.searchsorted(cumulative, ranks), len(items) - 1)
+        return [float(value) for value in items[positions]]
+
+    @property
+    def rank_error(self) -> float:
+        """
+        Fraction of the ranks a quantile may be off by; 0 while no value was compacted.
+        """
+        if len(self.levels) == 1:
+            return 0.0
+        # DataSketches' empirical single-sided bound at 99% confidence
+        return 2.446 / self.k**0.9433
+
+
+class HyperLogLog:
+    """
+    Mergeable distinct count estimate of Flajolet et al. (2007) in 2**precision bytes.
+
+    Every value is hashed to 64 bits; the first precision bits pick a register, which keeps
+    the longest run of leading zeros seen in the remaining bits. Small counts fall back to
+    linear counting over the empty registers.
+
+    Args:
+        precision (int): Number of register bits, between 11 and 18.
+    """
+
+    def __init__(self, precision: int = 14):
+        if not 11 <= precision <= 18:
+            raise ValueError(f"HyperLogLog precision must be between 11 and 18, not {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, series: pd.Series) -> None:
+        """
+        Adds the non-missing values of a column.
+        """
+        self.update_hashes(pd.util.hash_pandas_object(series.dropna(), index=False).to_numpy())
+
+    def update_hashes(self, hashes: np.ndarray) -> None:
+        """
+        Adds values already hashed to uint64, e.g. whole rows.
+        """
+        if not len(hashes):
+            return
+        bits = 64 - self.precision
+        index = (hashes >> np.uint64(bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << bits) - 1)
+        # 1 + leading zeros of the remaining bits; float64 holds them exactly below 2**53
+        rank = np.full(len(hashes), bits + 1, dtype=np.uint8)
+        present = rest != 0
+        rank[present] = bits - np.floor(np.log2(rest[present].astype(np.float64))).astype(
+            np.uint8
+        )
+        np.maximum.at(self.registers, index, rank)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Only HyperLogLog sketches of the same precision can be merged")
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and empty:
+            return m * math.log(m / empty)
+        return estimate
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of the estimate relative to the true count."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+
+class FrequentItems:
+    """
+    Mergeable Misra-Gries summary of the most frequent values (Agarwal et al. 2012).
+
+    Keeps at most capacity values. When more are tracked, the (capacity + 1)-th largest count
+    is subtracted from every count and values left without a count are dropped. A reported
+    count is therefore at most error below the true one, and error never exceeds
+    total / (capacity + 1); every value more frequent than that is kept.
+
+    Args:
+        capacity (int): Number of values tracked.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.error = 0
+
+    def update(self, counts: dict) -> None:
+        """
+        Adds exact value counts, e.g. a chunk's value_counts.
+        """
+        self.counts.update(counts)
+        self.total += sum(counts.values())
+        self._prune()
+
+    def merge(self, other: "FrequentItems") -> None:
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.error += other.error
+        self._prune()
+
+    def _prune(self) -> None:
+        if len(self.counts) <= self.capacity:
+            return
+        counts = np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts))
+        offset = int(np.partition(counts, len(counts) - self.capacity - 1)[-self.capacity - 1])
+        self.error += offset
+        self.counts = Counter(
+            {value: count - offset for value, count in self.counts.items() if count > offset}
+        )
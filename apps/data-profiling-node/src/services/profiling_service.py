@@ -1,19 +1,24 @@
 from typing import Optional
 import pandas as pd
 import logging
+import os
 import re
-import requests
 import uuid
-from io import BytesIO, StringIO
 
-from urllib.parse import urlparse
-
-from src.data_utils import Dataset, serialize
+from src.data_utils import Dataset, serialize, load_dataframe_from_url
+from src.data_utils.artifacts import ArtifactWriter
+from src.data_utils.cancellation import CancellationToken
+from src.data_utils.compaction import apply_frame_policy
+from src.data_utils.loader import iter_dataframe_chunks_from_url, read_dataframe
+from src.data_utils.progress import ProgressReporter
+from src.data_utils.columnar import PARQUET_CONTENT_TYPE, PARQUET_EXTENSION, to_parquet_buffer
 from src.services.s3_service import S3Service
 
 from src.profilers.data_set_profiling import DatasetProfiler
 from src.profilers.column_profiling import ColumnProfiler
 from src.profilers.profiler_ydata import YDataProfiler
+from src.profilers.chunked_profiling import ChunkedProfiler, PROFILING_CHUNK_ROWS
+from src.profilers.duplicates import DuplicateDetector
 
 # Logger Config
 logging.basicConfig(
@@ -23,6 +28,11 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+# Datasets larger than this (Dataset.size, in bytes) are profiled chunk by chunk
+CHUNKED_PROFILING_MIN_BYTES = int(
+    os.environ.get("CHUNKED_PROFILING_MIN_BYTES", str(1024 * 1024 * 1024))
+)
+
 
 class ProfilingService:
     """
@@ -33,79 +43,63 @@ class ProfilingService:
     @staticmethod
     def load_dataframe_from_file(file_path: str) -> pd.DataFrame:
         """
-        Loads a DataFrame from a given file path. Supports CSV, XLSX, and Parquet files.
+        Loads a DataFrame from a given file path. Supports CSV, XLSX, and Parquet files,
+        recognized by their content rather than the file extension.
         """
-        if file_path.endswith(".csv"):
-            return pd.read_csv(file_path)
-        elif file_path.endswith(".xlsx"):
-            return pd.read_excel(file_path)
-        elif file_path.endswith(".parquet"):
-            return pd.read_parquet(file_path)
-        else:
-            raise ValueError("Unsupported file format: " + file_path)
+        with open(file_path, "rb") as f:
+            return read_dataframe(f, file_path)
 
     @staticmethod
     def load_dataframe_from_url(url: str) -> pd.DataFrame:
         """
         Loads a DataFrame from a URL, handling S3-style query parameters
-        and ambiguous content-type headers.
+        and ambiguous content-type headers. The body is streamed into the parser.
         """
-        logger.info(f"Loading data from URL: {url}")
-
-        response = requests.get(url)
-        response.raise_for_status()
-
-        # 1. Extract filename without query parameters
-        parsed_url = urlparse(url)
-        filepath = parsed_url.path  # /datasets/.../file.csv
-        filename = filepath.split("/")[-1].lower()  # file.csv
-
-        # 2. Get content-type (fallback to empty string)
-        content_type = response.headers.get("content-type", "").lower()
-
-        # 3. Determine file type
-        if filename.endswith(".csv") or "csv" in content_type:
-            return pd.read_csv(StringIO(response.text))
-        elif filename.endswith(".xlsx") or "excel" in content_type:
-            return pd.read_excel(BytesIO(response.content))
-        elif filename.endswith(".parquet") or "parquet" in content_type:
-            return pd.read_parquet(BytesIO(response.content))
-        else:
-            # 4. Fallback: Attempt to parse content directly
-            try:
-                # Try CSV first (common case)
-                return pd.read_csv(StringIO(response.text))
-            except pd.errors.ParserError:
-                try:
-                    # Try Excel
-                    return pd.read_excel(BytesIO(response.content))
-                except Exception:
-                    try:
-                        # Try Parquet
-                        return pd.read_parquet(BytesIO(response.content))
-                    except Exception as e:
-                        raise ValueError(
-                            f"Unsupported file format. Failed to parse content. URL: {url}"
-                        ) from e
+        return load_dataframe_from_url(url)
 
     @staticmethod
-    def profile(
-        *, title: str, file_name: Optional[str] = None, url: Optional[str] = None
-    ) -> tuple[dict, str]:
+    def load_dataframe(
+        *, file_name: Optional[str] = None, url: Optional[str] = None
+    ) -> pd.DataFrame:
         """
-        Loads the dataset from the URL and returns a combined profiling report.
+        Loads the dataset either from a local file or from a URL.
         """
         if not (file_name or url):
             raise ValueError("Either file_name or url must be provided.")
         if file_name:
-            df = ProfilingService.load_dataframe_from_file(file_name)
+            return ProfilingService.load_dataframe_from_file(file_name)
         elif url:
-            df = ProfilingService.load_dataframe_from_url(url)
+            return ProfilingService.load_dataframe_from_url(url)
         else:
             raise ValueError("No valid file or URL provided.")
 
-        # Dataset-level profiling
-        dataset_profile = DatasetProfiler.profile_dataset(df)
+    @staticmethod
+    def profile(
+        *,
+        title: str,
+        file_name: Optional[str] = None,
+        url: Optional[str] = None,
+        dataframe: Optional[pd.DataFrame] = None,
+        progress: Optional[ProgressReporter] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ) -> tuple[dict, str]:
+        """
+        Loads the dataset from the URL (unless an already loaded dataframe is given) and
+        returns a combined profiling report.
+
+        The dataset and column profiles are published to progress, when given, before the
+        much slower ydata report is generated. The cancellation token, when given, is checked
+        between the profiling stages.
+        """
+        if dataframe is not None:
+            df = dataframe
+        else:
+            df = ProfilingService.load_dataframe(file_name=file_name, url=url)
+
+        # Dataset-level profiling; duplicate rows are found once and shared with ydata
+        duplicates = DuplicateDetector.detect(df)
+        dataset_profile = DatasetProfiler.profile_dataset(df, duplicates)
+        ProfilingService._check(cancellation)
 
         # Column-level profiling
         column_classes = ColumnProfiler.classify_columns(df)
@@ -118,26 +112,91 @@ class ProfilingService:
             df, column_classes.get("numeric", [])
         )
         # Optional: adding datetime and mixed profiling as needed
+        column_profile = {
+            "classification": column_classes,
+            "categorical": categorical_profile,
+            "numerical": numerical_profile,
+        }
+        ProfilingService._publish_profiles(progress, dataset_profile, column_profile)
+        ProfilingService._check(cancellation)
 
         # YData profiling
-        ydata_result, eda_file_path = YDataProfiler.generate_yprofile_report(df, title)
-        logger.info(f"YData Profiling Report saved to: {eda_file_path}")
-        ydata_profile = serialize(ydata_result)
+        ydata_result, eda_html = YDataProfiler.generate_yprofile_report(df, title, duplicates)
+        logger.info(f"YData Profiling Report rendered, {len(eda_html)} characters")
+        ydata_profile = serialize(ydata_result, indent=None)
 
         return {
             "dataset_profile": dataset_profile,
-            "column_profile": {
-                "classification": column_classes,
-                "categorical": categorical_profile,
-                "numerical": numerical_profile,
-            },
+            "column_profile": column_profile,
             "ydata_profile": ydata_profile,
-        }, eda_file_path
+        }, eda_html
 
     @staticmethod
-    def profile_dataset(dataset: Dataset, s3_storage: S3Service) -> dict:
+    def profile_in_chunks(
+        *,
+        title: str,
+        url: str,
+        progress: Optional[ProgressReporter] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ) -> tuple[dict, str]:
+        """
+        Profiles a dataset too large to load by streaming it in row chunks.
+
+        Returns the same report structure as profile; ydata profiles a uniform row sample.
+        The cancellation token, when given, is checked between chunks.
+        """
+
+        def chunks():
+            chunks = iter_dataframe_chunks_from_url(url, PROFILING_CHUNK_ROWS)
+            return cancellation.checked(chunks) if cancellation is not None else chunks
+
+        dataset_profile, column_profile, sample, duplicates = ChunkedProfiler.profile(chunks)
+        logging.info(f"Categorical Profile: {column_profile['categorical']}")
+        ProfilingService._publish_profiles(progress, dataset_profile, column_profile)
+        ProfilingService._check(cancellation)
+
+        # YData profiling
+        # duplicates of all rows replace ydata's only when the sample holds every row; otherwise
+        # ydata counts the sample's, and the dataset profile keeps those of all rows
+        ydata_result, eda_html = YDataProfiler.generate_yprofile_report(
+            sample, title, duplicates
+        )
+        logger.info(f"YData Profiling Report rendered, {len(eda_html)} characters")
+        ydata_profile = serialize(ydata_result, indent=None)
+
+        return {
+            "dataset_profile": dataset_profile,
+            "column_profile": column_profile,
+            "ydata_profile": ydata_profile,
+        }, eda_html
+
+    @staticmethod
+    def _check(cancellation: Optional[CancellationToken]) -> None:
+        if cancellation is not None:
+            cancellation.raise_if_cancelled()
+
+    @staticmethod
+    def _publish_profiles(
+        progress: Optional[ProgressReporter], dataset_profile: dict, column_profile: dict
+    ) -> None:
+        if progress is None:
+            return
+        progress.partial("dataset_profile", dataset_profile)
+        progress.partial("column_profile", column_profile)
+        progress.progress("ydata_profiling")
+
+    @staticmethod
+    def profile_dataset(
+        dataset: Dataset,
+        s3_storage: S3Service,
+        progress: Optional[ProgressReporter] = None,
+        cancellation: Optional[CancellationToken] = None,
+    ) -> dict:
         """
         Profiles a Dataset object and returns a combined profiling report.
+
+        Parts of the report that are ready early are also published to progress, when given.
+        A cancelled job stops at the next stage boundary with JobCancelled.
         """
         try:
             # file_uri = storage_service.get_presigned_url(
@@ -150,26 +209,61 @@ class ProfilingService:
             logger.error(f"Error loading dataset from file {dataset.file}: {e}")
             raise e
 
-        logger.info(f"Profiling dataset: {dataset.name} from {file_uri}")
-
-        results, eda_file_path = ProfilingService.profile(
-            title=dataset.name, url=file_uri, file_name=None
-        )
-
         def sanitize_key(key: str) -> str:
             """Replace problematic characters in object keys"""
             return re.sub(r"[^a-zA-Z0-9!\-_\.\*\(\)]", "_", key)
 
+        if dataset.size and dataset.size > CHUNKED_PROFILING_MIN_BYTES:
+            logger.info(f"Profiling dataset: {dataset.name} from {file_uri} in chunks")
+            results, eda_html = ProfilingService.profile_in_chunks(
+                title=dataset.name, url=file_uri, progress=progress, cancellation=cancellation
+            )
+            # later stages fall back to the original upload
+            columnar_object_name, bytes_saved = None, {}
+            results["profiling_mode"] = "chunked"
+        else:
+            logger.info(f"Profiling dataset: {dataset.name} from {file_uri}")
+
+            # ydata computes ranges in the column dtype, so numeric columns keep their width here;
+            # this frame becomes the columnar copy generated code runs on, so no categories
+            df, bytes_saved = apply_frame_policy(
+                ProfilingService.load_dataframe(url=file_uri),
+                downcast_numeric=False,
+                category_max_ratio=0,
+            )
+            ProfilingService._check(cancellation)
+
+            try:
+                # convert the upload once to the columnar format the later stages read
+                columnar_object_name = sanitize_key(
+                    f"{uuid.uuid4()}_{dataset.name}{PARQUET_EXTENSION}"
+                )
+                s3_storage.upload_single_file(
+                    file_obj=to_parquet_buffer(df),
+                    filename=columnar_object_name,
+                    content_type=PARQUET_CONTENT_TYPE,
+                    key=columnar_object_name,
+                )
+
+                logger.info(f"Columnar dataset saved to storage: {columnar_object_name}")
+                if progress is not None:
+                    progress.partial("columnar_object_name", columnar_object_name)
+            except Exception as e:
+                logger.error(f"Error saving columnar dataset to storage: {e}")
+                raise e
+
+            results, eda_html = ProfilingService.profile(
+                title=dataset.name, dataframe=df, progress=progress, cancellation=cancellation
+            )
+            results["profiling_mode"] = "in_memory"
+        ProfilingService._check(cancellation)
+
         try:
-            # save eda file to storage
+            # stream the eda report to storage straight from memory
             eda_file_name = sanitize_key(f"{uuid.uuid4()}_{dataset.name}")
-            # storage_service.upload_file(
-            #     bucket_name="datasets", object_name=eda_file_name, file_path=eda_file_path
-            # )
-            s3_storage.upload_single_file_from_path(
-                path=eda_file_path,
-                key=eda_file_name,
-            )
+            with ArtifactWriter() as artifacts:
+                artifacts.create("eda", eda_file_name, "text/html").write_text(eda_html)
+                artifacts.upload(s3_storage)
 
             logger.info(f"EDA report saved to storage: {eda_file_name}")
         except Exception as e:
@@ -177,4 +271,6 @@ class ProfilingService:
             raise e
 
         results["eda_object_name"] = eda_file_name
+        results["columnar_object_name"] = columnar_object_name
+        results["bytes_saved"] = bytes_saved
         return results
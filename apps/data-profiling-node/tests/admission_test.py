@@ -0,0 +1,91 @@
+import unittest
+from unittest import mock
+
+from src.data_utils import admission
+from src.data_utils.admission import ADMIT, DEFER, ROUTE, AdmissionController
+from src.data_utils.scheduler import JobEstimate
+from src.data_utils.worker_pool import cores_per_worker
+
+GIB = 1024**3
+
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.used = 1 * GIB
+        self.load = 0.0
+        patches = (
+            mock.patch.object(admission, "memory_used", lambda: self.used),
+            mock.patch.object(admission.os, "getloadavg", lambda: (self.load, 0.0, 0.0)),
+            mock.patch.object(admission.os, "cpu_count", lambda: 4),
+            mock.patch.object(admission, "ADMISSION_ENABLED", True),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def controller(self, **options):
+        return AdmissionController(ceiling=10 * GIB, cpu_overcommit=1.5, **options)
+
+    def test_admits_jobs_that_fit(self):
+        self.assertEqual(self.controller().decide(JobEstimate(memory=4 * GIB, cpus=1)), ADMIT)
+
+    def test_defers_while_running_jobs_hold_the_memory(self):
+        controller = self.controller()
+        running = JobEstimate(memory=6 * GIB, cpus=1)
+        controller.admit(running)
+        # the running job has not reached its peak yet, its estimate still counts
+        self.assertEqual(controller.decide(JobEstimate(memory=4 * GIB)), DEFER)
+        self.assertEqual(controller.decide(JobEstimate(memory=2 * GIB)), ADMIT)
+
+        controller.release(running)
+        self.assertEqual(controller.decide(JobEstimate(memory=4 * GIB)), ADMIT)
+
+    def test_measured_usage_above_the_estimates_counts(self):
+        controller = self.controller()
+        controller.admit(JobEstimate(memory=1 * GIB))
+        self.used = 8 * GIB
+        self.assertEqual(controller.decide(JobEstimate(memory=3 * GIB)), DEFER)
+
+    def test_jobs_larger_than_the_node(self):
+        huge = JobEstimate(memory=20 * GIB)
+        self.assertEqual(self.controller(large_job_queue="q_large").decide(huge), ROUTE)
+
+        alone = self.controller()
+        # without a large-job queue it runs, but only on an idle node
+        self.assertEqual(alone.decide(huge), ADMIT)
+        alone.admit(JobEstimate(memory=1 * GIB))
+        self.assertEqual(alone.decide(huge), DEFER)
+
+    def test_defers_when_the_cpu_is_overcommitted(self):
+        controller = self.controller()
+        controller.admit(JobEstimate(cpus=4))
+        # 4 cores x 1.5 tolerate a load of 6
+        self.assertEqual(controller.decide(JobEstimate(cpus=2)), ADMIT)
+        self.assertEqual(controller.decide(JobEstimate(cpus=3)), DEFER)
+        self.load = 5.5
+        self.assertEqual(controller.decide(JobEstimate(cpus=1)), DEFER)
+
+    def test_jobs_on_their_share_of_the_cores_run_together(self):
+        controller = self.controller()
+        share = cores_per_worker(workers=2)
+        self.assertEqual(share, 2)
+        controller.admit(JobEstimate(cpus=share))
+        self.load = 2.0
+        self.assertEqual(controller.decide(JobEstimate(cpus=share)), ADMIT)
+
+        # jobs keeping every core busy would only run one at a time
+        greedy = self.controller()
+        greedy.admit(JobEstimate(cpus=4))
+        self.assertEqual(greedy.decide(JobEstimate(cpus=4)), DEFER)
+
+    def test_idle_node_ignores_the_load(self):
+        self.load = 50.0
+        self.assertEqual(self.controller().decide(JobEstimate(cpus=8)), ADMIT)
+
+    def test_disabled_admission_admits_everything(self):
+        with mock.patch.object(admission, "ADMISSION_ENABLED", False):
+            self.assertEqual(self.controller().decide(JobEstimate(memory=100 * GIB)), ADMIT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import io
+import math
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from src.profilers import chunked_profiling
+from src.profilers.chunked_profiling import ChunkedProfiler, MomentAccumulator
+from src.profilers.column_profiling import ColumnProfiler
+from src.profilers.data_set_profiling import DatasetProfiler
+from src.profilers.numeric_stats import profile_numeric_block
+
+
+def _csv() -> str:
+    rng = np.random.default_rng(0)
+    rows = 3000
+    dataframe = pd.DataFrame(
+        {
+            "amount": rng.lognormal(3, 1, rows).round(2),
+            "count": pd.array(rng.poisson(4, rows), dtype="Int64"),
+            "level": rng.choice(["low", "mid", "high"], rows),
+            "flag": rng.choice([True, False], rows),
+        }
+    )
+    # missing values in the later chunks only, which read "count" as float there
+    dataframe.loc[2500::3, "count"] = pd.NA
+    dataframe.loc[2000::5, "level"] = None
+    dataframe = pd.concat([dataframe, dataframe.iloc[:40]], ignore_index=True)
+    return dataframe.to_csv(index=False)
+
+
+class TestMomentAccumulator(unittest.TestCase):
+    def test_merged_moments_match_pandas(self):
+        rng = np.random.default_rng(0)
+        # a large offset makes raw power sums cancel, merged central moments must not
+        values = 1e9 + rng.gamma(2.0, 3.0, 10007)
+        accumulator = MomentAccumulator()
+        for part in np.array_split(values, [1, 2, 500, 501, 4000, 9000]):
+            accumulator.update(part)
+        accumulator.update(np.empty(0))
+
+        series = pd.Series(values)
+        self.assertEqual(accumulator.count, len(values))
+        self.assertAlmostEqual(accumulator.mean, series.mean(), delta=1e-6)
+        self.assertAlmostEqual(accumulator.variance / series.var(), 1, places=9)
+        self.assertAlmostEqual(accumulator.skewness, series.skew(), places=6)
+        self.assertAlmostEqual(accumulator.kurtosis, series.kurtosis(), places=6)
+        self.assertEqual((accumulator.min, accumulator.max), (values.min(), values.max()))
+        self.assertAlmostEqual(accumulator.population_std, values.std(), delta=1e-9)
+
+    def test_few_values(self):
+        accumulator = MomentAccumulator()
+        self.assertTrue(math.isnan(accumulator.variance))
+        accumulator.update(np.array([2.0, 2.0, 2.0]))
+        self.assertEqual((accumulator.variance, accumulator.skewness), (0.0, 0.0))
+        self.assertTrue(math.isnan(accumulator.kurtosis))
+
+
+class TestChunkedProfiler(unittest.TestCase):
+    def setUp(self):
+        self.csv = _csv()
+        self.dataframe = pd.read_csv(io.StringIO(self.csv))
+
+    def profile(self, **options):
+        def chunks():
+            return pd.read_csv(io.StringIO(self.csv), chunksize=700)
+
+        with mock.patch.object(chunked_profiling, "PROFILING_SAMPLE_ROWS", 100000):
+            return ChunkedProfiler.profile(chunks, **options)
+
+    def test_matches_the_in_memory_profile(self):
+        dataset_profile, column_profile, sample, duplicates = self.profile()
+        dataframe = self.dataframe
+
+        expected = DatasetProfiler.profile_dataset(dataframe)
+        self.assertEqual(dataset_profile["num_observations"], expected["num_observations"])
+        self.assertEqual(dataset_profile["num_columns"], expected["num_columns"])
+        self.assertAlmostEqual(
+            dataset_profile["missing_cell_percentage"], expected["missing_cell_percentage"]
+        )
+        # the repeated rows were read as int64 in the first chunk, as float64 in the last
+        self.assertEqual(duplicates.duplicate_rows, int(dataframe.duplicated().sum()))
+        self.assertEqual(dataset_profile["duplicates"], expected["duplicates"])
+        # the sample holds every row
+        self.assertEqual(len(sample), len(dataframe))
+
+        classes = ColumnProfiler.classify_columns(dataframe)
+        for kind in ("numeric", "boolean", "categorical", "datetime"):
+            self.assertEqual(
+                sorted(column_profile["classification"][kind]), sorted(classes[kind]), kind
+            )
+
+        numeric = profile_numeric_block(dataframe, classes["numeric"])
+        for col in classes["numeric"]:
+            with self.subTest(col):
+                actual, reference = column_profile["numerical"][col], numeric[col]
+                for key, value in reference["summary"].items():
+                    if key == "mode":
+                        self.assertEqual(actual["summary"][key], value)
+                    else:
+                        self.assertAlmostEqual(actual["summary"][key], value, places=6, msg=key)
+                self.assertEqual(actual["outliers"], reference["outliers"])
+
+        categorical = ColumnProfiler.profile_categorical_columns(dataframe, classes["categorical"])
+        self.assertEqual(column_profile["categorical"], categorical)
+
+    def test_sketches_estimate_within_their_bounds(self):
+        dataset_profile, column_profile, _, duplicates = self.profile(sketches=True)
+        self.assertFalse(duplicates.exact)
+        exact_duplicates = int(self.dataframe.duplicated().sum())
+        self.assertLess(abs(duplicates.duplicate_rows - exact_duplicates), 4 * duplicates.error + 1)
+        self.assertIn("error_bounds", dataset_profile)
+
+        summary = column_profile["numerical"]["amount"]["summary"]
+        median_rank = (self.dataframe["amount"] <= summary["median"]).mean()
+        self.assertLess(abs(median_rank - 0.5), summary["error_bounds"]["quantile_rank"] + 1e-3)
+
+        level = column_profile["categorical"]["level"]
+        exact = self.dataframe["level"].value_counts()
+        for value, count in level["category_counts"].items():
+            self.assertLessEqual(count, exact[value])
+            self.assertGreaterEqual(count, exact[value] - level["error_bounds"]["count"])
+
+    def test_empty_dataset(self):
+        with self.assertRaises(ValueError):
+            ChunkedProfiler.profile(lambda: iter(()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import gzip
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+import pika
+from src.data_utils import codec
+from src.data_utils.codec import (
+    GZIP_ENCODING,
+    JSON_CONTENT_TYPE,
+    MSGPACK_CONTENT_TYPES,
+    MessageDecodeError,
+    decode_message,
+    encode_message,
+)
+
+MESSAGE = {"dataset_id": "42", "scores": [0.5, 1.5], "nested": {"rows": 3, "ok": True}}
+
+
+class TestCodecRoundTrips(unittest.TestCase):
+    def test_json(self):
+        body, properties = encode_message(MESSAGE, codec="json", compression="")
+        self.assertEqual(properties.content_type, JSON_CONTENT_TYPE)
+        self.assertIsNone(properties.content_encoding)
+        self.assertEqual(properties.delivery_mode, 2)
+        self.assertEqual(decode_message(body, properties), MESSAGE)
+
+    def test_numpy_values_are_serialized(self):
+        body, properties = encode_message({"n": np.int64(3), "x": np.float64(0.25)}, "json", "")
+        self.assertEqual(decode_message(body, properties), {"n": 3, "x": 0.25})
+
+    def test_gzip_above_the_minimum_size(self):
+        message = {"values": list(range(1000))}
+        with mock.patch.object(codec, "MESSAGE_COMPRESSION_MIN_SIZE", 16):
+            body, properties = encode_message(message, codec="json", compression="gzip")
+        self.assertEqual(properties.content_encoding, GZIP_ENCODING)
+        self.assertEqual(json.loads(gzip.decompress(body)), message)
+        self.assertEqual(decode_message(body, properties), message)
+
+    def test_small_bodies_are_not_compressed(self):
+        with mock.patch.object(codec, "MESSAGE_COMPRESSION_MIN_SIZE", 1 << 20):
+            body, properties = encode_message(MESSAGE, codec="json", compression="gzip")
+        self.assertIsNone(properties.content_encoding)
+        self.assertEqual(decode_message(body, properties), MESSAGE)
+
+    def test_zstd_round_trip_or_gzip_fallback(self):
+        with mock.patch.object(codec, "MESSAGE_COMPRESSION_MIN_SIZE", 16):
+            body, properties = encode_message(MESSAGE, codec="json", compression="zstd")
+        expected = GZIP_ENCODING if codec.zstandard is None else "zstd"
+        self.assertEqual(properties.content_encoding, expected)
+        self.assertEqual(decode_message(body, properties), MESSAGE)
+
+    @unittest.skipIf(codec.msgpack is None, "msgpack is not installed")
+    def test_msgpack(self):
+        body, properties = encode_message(MESSAGE, codec="msgpack", compression="")
+        self.assertIn(properties.content_type, MSGPACK_CONTENT_TYPES)
+        self.assertEqual(decode_message(body, properties), MESSAGE)
+
+
+class TestCodecHeaders(unittest.TestCase):
+    def test_messages_without_headers_are_json(self):
+        body = json.dumps(MESSAGE).encode("utf-8")
+        self.assertEqual(decode_message(body), MESSAGE)
+        self.assertEqual(decode_message(body, pika.BasicProperties()), MESSAGE)
+
+    def test_nan_literals_of_older_producers(self):
+        self.assertTrue(np.isnan(decode_message(b'{"x": NaN}')["x"]))
+
+    def test_unavailable_codec_falls_back_to_json(self):
+        with mock.patch.object(codec, "msgpack", None):
+            body, properties = encode_message(MESSAGE, codec="msgpack", compression="")
+        self.assertEqual(properties.content_type, JSON_CONTENT_TYPE)
+        self.assertEqual(decode_message(body, properties), MESSAGE)
+
+    def test_unsupported_headers_are_rejected(self):
+        body = json.dumps(MESSAGE).encode("utf-8")
+        with self.assertRaises(MessageDecodeError):
+            decode_message(body, pika.BasicProperties(content_type="application/xml"))
+        with self.assertRaises(MessageDecodeError):
+            decode_message(body, pika.BasicProperties(content_encoding="br"))
+        unavailable = pika.BasicProperties(content_type=MSGPACK_CONTENT_TYPES[0])
+        with mock.patch.object(codec, "msgpack", None), self.assertRaises(MessageDecodeError):
+            decode_message(body, unavailable)
+
+    def test_corrupt_bodies_are_rejected(self):
+        properties = pika.BasicProperties(
+            content_type=JSON_CONTENT_TYPE, content_encoding=GZIP_ENCODING
+        )
+        with self.assertRaises(MessageDecodeError):
+            decode_message(b"not gzip", properties)
+
+
+if __name__ == "__main__":
+    unittest.main()
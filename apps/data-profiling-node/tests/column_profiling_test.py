@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from src.profilers import column_profiling
+from src.profilers.column_profiling import ColumnProfiler
+
+
+def _mixed_columns(classifications: dict) -> list:
+    return [col for entry in classifications["mixed"] for col in entry]
+
+
+class TestClassifyColumns(unittest.TestCase):
+    def setUp(self):
+        # small enough for every column below to be sampled
+        patcher = mock.patch.object(column_profiling, "PROFILING_CLASSIFICATION_SAMPLE_ROWS", 50)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_classes(self):
+        rows = 1000
+        rng = np.random.default_rng(0)
+        dataframe = pd.DataFrame(
+            {
+                "number": rng.normal(size=rows),
+                "flag": rng.choice([True, False], rows),
+                "yes_no": rng.choice(["true", "false"], rows),
+                "level": rng.choice(["low", "mid", "high"], rows),
+                "name": [f"name {row}" for row in range(rows)],
+                "date": pd.date_range("2020-01-01", periods=rows).strftime("%Y-%m-%d"),
+                "mixed": pd.Series(["one", 1, 2.5, "two"] * (rows // 4), dtype=object),
+            }
+        )
+        classifications = ColumnProfiler.classify_columns(dataframe)
+        self.assertEqual(classifications["numeric"], ["number"])
+        self.assertEqual(sorted(classifications["boolean"]), ["flag", "yes_no"])
+        self.assertEqual(sorted(classifications["categorical"]), ["level", "name"])
+        self.assertEqual(classifications["datetime"], ["date"])
+        self.assertEqual(_mixed_columns(classifications), ["mixed"])
+
+    def test_high_cardinality_text_with_missing_values_is_unclassified(self):
+        names = pd.Series([f"name {row}" for row in range(1000)], dtype=object)
+        names[::10] = None
+        classifications = ColumnProfiler.classify_columns(pd.DataFrame({"name": names}))
+        self.assertEqual(
+            [classifications[kind] for kind in ("categorical", "boolean", "datetime", "mixed")],
+            [[], [], [], []],
+        )
+
+    def test_mixed_values_outside_the_sample_are_found(self):
+        values = pd.Series([f"code {row % 20}" for row in range(10000)], dtype=object)
+        # one number between the sampled rows
+        sampled = ColumnProfiler._stratified_sample(values).index
+        position = next(row for row in range(len(values)) if row not in set(sampled))
+        values[position] = 7
+        classifications = ColumnProfiler.classify_columns(pd.DataFrame({"code": values}))
+        self.assertEqual(_mixed_columns(classifications), ["code"])
+        percentages = classifications["mixed"][0]["code"]
+        self.assertAlmostEqual(percentages["int"], 0.01)
+
+    def test_boolean_values_must_dominate_the_whole_column(self):
+        # the sample only sees booleans, the column is mostly other values
+        values = pd.Series(["maybe"] * 1000, dtype=object)
+        sampled = ColumnProfiler._stratified_sample(values).index
+        values[sampled] = "true"
+        classifications = ColumnProfiler.classify_columns(pd.DataFrame({"answer": values}))
+        self.assertEqual(classifications["boolean"], [])
+        self.assertEqual(classifications["categorical"], ["answer"])
+
+    def test_stratified_sample_spans_the_column(self):
+        series = pd.Series(np.arange(10000))
+        sample = ColumnProfiler._stratified_sample(series)
+        self.assertEqual(len(sample), 50)
+        # one row from each of the 50 equal slices
+        np.testing.assert_array_equal(sample.to_numpy() // 200, np.arange(50))
+        self.assertTrue(sample.equals(ColumnProfiler._stratified_sample(series)))
+
+
+if __name__ == "__main__":
+    unittest.main()
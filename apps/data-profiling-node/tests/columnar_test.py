@@ -0,0 +1,72 @@
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from src.data_utils.columnar import dataframe_to_table, to_parquet_buffer, write_parquet
+from src.data_utils.loader import read_dataframe, read_parquet_stream
+
+
+def _dataframe(rows: int = 1000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": rng.normal(100, 10, rows),
+            "level": rng.choice(["low", "mid", "high"], rows),
+            "when": pd.date_range("2020-01-01", periods=rows, freq="h"),
+            "flag": rng.choice([True, False], rows),
+        },
+        index=np.arange(rows) * 2,
+    )
+
+
+class TestColumnar(unittest.TestCase):
+    def test_round_trip(self):
+        dataframe = _dataframe()
+        loaded = pd.read_parquet(to_parquet_buffer(dataframe))
+        # the index is not stored
+        pd.testing.assert_frame_equal(loaded, dataframe.reset_index(drop=True))
+
+    def test_mixed_columns_are_stored_as_strings(self):
+        dataframe = pd.DataFrame(
+            {"mixed": pd.Series(["a", 1, 2.5, None], dtype=object), "number": [1, 2, 3, 4]}
+        )
+        table = dataframe_to_table(dataframe)
+        self.assertEqual(table.column_names, ["mixed", "number"])
+        self.assertEqual(table.column("mixed").to_pylist(), ["a", "1", "2.5", None])
+        self.assertEqual(table.column("number").to_pylist(), [1, 2, 3, 4])
+
+
+class TestProjection(unittest.TestCase):
+    def test_parquet_reads_only_the_requested_columns(self):
+        dataframe = _dataframe().reset_index(drop=True)
+        columns = ["level", "id"]
+        expected = dataframe[columns]
+
+        from_buffer = read_parquet_stream(to_parquet_buffer(dataframe), columns=columns)
+        pd.testing.assert_frame_equal(from_buffer, expected)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "dataset.parquet")
+            write_parquet(dataframe, path)
+            self.assertEqual(pq.ParquetFile(path).metadata.num_rows, len(dataframe))
+            # files on disk are memory-mapped through their name
+            with open(path, "rb") as handle:
+                from_file = read_dataframe(handle, path, columns=columns)
+        pd.testing.assert_frame_equal(from_file, expected)
+
+    def test_csv_parses_only_the_requested_columns(self):
+        dataframe = _dataframe().reset_index(drop=True)
+        payload = io.BytesIO(dataframe.to_csv(index=False).encode())
+        loaded = read_dataframe(payload, "dataset.csv", columns=["amount", "level"])
+        self.assertEqual(list(loaded.columns), ["amount", "level"])
+        pd.testing.assert_series_equal(loaded["level"], dataframe["level"])
+        np.testing.assert_allclose(loaded["amount"], dataframe["amount"])
+
+
+if __name__ == "__main__":
+    unittest.main()
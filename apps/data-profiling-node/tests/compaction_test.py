@@ -0,0 +1,99 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from src.data_utils import compaction
+from src.data_utils.columnar import dataframe_to_table
+from src.data_utils.compaction import STRING_DTYPE, apply_frame_policy, compact_dataframe
+from src.profilers.column_profiling import ColumnProfiler
+
+
+def _dataframe(rows: int = 1000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "small": rng.integers(0, 100, rows),
+            "signed": rng.integers(-1000, 1000, rows),
+            "halves": rng.integers(0, 10, rows) / 2,
+            "precise": rng.normal(size=rows),
+            "level": rng.choice(["low", "mid", "high"], rows),
+            "name": [f"name {row}" for row in range(rows)],
+            "mixed": pd.Series(["a", 1] * (rows // 2), dtype=object),
+            "flag": rng.choice([True, False], rows),
+        }
+    )
+
+
+class TestCompaction(unittest.TestCase):
+    def setUp(self):
+        previous = pd.get_option("mode.copy_on_write")
+        self.addCleanup(pd.set_option, "mode.copy_on_write", previous)
+
+    def test_dtypes_shrink_without_losing_values(self):
+        dataframe = _dataframe()
+        compacted, bytes_saved = compact_dataframe(dataframe)
+        self.assertEqual(
+            compacted.dtypes.astype(str).to_dict(),
+            {
+                "small": "int8",
+                "signed": "int16",
+                "halves": "float32",
+                "precise": "float64",
+                "level": "category",
+                "name": str(pd.api.types.pandas_dtype(STRING_DTYPE)),
+                "mixed": "object",
+                "flag": "bool",
+            },
+        )
+        self.assertGreater(bytes_saved["name"], 0)
+        self.assertEqual(bytes_saved["precise"], 0)
+        # the columnar copy holds the same values as the loaded frame, mixed ones as strings
+        stored = dataframe_to_table(compacted).to_pandas()
+        expected_stored = dataframe.assign(mixed=dataframe["mixed"].astype(str))
+        for col in dataframe.columns:
+            with self.subTest(col):
+                self.assertEqual(compacted[col].astype(object).tolist(), dataframe[col].tolist())
+                self.assertEqual(stored[col].astype(object).tolist(), expected_stored[col].tolist())
+
+    def test_options(self):
+        dataframe = _dataframe()
+        compacted, _ = compact_dataframe(dataframe, category_max_ratio=0, downcast_numeric=False)
+        self.assertEqual(compacted["level"].dtype, STRING_DTYPE)
+        self.assertEqual(compacted["small"].dtype, dataframe["small"].dtype)
+        self.assertEqual(compacted["halves"].dtype, np.float64)
+
+    def test_frame_policy(self):
+        dataframe = _dataframe()
+        compacted, bytes_saved = apply_frame_policy(dataframe)
+        self.assertTrue(pd.get_option("mode.copy_on_write"))
+        self.assertIsInstance(compacted["level"].dtype, pd.CategoricalDtype)
+        self.assertTrue(bytes_saved)
+
+        with mock.patch.object(compaction, "COMPACTION_ENABLED", False):
+            unchanged, bytes_saved = apply_frame_policy(dataframe)
+        self.assertIs(unchanged, dataframe)
+        self.assertEqual(bytes_saved, {})
+
+    def test_category_columns_are_stored_as_their_values(self):
+        dataframe = _dataframe()
+        categorical = dataframe.astype({"level": "category"})
+        table = dataframe_to_table(categorical)
+        self.assertEqual(table.schema.field("level").type, "string")
+        self.assertEqual(table.column("level").to_pylist(), dataframe["level"].tolist())
+        # the frame handed in is left untouched
+        self.assertIsInstance(categorical["level"].dtype, pd.CategoricalDtype)
+
+    def test_category_columns_summarise_like_text(self):
+        values = pd.Series(["low", "mid", "mid", None, "high", "mid"], dtype=object)
+        # a category that never occurs in the rows
+        categories = values.astype(pd.CategoricalDtype(["low", "mid", "high", "unused"]))
+        dataframe = pd.DataFrame({"text": values, "category": categories})
+        summaries = ColumnProfiler.profile_categorical_columns(dataframe, ["text", "category"])
+        self.assertEqual(summaries["category"], summaries["text"])
+        self.assertEqual(summaries["category"]["mode"], ["mid"])
+        self.assertEqual(summaries["category"]["cardinality"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
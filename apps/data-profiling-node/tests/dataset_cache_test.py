@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+import requests
+from src.data_utils.dataset_cache import DatasetCache
+from src.data_utils.loader import read_dataframe
+
+from tests.object_server import ObjectServer
+
+
+class TestDatasetCache(unittest.TestCase):
+    def setUp(self):
+        self.data = pd.DataFrame({"id": range(5000), "value": range(5000)}).to_csv().encode()
+        self.server = ObjectServer(self.data)
+        self.server.start(self)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = DatasetCache(root=directory.name, max_bytes=10 * len(self.data))
+
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+
+    def open(self, url: str) -> tuple[bytes, str]:
+        handle, content_type = self.cache.open(url, session=self.session)
+        with handle:
+            return handle.read(), content_type
+
+    def object_path(self, url: str) -> str:
+        name = self.cache._digest(self.cache.cache_key(url), self.server.etag)
+        return os.path.join(self.cache.objects_dir, name)
+
+    def objects(self) -> list:
+        return sorted(os.listdir(self.cache.objects_dir))
+
+    def test_unchanged_objects_are_revalidated(self):
+        self.assertEqual(self.open(self.server.url("/a.csv?token=1")), (self.data, "text/csv"))
+        stored = self.objects()
+        self.assertEqual(len(stored), 1)
+
+        self.server.requests.clear()
+        # a new presigned token addresses the same object
+        self.assertEqual(self.open(self.server.url("/a.csv?token=2")), (self.data, "text/csv"))
+        self.assertEqual(len(self.server.requests), 1)
+        self.assertEqual(self.server.requests[0]["If-None-Match"], '"v1"')
+        self.assertEqual(self.objects(), stored)
+
+    def test_changed_objects_replace_the_cached_copy(self):
+        self.open(self.server.url())
+        stored = self.objects()
+
+        self.server.data = self.data + b"5000,5000,5000\n"
+        self.server.etag = '"v2"'
+        self.assertEqual(self.open(self.server.url())[0], self.server.data)
+        # the stale version is removed
+        self.assertEqual(len(self.objects()), 1)
+        self.assertNotEqual(self.objects(), stored)
+
+    def test_cached_copies_are_read_in_place(self):
+        handle, _ = self.cache.open(self.server.url(), session=self.session)
+        self.assertEqual(handle.name, self.object_path(self.server.url()))
+        with handle:
+            loaded = read_dataframe(handle, self.server.url())
+        self.assertEqual(len(loaded), 5000)
+
+    def test_least_recently_used_objects_are_evicted(self):
+        self.cache.max_bytes = 2 * len(self.data)
+        first, second, third = (self.server.url(f"/{name}") for name in ("a", "b", "c"))
+        self.open(first)
+        self.open(second)
+        os.utime(self.object_path(second), (0, 0))
+        # reading the first object again keeps it, the second is the least recently used
+        self.open(first)
+        self.open(third)
+        self.assertFalse(os.path.exists(self.object_path(second)))
+        self.assertEqual(len(self.objects()), 2)
+
+        self.server.requests.clear()
+        self.open(first)
+        self.open(third)
+        # both were revalidated, neither was downloaded again
+        self.assertEqual(
+            [request.get("If-None-Match") for request in self.server.requests], ['"v1"'] * 2
+        )
+        self.open(second)
+        self.assertNotIn("If-None-Match", self.server.requests[-1])
+
+    def test_objects_evicted_during_revalidation_are_downloaded_again(self):
+        url = self.server.url()
+        self.open(url)
+        (stored,) = self.objects()
+
+        def evict(handler):
+            # another process evicts the copy while it is being revalidated
+            if handler.headers.get("If-None-Match"):
+                os.unlink(os.path.join(self.cache.objects_dir, stored))
+
+        self.server.on_request = evict
+        self.server.requests.clear()
+        self.assertEqual(self.open(url)[0], self.data)
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertNotIn("If-None-Match", self.server.requests[1])
+        self.assertEqual(self.objects(), [stored])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from src.profilers.duplicates import DuplicateDetector, row_hashes
+
+
+class TestDuplicateDetector(unittest.TestCase):
+    def test_matches_pandas_in_memory(self):
+        rng = np.random.default_rng(0)
+        dataframe = pd.DataFrame(
+            {"a": rng.integers(0, 4, 2000), "b": rng.choice(["x", "y", None], 2000)}
+        )
+        duplicates = DuplicateDetector.detect(dataframe)
+        self.assertEqual(duplicates.rows, 2000)
+        self.assertEqual(duplicates.duplicate_rows, int(dataframe.duplicated().sum()))
+        self.assertAlmostEqual(duplicates.percentage, dataframe.duplicated().mean() * 100)
+
+    def test_groups_list_the_most_repeated_rows(self):
+        dataframe = pd.DataFrame({"a": [1, 2, 1, 3, 1, 2]})
+        groups = DuplicateDetector.detect(dataframe).groups
+        self.assertEqual(groups[0], {"count": 3, "rows": [0, 2, 4]})
+        self.assertEqual(groups[1], {"count": 2, "rows": [1, 5]})
+
+    def test_chunks_read_with_different_dtypes(self):
+        # the second chunk holds missing values, so pandas reads its integers as floats and
+        # its booleans as objects
+        first = pd.DataFrame({"n": [1, 2, 3], "s": ["a", "b", "c"], "b": [True, False, True]})
+        second = pd.DataFrame(
+            {
+                "n": [1.0, np.nan, 3.0],
+                "s": ["a", None, "c"],
+                "b": pd.Series([True, None, True], dtype=object),
+            }
+        )
+        detector = DuplicateDetector()
+        detector.update(first)
+        detector.update(second)
+        duplicates = detector.result()
+        self.assertEqual(duplicates.duplicate_rows, 2)
+        self.assertEqual([group["rows"] for group in duplicates.groups], [[0, 3], [2, 5]])
+
+    def test_missing_markers_and_numeric_dtypes_hash_alike(self):
+        numbers = pd.DataFrame({"v": [1234, np.nan]})
+        integers = pd.DataFrame({"v": pd.array([1234, None], dtype="Int64")})
+        categories = pd.DataFrame({"v": pd.Categorical([1234, None])})
+        self.assertEqual(row_hashes(numbers).tolist(), row_hashes(integers).tolist())
+        self.assertEqual(row_hashes(numbers).tolist(), row_hashes(categories).tolist())
+        text = pd.DataFrame({"v": pd.Series(["1234", None], dtype=object)})
+        self.assertEqual(
+            row_hashes(text).tolist(),
+            row_hashes(pd.DataFrame({"v": pd.Categorical(["1234", None])})).tolist(),
+        )
+
+    def test_text_is_not_read_as_numbers(self):
+        cases = {
+            "zero padded and exponent form": pd.DataFrame(
+                {"zip": ["01234", "1234", "1e3", "1000"], "id": ["a", "a", "b", "b"]}
+            ),
+            "signed zeros": pd.DataFrame({"v": [0.0, -0.0, 1.0]}),
+            "text next to numbers": pd.DataFrame(
+                {"v": pd.Series(["1", 1, 1.0, True], dtype=object)}
+            ),
+            "large integers": pd.DataFrame({"v": [2**53, 2**53 + 1]}),
+        }
+        for name, dataframe in cases.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    DuplicateDetector.detect(dataframe).duplicate_rows,
+                    int(dataframe.duplicated().sum()),
+                )
+
+    def test_column_order_matters(self):
+        dataframe = pd.DataFrame({"a": [1, 2], "b": [2, 1]})
+        hashes = row_hashes(dataframe)
+        self.assertNotEqual(hashes[0], hashes[1])
+
+    def test_approximate_count(self):
+        dataframe = pd.DataFrame({"a": np.arange(20000) % 5000})
+        detector = DuplicateDetector(approximate=True)
+        detector.update(dataframe.iloc[:10000])
+        detector.update(dataframe.iloc[10000:])
+        duplicates = detector.result()
+        self.assertFalse(duplicates.exact)
+        self.assertEqual(duplicates.groups, [])
+        self.assertLess(abs(duplicates.duplicate_rows - 15000), 4 * duplicates.error + 1)
+
+    def test_empty_dataset(self):
+        duplicates = DuplicateDetector().result()
+        self.assertEqual((duplicates.rows, duplicates.duplicate_rows), (0, 0))
+        self.assertEqual(duplicates.percentage, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
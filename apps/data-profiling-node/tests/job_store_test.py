@@ -0,0 +1,107 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from contextlib import closing
+from unittest import mock
+
+from src.data_utils import job_store
+from src.data_utils.job_store import DONE, RUNNING, JobStore, job_fingerprint
+
+
+class TestJobStore(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = JobStore(path=os.path.join(directory.name, "jobs.sqlite"), ttl=3600)
+        self.calls = 0
+
+    def job(self):
+        self.calls += 1
+        return {"result": self.calls}
+
+    def status(self, fingerprint):
+        with closing(sqlite3.connect(self.store.path)) as connection:
+            row = connection.execute(
+                "SELECT status FROM jobs WHERE fingerprint = ?", (fingerprint,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def test_done_jobs_are_reused(self):
+        self.assertEqual(self.store.run("a", self.job), {"result": 1})
+        self.assertEqual(self.store.run("a", self.job), {"result": 1})
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.status("a"), DONE)
+        self.assertEqual(self.store.run("b", self.job), {"result": 2})
+
+    def test_jobs_without_fingerprint_always_run(self):
+        self.store.run(None, self.job)
+        self.store.run(None, self.job)
+        self.assertEqual(self.calls, 2)
+
+    def test_failed_jobs_release_their_claim(self):
+        def failing():
+            raise RuntimeError("boom")
+
+        with self.assertRaises(RuntimeError):
+            self.store.run("a", failing)
+        self.assertIsNone(self.status("a"))
+        self.assertEqual(self.store.run("a", self.job), {"result": 1})
+
+    def test_waits_for_the_same_job_running_elsewhere(self):
+        # another worker claimed the job
+        self.assertEqual(self.store._claim("a"), (None, None))
+        self.assertEqual(self.status("a"), RUNNING)
+
+        results = []
+        with mock.patch.object(job_store, "JOB_STORE_POLL_INTERVAL", 0.01):
+            waiter = threading.Thread(target=lambda: results.append(self.store.run("a", self.job)))
+            waiter.start()
+            time.sleep(0.1)
+            self.assertEqual(results, [])
+            self.store._complete("a", {"result": "elsewhere"})
+            waiter.join(timeout=5)
+
+        self.assertEqual(results, [{"result": "elsewhere"}])
+        self.assertEqual(self.calls, 0)
+
+    def test_waiters_run_the_job_once_a_claim_is_released(self):
+        self.store._claim("a")
+        results = []
+        with mock.patch.object(job_store, "JOB_STORE_POLL_INTERVAL", 0.01):
+            waiter = threading.Thread(target=lambda: results.append(self.store.run("a", self.job)))
+            waiter.start()
+            time.sleep(0.05)
+            self.store._release("a")
+            waiter.join(timeout=5)
+        self.assertEqual(results, [{"result": 1}])
+
+    def test_abandoned_claims_are_taken_over(self):
+        self.store._claim("a")
+        with mock.patch.object(job_store, "JOB_STORE_HEARTBEAT", 0.01):
+            time.sleep(0.05)
+            self.assertEqual(self.store.run("a", self.job), {"result": 1})
+        self.assertEqual(self.status("a"), DONE)
+
+    def test_expired_results_are_recomputed(self):
+        self.store.run("a", self.job)
+        self.store.ttl = 0
+        time.sleep(0.01)
+        self.assertEqual(self.store.run("a", self.job), {"result": 2})
+
+
+class TestJobFingerprint(unittest.TestCase):
+    def test_fingerprint_depends_on_params_and_content(self):
+        with mock.patch.object(job_store, "code_version", return_value="v1"):
+            base = job_fingerprint("queue", {"dataset_id": 1}, ["etag:10"])
+            self.assertEqual(base, job_fingerprint("queue", {"dataset_id": 1}, ["etag:10"]))
+            self.assertNotEqual(base, job_fingerprint("queue", {"dataset_id": 2}, ["etag:10"]))
+            self.assertNotEqual(base, job_fingerprint("queue", {"dataset_id": 1}, ["etag:11"]))
+        with mock.patch.object(job_store, "code_version", return_value="v2"):
+            self.assertNotEqual(base, job_fingerprint("queue", {"dataset_id": 1}, ["etag:10"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import gzip
+import io
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from src.data_utils import loader
+from src.data_utils.columnar import to_parquet_buffer
+from src.data_utils.loader import (
+    iter_dataframe_chunks,
+    iter_dataframe_chunks_from_url,
+    load_dataframe_from_url,
+    read_dataframe,
+)
+from src.data_utils.sniffer import SNIFF_SIZE
+
+
+class _SocketStream(io.RawIOBase):
+    """
+    A stream that can only be read forward, like a response body.
+    """
+
+    def __init__(self, data: bytes):
+        self._body = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def readinto(self, buffer) -> int:
+        data = self._body.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _dataframe(rows: int = 5000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "id": np.arange(rows),
+            "amount": rng.normal(100, 10, rows).round(3),
+            "level": rng.choice(["low", "mid", "high"], rows),
+        }
+    )
+
+
+class TestReadDataframe(unittest.TestCase):
+    def test_csv_from_a_forward_only_stream(self):
+        dataframe = _dataframe()
+        payload = dataframe.to_csv(index=False).encode()
+        # the body is longer than the sniffed prefix, which must be replayed
+        self.assertGreater(len(payload), SNIFF_SIZE)
+        loaded = read_dataframe(_SocketStream(payload), "test.csv")
+        pd.testing.assert_frame_equal(loaded, dataframe)
+
+    def test_sniffed_dialect_and_compression(self):
+        dataframe = _dataframe()
+        text = dataframe.to_csv(index=False, sep=";").encode()
+        payloads = {
+            "semicolon": text,
+            "gzip": gzip.compress(text),
+            "zstd": pa.Codec("zstd").compress(text, asbytes=True),
+        }
+        for name, payload in payloads.items():
+            with self.subTest(name):
+                loaded = read_dataframe(_SocketStream(payload), "dataset")
+                pd.testing.assert_frame_equal(loaded, dataframe)
+
+    def test_headerless_csv_gets_generated_names(self):
+        # a first row of numbers is data, not column names
+        payload = b"1,2.5,7\n2,3.5,8\n3,4.5,9\n4,5.5,10\n"
+        loaded = read_dataframe(io.BytesIO(payload), "headerless.csv")
+        self.assertEqual(list(loaded.columns), ["column_0", "column_1", "column_2"])
+        self.assertEqual(loaded["column_2"].tolist(), [7, 8, 9, 10])
+
+    def test_parquet_and_excel(self):
+        dataframe = _dataframe(100)
+        parquet = to_parquet_buffer(dataframe).getvalue()
+        pd.testing.assert_frame_equal(read_dataframe(_SocketStream(parquet), "x"), dataframe)
+
+        try:
+            excel = io.BytesIO()
+            dataframe.to_excel(excel, index=False)
+        except ImportError:
+            return
+        pd.testing.assert_frame_equal(
+            read_dataframe(_SocketStream(excel.getvalue()), "x"), dataframe
+        )
+
+    def test_unparseable_payload(self):
+        # a Parquet magic number in front of garbage
+        with self.assertRaises(ValueError):
+            read_dataframe(io.BytesIO(b"PAR1" + bytes(range(256)) * 4), "broken")
+
+
+class TestIterDataframeChunks(unittest.TestCase):
+    def test_chunks_add_up_to_the_dataset(self):
+        dataframe = _dataframe()
+        payloads = {
+            "csv": dataframe.to_csv(index=False).encode(),
+            "parquet": to_parquet_buffer(dataframe).getvalue(),
+        }
+        for name, payload in payloads.items():
+            with self.subTest(name):
+                chunks = list(iter_dataframe_chunks(_SocketStream(payload), name, 1200))
+                self.assertEqual([len(chunk) for chunk in chunks], [1200] * 4 + [200])
+                pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), dataframe)
+
+
+class TestLoadFromUrl(unittest.TestCase):
+    def session(self, payload: bytes) -> mock.Mock:
+        response = mock.MagicMock()
+        response.raw = _SocketStream(payload)
+        response.__enter__.return_value = response
+        session = mock.Mock()
+        session.get.return_value = response
+        return session
+
+    def test_streams_the_response_body_without_the_cache(self):
+        dataframe = _dataframe()
+        payload = gzip.compress(dataframe.to_csv(index=False).encode())
+        with mock.patch.object(loader, "CACHE_ENABLED", False):
+            session = self.session(payload)
+            loaded = load_dataframe_from_url("http://x/data", session, columns=["id", "level"])
+            pd.testing.assert_frame_equal(loaded, dataframe[["id", "level"]])
+            session.get.assert_called_once_with("http://x/data", stream=True)
+
+            session = self.session(payload)
+            chunks = list(iter_dataframe_chunks_from_url("http://x/data", 2500, session))
+            pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), dataframe)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import math
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from scipy.stats import zscore
+from src.profilers import numeric_stats
+from src.profilers.numeric_stats import NUMERICAL_SUMMARY_KEYS, profile_numeric_block
+
+
+def _per_column_profile(series: pd.Series) -> dict:
+    """
+    The per-column summary and outlier counts profile_numeric_block replaced.
+    """
+    first_quartile, third_quartile = series.quantile([0.25, 0.75])
+    left_whisker = first_quartile - (1.5 * first_quartile)
+    right_whisker = third_quartile + (1.5 * third_quartile)
+    z_scores = zscore(series)
+    return {
+        "summary": {
+            "mean": float(series.mean()),
+            "median": float(series.median()),
+            "mode": list(series.mode(dropna=True).value_counts().to_dict().keys()),
+            "min": float(series.min()),
+            "max": float(series.max()),
+            "range": float(series.max()) - float(series.min()),
+            "variance": float(series.var()),
+            "std": float(series.std()),
+            "skewness": float(series.skew()),
+            "kurtosis": float(series.kurtosis()),
+        },
+        "outliers": {
+            "iqr": {
+                "Q1": float(first_quartile),
+                "Q3": float(third_quartile),
+                "IQR": float(third_quartile - first_quartile),
+                "left_outliers": int(series[series < left_whisker].count()),
+                "right_outliers": int(series[series > right_whisker].count()),
+            },
+            "z-score": {
+                "left_outliers": int((z_scores < -3).sum()),
+                "right_outliers": int((z_scores > 3).sum()),
+            },
+        },
+    }
+
+
+def _dataframe() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    rows = 1000
+    heavy_tail = rng.standard_t(2, rows)
+    heavy_tail[:5] = [40, -35, 60, 80, -90]
+    return pd.DataFrame(
+        {
+            "normal": rng.normal(10, 2, rows),
+            "heavy_tail": heavy_tail,
+            "counts": rng.poisson(3, rows),
+            "small": rng.integers(-3, 3, rows).astype(np.int8),
+            "constant": np.full(rows, 7.5),
+            "bimodal": np.repeat([1, 2], rows // 2),
+            "large": rng.normal(1e9, 1, rows),
+        }
+    )
+
+
+class TestProfileNumericBlock(unittest.TestCase):
+    def assertProfilesEqual(self, actual: dict, expected: dict):
+        self.assertEqual(list(actual["summary"]), list(NUMERICAL_SUMMARY_KEYS))
+        for key in NUMERICAL_SUMMARY_KEYS:
+            if key == "mode":
+                self.assertEqual(actual["summary"]["mode"], expected["summary"]["mode"])
+                continue
+            a, b = actual["summary"][key], expected["summary"][key]
+            if math.isnan(b):
+                self.assertTrue(math.isnan(a), key)
+            else:
+                self.assertAlmostEqual(a, b, delta=1e-9 * max(1.0, abs(b)), msg=key)
+        for method in ("iqr", "z-score"):
+            for key, expected_value in expected["outliers"][method].items():
+                self.assertAlmostEqual(
+                    actual["outliers"][method][key], expected_value, msg=f"{method} {key}"
+                )
+
+    def test_matches_the_per_column_profile(self):
+        dataframe = _dataframe()
+        profiles = profile_numeric_block(dataframe, list(dataframe.columns))
+        for col in dataframe.columns:
+            with self.subTest(col):
+                self.assertProfilesEqual(profiles[col], _per_column_profile(dataframe[col]))
+
+    def test_columns_split_over_several_blocks(self):
+        dataframe = _dataframe()
+        whole = profile_numeric_block(dataframe, list(dataframe.columns))
+        # two columns of 1000 rows per block
+        with mock.patch.object(numeric_stats, "PROFILING_STATS_BLOCK_CELLS", 2000):
+            split = profile_numeric_block(dataframe, list(dataframe.columns))
+        self.assertEqual(split.keys(), whole.keys())
+        for col in dataframe.columns:
+            with self.subTest(col):
+                self.assertProfilesEqual(split[col], whole[col])
+
+    def test_missing_values_are_left_out(self):
+        series = _dataframe()["heavy_tail"]
+        with_missing = series.copy()
+        with_missing[::7] = np.nan
+        dataframe = pd.DataFrame(
+            {"v": with_missing, "n": pd.array([1, None, 3, 3], dtype="Int64").repeat(250)}
+        )
+        profiles = profile_numeric_block(dataframe, ["v", "n"])
+
+        present = with_missing.dropna()
+        expected = _per_column_profile(present)
+        self.assertProfilesEqual(profiles["v"], expected)
+        self.assertEqual(profiles["n"]["summary"]["mode"], [3])
+        self.assertEqual(profiles["n"]["summary"]["median"], 3.0)
+
+    def test_short_and_empty_columns(self):
+        dataframe = pd.DataFrame({"one": [5.0, np.nan, np.nan], "empty": [np.nan] * 3})
+        profiles = profile_numeric_block(dataframe, ["one", "empty"])
+        self.assertEqual(profiles["one"]["summary"]["mean"], 5.0)
+        self.assertTrue(math.isnan(profiles["one"]["summary"]["variance"]))
+        self.assertTrue(math.isnan(profiles["one"]["summary"]["skewness"]))
+        self.assertEqual(profiles["one"]["outliers"]["z-score"]["left_outliers"], 0)
+        self.assertEqual(profiles["empty"]["summary"]["mode"], [])
+        self.assertTrue(math.isnan(profiles["empty"]["summary"]["mean"]))
+        self.assertEqual(profiles["empty"]["outliers"]["iqr"]["left_outliers"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import re
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RANGE = re.compile(r"bytes=(\d+)-(\d+)")
+
+
+class _ObjectHandler(BaseHTTPRequestHandler):
+    """
+    Serves one object under every path, honouring range, If-Match and If-None-Match headers
+    like an object store.
+    """
+
+    server: "ObjectServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        data = server.data
+        server.requests.append({"path": self.path, **self.headers})
+        if server.on_request:
+            server.on_request(self)
+
+        if self.headers.get("If-None-Match") == server.etag:
+            self._send(304, b"", {})
+            return
+
+        match = RANGE.match(self.headers.get("Range", ""))
+        if not server.ranges or not match:
+            self._send(200, data, {})
+            return
+        if self.headers.get("If-Match", server.etag) != server.etag:
+            self._send(412, b"", {})
+            return
+
+        start, end = int(match.group(1)), min(int(match.group(2)), len(data) - 1)
+        headers = {"Content-Range": f"bytes {start}-{end}/{len(data)}"}
+        body = data[start : end + 1]
+        if start > 0 and server.drops:
+            # announce the whole part, send half of it and hang up
+            server.drops -= 1
+            self._send(206, body[: len(body) // 2], headers, length=len(body))
+            self.close_connection = True
+            return
+        self._send(206, body, headers)
+
+    def _send(self, status: int, body: bytes, headers: dict, length=None):
+        self.send_response(status)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Type", self.server.content_type)
+        if status != 304:
+            self.send_header("Content-Length", str(len(body) if length is None else length))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class ObjectServer(ThreadingHTTPServer):
+    """
+    A local HTTP server standing in for presigned object store URLs in tests.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, data: bytes):
+        super().__init__(("127.0.0.1", 0), _ObjectHandler)
+        self.data = data
+        self.etag = '"v1"'
+        self.content_type = "text/csv"
+        self.ranges = True
+        self.drops = 0
+        self.requests = []
+        # called with the request handler before every request is answered
+        self.on_request = None
+
+    def start(self, test: unittest.TestCase) -> None:
+        """
+        Serves in a background thread until the test is cleaned up.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        test.addCleanup(thread.join)
+        test.addCleanup(self.server_close)
+        test.addCleanup(self.shutdown)
+
+    def url(self, path: str = "/dataset") -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
@@ -0,0 +1,89 @@
+import logging
+import unittest
+import warnings
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from src.profilers import profiler_ydata
+from src.profilers.duplicates import DuplicateDetector
+from src.profilers.profiler_ydata import YDataProfiler
+
+
+def _dataframe(rows: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=rows)
+    return pd.DataFrame(
+        {
+            "level": rng.choice(["low", "mid", "high"], rows),
+            "grade": rng.integers(0, 3, rows),
+            "x": x,
+            "y": x + rng.normal(size=rows),
+            "flag": rng.choice([True, False], rows),
+            "id": [f"id{row}" for row in range(rows)],
+        }
+    )
+
+
+class TestYDataProfiler(unittest.TestCase):
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        warnings.simplefilter("ignore")
+        self.addCleanup(warnings.resetwarnings)
+
+    def report(self, dataframe, tier, sample_rows=1000, duplicates=None):
+        with (
+            mock.patch.object(profiler_ydata, "YDATA_PROFILING_TIER", tier),
+            mock.patch.object(profiler_ydata, "YDATA_SAMPLE_ROWS", sample_rows),
+            mock.patch.object(YDataProfiler, "generate_eda_html", return_value=""),
+        ):
+            report, _ = YDataProfiler.generate_yprofile_report(dataframe, "test", duplicates)
+        return report
+
+    def test_select_tier(self):
+        with (
+            mock.patch.object(profiler_ydata, "YDATA_FULL_MAX_CELLS", 1000),
+            mock.patch.object(profiler_ydata, "YDATA_SAMPLE_ROWS", 100),
+        ):
+            self.assertEqual(YDataProfiler.select_tier(100, 10), "full")
+            self.assertEqual(YDataProfiler.select_tier(10000, 10), "sampled")
+            self.assertEqual(YDataProfiler.select_tier(10000, 20), "minimal")
+        with (
+            mock.patch.object(profiler_ydata, "YDATA_PROFILING_TIER", "other"),
+            self.assertRaises(ValueError),
+        ):
+            YDataProfiler.select_tier(1, 1)
+
+    def test_minimal_correlations_match_the_full_report(self):
+        dataframe = _dataframe()
+        full = self.report(dataframe, "full").correlations
+        minimal = self.report(dataframe, "minimal").correlations
+        self.assertEqual(sorted(minimal.columns), sorted(full.columns))
+        self.assertIn("level", minimal.columns)
+        self.assertIn("grade", minimal.columns)
+        np.testing.assert_allclose(
+            minimal.loc[full.index, full.columns].to_numpy(), full.to_numpy(), atol=1e-12
+        )
+
+    def test_duplicates_of_the_profiled_rows_are_reported(self):
+        dataframe = pd.concat([_dataframe(200)] * 2, ignore_index=True)
+        duplicates = DuplicateDetector.detect(dataframe)
+        table = self.report(dataframe, "full", duplicates=duplicates).table
+        self.assertEqual((table["n"], table["n_duplicates"]), (400, 200))
+
+    def test_sampled_reports_count_the_duplicates_of_the_sample(self):
+        dataframe = pd.concat([_dataframe(200)] * 2, ignore_index=True)
+        duplicates = DuplicateDetector.detect(dataframe)
+        report = self.report(dataframe, "sampled", sample_rows=300, duplicates=duplicates)
+        self.assertEqual(
+            (report.tier, report.sample_rows, report.table["n"]), ("sampled", 300, 300)
+        )
+        self.assertLessEqual(report.table["n_duplicates"], 300)
+        with mock.patch.object(profiler_ydata, "YDATA_SAMPLE_ROWS", 300):
+            sample = YDataProfiler._sample(dataframe)
+        self.assertEqual(report.table["n_duplicates"], int(sample.duplicated().sum()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import pika
+from pika.spec import Basic
+from src.data_utils import publisher
+from src.data_utils.publisher import Publisher, PublishError
+
+
+class _Broker:
+    """
+    Stands in for RabbitMQ behind pika.SelectConnection, on the publisher's own I/O loop.
+    """
+
+    def __init__(self, answer: str = "ack"):
+        # ack, nack, silent, or drop the first connection before confirming
+        self.answer = answer
+        self.connections = []
+        self.declared = []
+        self.published = []
+
+    def connect(
+        self, parameters, on_open_callback, on_open_error_callback, on_close_callback, custom_ioloop
+    ):
+        return _Connection(self, custom_ioloop, on_open_callback, on_close_callback)
+
+
+class _Connection:
+    def __init__(self, broker: _Broker, ioloop, on_open, on_close):
+        self.broker = broker
+        self.ioloop = ioloop
+        self.on_close = on_close
+        self.is_open, self.is_closing, self.is_closed = True, False, False
+        broker.connections.append(self)
+        ioloop.add_callback_threadsafe(lambda: on_open(self))
+
+    def channel(self, on_open_callback):
+        channel = _Channel(self)
+        self.ioloop.add_callback_threadsafe(lambda: on_open_callback(channel))
+
+    def close(self):
+        self.is_open, self.is_closed = False, True
+        self.ioloop.add_callback_threadsafe(lambda: self.on_close(self, "closed"))
+
+
+class _Channel:
+    def __init__(self, connection: _Connection):
+        self.connection = connection
+        self.is_open = True
+        self.delivery_tag = 0
+        self.on_confirm = None
+
+    def add_on_close_callback(self, callback):
+        pass
+
+    def confirm_delivery(self, on_confirm, callback):
+        self.on_confirm = on_confirm
+        self.connection.ioloop.add_callback_threadsafe(lambda: callback(None))
+
+    def queue_declare(self, queue, durable, callback):
+        self.connection.broker.declared.append((queue, durable))
+        frame = SimpleNamespace(method=SimpleNamespace(queue=queue))
+        self.connection.ioloop.add_callback_threadsafe(lambda: callback(frame))
+
+    def basic_publish(self, exchange, routing_key, body, properties):
+        broker, connection = self.connection.broker, self.connection
+        self.delivery_tag += 1
+        broker.published.append((len(broker.connections), routing_key, body))
+
+        if broker.answer == "drop" and len(broker.connections) == 1:
+            connection.ioloop.add_callback_threadsafe(connection.close)
+            return
+        if broker.answer == "silent":
+            return
+        if broker.answer == "nack":
+            method = Basic.Nack(delivery_tag=self.delivery_tag)
+        else:
+            # confirms everything published so far on the channel
+            method = Basic.Ack(delivery_tag=self.delivery_tag, multiple=True)
+        frame = SimpleNamespace(method=method)
+        connection.ioloop.add_callback_threadsafe(lambda: self.on_confirm(frame))
+
+
+class TestPublisher(unittest.TestCase):
+    def publisher(self, answer: str = "ack") -> tuple[Publisher, _Broker]:
+        broker = _Broker(answer)
+        patches = (
+            mock.patch.object(publisher.pika, "SelectConnection", broker.connect),
+            mock.patch.object(publisher, "PUBLISH_RECONNECT_DELAY", 0),
+        )
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        instance = Publisher(pika.ConnectionParameters())
+        self.addCleanup(instance.close)
+        return instance, broker
+
+    def test_threads_publish_over_one_connection(self):
+        instance, broker = self.publisher()
+        messages = [f"message {i}" for i in range(40)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda body: instance.publish("q_results", body, timeout=5), messages))
+
+        self.assertEqual(len(broker.connections), 1)
+        self.assertEqual(broker.declared, [("q_results", True)])
+        self.assertEqual(
+            sorted(body for _, _, body in broker.published), sorted(m.encode() for m in messages)
+        )
+        self.assertEqual(instance._unconfirmed, {})
+
+    def test_rejected_and_unconfirmed_messages_fail(self):
+        instance, _ = self.publisher("nack")
+        with self.assertRaises(PublishError):
+            instance.publish("q_results", b"body", timeout=5)
+
+        instance, _ = self.publisher("silent")
+        with self.assertRaises(TimeoutError):
+            instance.publish("q_results", b"body", timeout=0.2)
+
+    def test_unconfirmed_messages_are_published_again_after_a_reconnect(self):
+        instance, broker = self.publisher("drop")
+        instance.publish("q_results", b"body", timeout=5)
+        self.assertEqual(len(broker.connections), 2)
+        self.assertEqual(broker.published, [(1, "q_results", b"body"), (2, "q_results", b"body")])
+        # the queue is declared again on the new channel
+        self.assertEqual(len(broker.declared), 2)
+
+    def test_close_stops_the_loop(self):
+        instance, broker = self.publisher()
+        instance.publish("q_results", b"body", timeout=5)
+        thread = instance._thread
+        instance.close()
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(broker.connections[0].is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import unittest
+from unittest import mock
+
+import requests
+import urllib3
+from src.data_utils import ranged_download
+from src.data_utils.ranged_download import download
+
+from tests.object_server import ObjectServer
+
+
+class TestRangedDownload(unittest.TestCase):
+    def setUp(self):
+        self.data = os.urandom(100_000)
+        self.server = ObjectServer(self.data)
+        self.server.start(self)
+        self.url = self.server.url()
+
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+        patcher = mock.patch.object(ranged_download.time, "sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def download(self, **options):
+        options = {"part_size": 16_384, "concurrency": 4, "retries": 2, **options}
+        with download(self.url, self.session, **options) as body:
+            return body.read()
+
+    def ranges_requested(self) -> list:
+        return sorted(request["Range"] for request in self.server.requests if "Range" in request)
+
+    def expected_ranges(self) -> list:
+        return [
+            f"bytes={start}-{min(start + 16_384, len(self.data)) - 1}"
+            for start in range(0, len(self.data), 16_384)
+        ]
+
+    def test_parts_are_reassembled(self):
+        self.assertEqual(self.download(), self.data)
+        # one request per part of 16 KiB
+        self.assertEqual(len(self.server.requests), 7)
+        self.assertIn("bytes=98304-99999", self.ranges_requested())
+
+    def test_large_objects_go_through_a_file(self):
+        with mock.patch.object(ranged_download, "DOWNLOAD_IN_MEMORY_MAX_SIZE", 1000):
+            self.assertEqual(self.download(), self.data)
+
+    def test_servers_without_ranges_are_read_as_one_stream(self):
+        self.server.ranges = False
+        self.assertEqual(self.download(), self.data)
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_interrupted_parts_resume_where_they_stopped(self):
+        self.server.drops = 2
+        self.assertEqual(self.download(), self.data)
+        self.assertEqual(self.server.drops, 0)
+        # the retries only ask for the bytes that were missing
+        resumed = [r for r in self.ranges_requested() if r not in self.expected_ranges()]
+        self.assertEqual(len(resumed), 2)
+
+        self.server.drops = 10
+        with self.assertRaises((requests.RequestException, urllib3.exceptions.HTTPError, OSError)):
+            self.download(retries=1)
+
+    def test_objects_changing_during_the_download_fail(self):
+        original_get = self.session.get
+
+        def get(url, headers=None, **options):
+            # the object is replaced right after the first part was answered
+            response = original_get(url, headers=headers, **options)
+            self.server.etag = '"v2"'
+            return response
+
+        with mock.patch.object(self.session, "get", side_effect=get), self.assertRaises(ValueError):
+            self.download()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest import mock
+
+from src.data_utils import scheduler
+from src.data_utils.scheduler import FairShareQueue, JobEstimate, share_of
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFairShareQueue(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        patcher = mock.patch.object(scheduler.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue = FairShareQueue(max_wait=60)
+
+    def drain(self):
+        return [self.queue.pop() for _ in range(len(self.queue))]
+
+    def test_cheapest_job_of_a_group_first(self):
+        for name, cost in (("large", 300), ("small", 10), ("medium", 50)):
+            self.queue.push(name, JobEstimate(cost=cost, share="p"))
+        self.assertEqual(self.drain(), ["small", "medium", "large"])
+
+    def test_equal_costs_keep_arrival_order(self):
+        for name in "abc":
+            self.queue.push(name, JobEstimate(share="p"))
+        self.assertEqual(self.drain(), ["a", "b", "c"])
+
+    def test_least_served_group_goes_next(self):
+        for index in range(3):
+            self.queue.push(f"p{index}", JobEstimate(cost=10, share="p"))
+        self.queue.push("q0", JobEstimate(cost=10, share="q"))
+        # p's first job, then q is the least served, then p's others
+        self.assertEqual(self.drain(), ["p0", "q0", "p1", "p2"])
+
+    def test_costly_jobs_count_against_their_group(self):
+        self.queue.push("p-big", JobEstimate(cost=100, share="p"))
+        self.queue.push("p-next", JobEstimate(cost=100, share="p"))
+        for index in range(3):
+            self.queue.push(f"q{index}", JobEstimate(cost=10, share="q"))
+        self.assertEqual(self.drain(), ["p-big", "q0", "q1", "q2", "p-next"])
+
+    def test_jobs_past_the_maximum_wait_run_first(self):
+        self.queue.push("large", JobEstimate(cost=1000, share="p"))
+        self.clock.now += 30
+        self.queue.push("small", JobEstimate(cost=1, share="p"))
+        self.assertEqual(self.queue.pop(), "small")
+
+        self.queue.push("small-again", JobEstimate(cost=1, share="p"))
+        self.clock.now += 31
+        # "large" has now waited 61 seconds
+        self.assertEqual(self.queue.pop(), "large")
+        self.assertEqual(self.queue.pop(), "small-again")
+
+    def test_idle_groups_rejoin_without_credit(self):
+        self.queue.push("p0", JobEstimate(cost=100, share="p"))
+        self.queue.push("p1", JobEstimate(cost=100, share="p"))
+        self.queue.push("p2", JobEstimate(cost=100, share="p"))
+        self.assertEqual(self.queue.pop(), "p0")
+        self.assertEqual(self.queue.pop(), "p1")
+        # q arrives at p's level, so the groups alternate instead of q running twice
+        self.queue.push("q0", JobEstimate(cost=100, share="q"))
+        self.queue.push("q1", JobEstimate(cost=100, share="q"))
+        order = self.drain()
+        self.assertEqual(order[:2], ["p2", "q0"])
+
+    def test_empty_queue(self):
+        self.assertEqual(len(self.queue), 0)
+        with self.assertRaises(IndexError):
+            self.queue.pop()
+
+
+class TestShareOf(unittest.TestCase):
+    def test_project_then_dataset(self):
+        self.assertEqual(share_of({"projectId": 7, "dataset_id": 3}), "7")
+        self.assertEqual(share_of({"dataset_id": 3}), "3")
+        self.assertEqual(share_of({}), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from src.profilers.sketches import FrequentItems, HyperLogLog, KLLSketch
+
+
+class TestKLLSketch(unittest.TestCase):
+    def test_exact_until_compacted(self):
+        sketch = KLLSketch(k=200)
+        sketch.update(np.array([3.0, 1.0, np.nan, 2.0]))
+        self.assertEqual(sketch.count, 3)
+        self.assertEqual(sketch.rank_error, 0.0)
+        self.assertEqual(sketch.quantiles([0.0, 1.0]), [1.0, 3.0])
+
+    def test_merged_sketch_matches_ranks_of_all_values(self):
+        values = np.random.default_rng(0).permutation(100000).astype(np.float64)
+        sketches = []
+        for seed, part in enumerate(np.array_split(values, 4)):
+            sketch = KLLSketch(k=200, seed=seed)
+            sketch.update(part)
+            sketches.append(sketch)
+        merged = sketches[0]
+        for sketch in sketches[1:]:
+            merged.merge(sketch)
+
+        self.assertEqual(merged.count, len(values))
+        fractions = [0.1, 0.25, 0.5, 0.75, 0.9]
+        for fraction, quantile in zip(fractions, merged.quantiles(fractions)):
+            # the values are 0..n-1, so a value is its own rank
+            self.assertLess(abs(quantile / len(values) - fraction), merged.rank_error)
+
+    def test_empty_sketch(self):
+        self.assertTrue(all(np.isnan(KLLSketch().quantiles([0.5]))))
+
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_merge_estimates_the_union(self):
+        first, second = HyperLogLog(14), HyperLogLog(14)
+        first.update(pd.Series(np.arange(0, 60000)))
+        second.update(pd.Series(np.arange(40000, 100000)))
+        first.merge(second)
+        self.assertLess(abs(first.estimate() / 100000 - 1), 4 * first.relative_error)
+
+    def test_small_counts_are_near_exact(self):
+        sketch = HyperLogLog(14)
+        sketch.update(pd.Series(["a", "b", "c", None, "a"]))
+        self.assertAlmostEqual(sketch.estimate(), 3, delta=0.1)
+
+    def test_precisions_must_match(self):
+        with self.assertRaises(ValueError):
+            HyperLogLog(12).merge(HyperLogLog(14))
+        with self.assertRaises(ValueError):
+            HyperLogLog(4)
+
+
+class TestFrequentItems(unittest.TestCase):
+    def test_merged_counts_are_within_the_error(self):
+        rng = np.random.default_rng(0)
+        values = rng.zipf(1.5, 50000) % 5000
+        exact = pd.Series(values).value_counts()
+        summaries = []
+        for part in np.array_split(values, 5):
+            summary = FrequentItems(capacity=100)
+            summary.update(pd.Series(part).value_counts().to_dict())
+            summaries.append(summary)
+        merged = summaries[0]
+        for summary in summaries[1:]:
+            merged.merge(summary)
+
+        self.assertEqual(merged.total, len(values))
+        self.assertLessEqual(len(merged.counts), 100)
+        self.assertLessEqual(merged.error, merged.total / 101 * len(summaries))
+        for value, count in exact.head(10).items():
+            # counts are underestimated by at most the error, never overestimated
+            self.assertLessEqual(merged.counts[value], count)
+            self.assertGreaterEqual(merged.counts[value], count - merged.error)
+
+    def test_exact_below_capacity(self):
+        summary = FrequentItems(capacity=10)
+        summary.update({"a": 3, "b": 1})
+        summary.update({"a": 1})
+        self.assertEqual(dict(summary.counts), {"a": 4, "b": 1})
+        self.assertEqual(summary.error, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import gzip
+import unittest
+
+from src.data_utils.sniffer import PARQUET_MAGIC, sniff
+
+
+class TestSniffCsvHeader(unittest.TestCase):
+    def test_text_header_over_numbers(self):
+        detected = sniff(b"id,value\n1,2.5\n2,3.5\n", False, "test")
+        self.assertTrue(detected.has_header)
+        self.assertEqual(detected.column_count, 2)
+
+    def test_numeric_looking_names_stay_a_header(self):
+        detected = sniff(b"country,2019,2020\nfr,1,2\nde,3,4\n", False, "test")
+        self.assertTrue(detected.has_header)
+        self.assertEqual(detected.column_count, 3)
+
+    def test_header_over_text_rows(self):
+        detected = sniff(b"name,city\nada,london\nalan,wilmslow\n", False, "test")
+        self.assertTrue(detected.has_header)
+
+    def test_numeric_first_row_is_data(self):
+        detected = sniff(b"1,2.5,3\n4,5.5,6\n7,8.5,9\n", False, "test")
+        self.assertFalse(detected.has_header)
+        self.assertEqual(detected.column_count, 3)
+
+    def test_single_row_is_a_header(self):
+        self.assertTrue(sniff(b"a,b,c\n", False, "test").has_header)
+
+
+class TestSniffCsvDialect(unittest.TestCase):
+    def test_delimiters(self):
+        for delimiter in ",;\t|":
+            payload = f"a{delimiter}b{delimiter}c\n1{delimiter}2{delimiter}3\n".encode()
+            with self.subTest(delimiter=delimiter):
+                detected = sniff(payload, False, "test")
+                self.assertEqual(detected.file_format, "csv")
+                self.assertEqual(detected.delimiter, delimiter)
+                self.assertEqual(detected.column_count, 3)
+
+    def test_truncated_last_line_is_ignored(self):
+        detected = sniff(b"a;b\n1;2\n3;4\n5", True, "test")
+        self.assertEqual(detected.delimiter, ";")
+        self.assertEqual(detected.column_count, 2)
+
+    def test_encodings(self):
+        self.assertEqual(sniff(b"\xef\xbb\xbfa,b\n1,2\n", False, "test").encoding, "utf-8-sig")
+        self.assertEqual(sniff("a,b\né,2\n".encode(), False, "test").encoding, "utf-8")
+        self.assertEqual(sniff("a,b\né,2\n".encode("cp1252"), False, "test").encoding, "cp1252")
+
+
+class TestSniffContainers(unittest.TestCase):
+    def test_magic_numbers(self):
+        self.assertEqual(sniff(PARQUET_MAGIC + b"\x00" * 8, True, "test").file_format, "parquet")
+        self.assertEqual(sniff(b"PK\x03\x04rest", True, "test").file_format, "xlsx")
+
+    def test_compressed_payload_is_sniffed_again(self):
+        detected = sniff(gzip.compress(b"a,b\n1,2\n"), False, "test")
+        self.assertIsNone(detected.file_format)
+        self.assertEqual(detected.compression, "gzip")
+
+    def test_unknown_payloads_are_rejected(self):
+        with self.assertRaises(ValueError):
+            sniff(b"", False, "test")
+        with self.assertRaises(ValueError):
+            sniff(b"\x01\x00\x02binary", False, "test")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import json
+import os
+import queue
+import threading
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import pika
+from src.data_utils import worker_pool
+from src.data_utils.admission import ADMISSION_RETRY_DELAY, ADMIT, DEFER
+from src.data_utils.scheduler import JobEstimate
+from src.data_utils.worker_pool import WorkerPoolConsumer
+
+# set by the tests that need every worker busy at once
+_barrier = None
+_worker_threads = []
+
+
+def _job(channel, method, properties, body):
+    """
+    A node callback settling its message as the message asks.
+    """
+    message = json.loads(body)
+    _worker_threads.append(threading.current_thread().name)
+    if _barrier is not None:
+        _barrier.wait()
+
+    outcome = message["outcome"]
+    if outcome == "raise":
+        raise RuntimeError("job failed")
+    if outcome == "ack" or (outcome == "other_process" and os.getpid() != message["parent"]):
+        channel.basic_ack(delivery_tag=method.delivery_tag)
+    elif outcome == "requeue":
+        channel.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+    elif outcome != "unsettled":
+        channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+
+
+class _Connection:
+    """
+    Stands in for pika.BlockingConnection. Its channel delivers the given messages, then runs
+    the callbacks handed to the connection thread until every message is settled.
+    """
+
+    def __init__(self, messages: list):
+        self.callbacks = queue.Queue()
+        self.delays = []
+        self._channel = _Channel(self, messages)
+
+    def __call__(self, parameters):
+        return self
+
+    def channel(self):
+        return self._channel
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.put(callback)
+
+    def call_later(self, delay, callback):
+        self.delays.append(delay)
+        callback()
+
+
+class _Channel:
+    def __init__(self, connection: _Connection, messages: list):
+        self.connection = connection
+        self.messages = messages
+        self.is_open = True
+        self.prefetch = None
+        self.settled = {}
+
+    def queue_declare(self, queue, durable):
+        pass
+
+    def basic_qos(self, prefetch_count):
+        self.prefetch = prefetch_count
+
+    def basic_consume(self, queue, on_message_callback):
+        self.on_message = on_message_callback
+
+    def start_consuming(self):
+        for tag, message in enumerate(self.messages, start=1):
+            body = json.dumps(message).encode()
+            self.on_message(self, SimpleNamespace(delivery_tag=tag), pika.BasicProperties(), body)
+        while len(self.settled) < len(self.messages):
+            self.connection.callbacks.get(timeout=30)()
+
+    def basic_ack(self, delivery_tag):
+        self.settled[delivery_tag] = ("ack", None, threading.current_thread())
+
+    def basic_nack(self, delivery_tag, requeue):
+        self.settled[delivery_tag] = ("nack", requeue, threading.current_thread())
+
+
+class TestWorkerPoolConsumer(unittest.TestCase):
+    def setUp(self):
+        global _barrier
+        _barrier = None
+        _worker_threads.clear()
+
+    def consume(self, messages: list, **options) -> tuple[WorkerPoolConsumer, _Channel]:
+        connection = _Connection(messages)
+        consumer = WorkerPoolConsumer("q_jobs", _job, "localhost", **options)
+        with (
+            mock.patch.object(worker_pool.pika, "BlockingConnection", connection),
+            consumer._executor() as executor,
+        ):
+            if consumer.scheduled:
+                threading.Thread(target=consumer._schedule, args=(executor,), daemon=True).start()
+            consumer._consume(executor)
+        return consumer, connection._channel
+
+    def test_workers_run_jobs_while_the_connection_thread_settles_them(self):
+        global _barrier
+        # the three jobs only finish once all of them run at the same time
+        _barrier = threading.Barrier(3, timeout=10)
+        _, channel = self.consume([{"outcome": "ack"}] * 3, workers=3, pool="thread")
+
+        self.assertEqual(channel.prefetch, 3)
+        self.assertEqual(len(set(_worker_threads)), 3)
+        self.assertTrue(all(name.startswith("consumer-worker") for name in _worker_threads))
+        # acks are only sent from the thread consuming the connection
+        self.assertEqual(
+            {(outcome, thread) for outcome, _, thread in channel.settled.values()},
+            {("ack", threading.current_thread())},
+        )
+
+    def test_outcomes(self):
+        outcomes = ["ack", "requeue", "reject", "unsettled", "raise"]
+        _, channel = self.consume([{"outcome": o} for o in outcomes], workers=2, pool="thread")
+        self.assertEqual(
+            [channel.settled[tag][:2] for tag in range(1, 6)],
+            [("ack", None), ("nack", True), ("nack", False), ("nack", False), ("nack", False)],
+        )
+
+    def test_process_pool(self):
+        message = {"outcome": "other_process", "parent": os.getpid()}
+        _, channel = self.consume([message] * 2, workers=2, pool="process")
+        self.assertEqual([channel.settled[tag][0] for tag in (1, 2)], ["ack", "ack"])
+
+    def test_scheduled_jobs_pass_admission(self):
+        messages = [{"outcome": "ack", "size": size} for size in (1, 100, 2, 3)]
+
+        def estimator(message):
+            return JobEstimate(cost=message["size"], memory=message["size"])
+
+        def decide(estimate):
+            return DEFER if estimate.memory > 50 else ADMIT
+
+        with mock.patch.object(worker_pool.AdmissionController, "decide", side_effect=decide):
+            consumer, channel = self.consume(
+                messages, workers=1, pool="thread", estimator=estimator, window=4
+            )
+        self.assertTrue(consumer.scheduled)
+        self.assertEqual(channel.prefetch, 4)
+        # the large job is requeued after the retry delay, the others run
+        self.assertEqual(channel.settled[2][:2], ("nack", True))
+        self.assertEqual(channel.connection.delays, [ADMISSION_RETRY_DELAY])
+        self.assertEqual([channel.settled[tag][0] for tag in (1, 3, 4)], ["ack"] * 3)
+        self.assertEqual(consumer._running, 0)
+
+    def test_unknown_pool(self):
+        with self.assertRaises(ValueError):
+            WorkerPoolConsumer("q_jobs", _job, "localhost", pool="fiber")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,8 +2,14 @@ from langchain_openai import ChatOpenAI
 from .state import CodeState
 from .tools import extract_code, check_code
 
+def check_cancelled(state: CodeState) -> None:
+    # a cancelled job stops before it spends another LLM call and code run
+    if state.get("cancellation") is not None:
+        state["cancellation"].raise_if_cancelled()
+
 def generate_code(code_generator: ChatOpenAI, state: CodeState) -> CodeState:
     print("🟢 Node: generate_code")
+    check_cancelled(state)
 
     raw = code_generator.invoke({
         "profiling": state["profiling"],
@@ -20,6 +26,7 @@ def correct_code(code_corrector: ChatOpenAI, state: CodeState) -> CodeState:
     round_num = state["round"] + 1
     print(f"🟠 Node: correct_code | Round {round_num}")
     print(f"❌ Error: {state['result']}")
+    check_cancelled(state)
 
     raw = code_corrector.invoke({
         "code": state["code"],
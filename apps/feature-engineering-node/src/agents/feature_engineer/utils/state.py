@@ -1,5 +1,6 @@
-from typing import TypedDict
+from typing import Optional, TypedDict
 import pandas as pd
+from data_utils.cancellation import CancellationToken
 
 class CodeState(TypedDict):
     code: str
@@ -10,3 +11,4 @@ class CodeState(TypedDict):
     round: int
     target_column: str
     data: pd.DataFrame
+    cancellation: Optional[CancellationToken]
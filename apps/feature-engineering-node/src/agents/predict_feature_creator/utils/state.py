@@ -1,5 +1,6 @@
-from typing import TypedDict
+from typing import Optional, TypedDict
 import pandas as pd
+from data_utils.cancellation import CancellationToken
 
 class CodeState(TypedDict):
     code: str
@@ -9,3 +10,4 @@ class CodeState(TypedDict):
     data: pd.DataFrame
     task_type: str
     learned_params: dict
+    cancellation: Optional[CancellationToken]
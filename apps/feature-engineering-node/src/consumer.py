@@ -1,15 +1,29 @@
-import json
-import pika
 import threading
 import os
 import logging
+from data_utils.cancellation import CancellationToken, JobCancelled, cancellable, cancellations
+from data_utils.codec import MessageDecodeError, decode_message
+from data_utils.job_context import JobContext
+from data_utils.job_store import (
+    JobStore,
+    content_digest,
+    job_fingerprint,
+    object_version,
+    try_fingerprint,
+)
 from data_utils.schemas import TaskDefinition
-from services.feature_service import process_feature_engineering_from_queue
+from data_utils.scheduler import object_size_estimator
+from data_utils.worker_pool import WorkerPoolConsumer
+from services.feature_service import process_feature_engineering_from_queue, s3_service
 from producer import send_message
 
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("DATA_ENGINEERING_REQUEST_QUEUE", "DATA_ENGINEERING_REQUEST_QUEUE")
 
+# Peak memory per byte of the dataset: the frame, the copy the generated code transforms and
+# the test runs of every correction round
+ENGINEERING_MEMORY_FACTOR = 6
+
 # Logger Config
 logging.basicConfig(
     level=logging.INFO,
@@ -18,25 +32,61 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+job_store = JobStore()
+
+STAGE = "feature_engineering"
+
+
+def engineer_features(task_info: TaskDefinition, cancellation: CancellationToken) -> dict:
+    # the job keeps its artifacts and scratch files to itself, so concurrent jobs never collide
+    with JobContext(task_info.dataset_id, STAGE, cancellation=cancellation) as context:
+        return process_feature_engineering_from_queue(
+            dataset_key=task_info.dataset_key,
+            profiling=task_info.json_str,
+            task_type=task_info.task_type,
+            target_column=task_info.target_column,
+            context=context,
+        )
+
 
 def process_message(ch, method, properties, body):
-    logger.info(f"Received message: {body.decode()}")
+    logger.info(f"Received message: {len(body)} bytes ({properties.content_type or 'untyped'})")
     dataset_id = ""
     try:
-        message_data = json.loads(body.decode())
+        message_data = decode_message(body, properties)
         task_info = TaskDefinition.from_dict(message_data)
         logger.info(f"Task Definition: {task_info}")
         dataset_id = task_info.dataset_id
         try:
-            # Process the feature engineering task
-            data_keys = process_feature_engineering_from_queue(
-                dataset_key=task_info.dataset_key,
-                profiling=task_info.json_str,
-                task_type=task_info.task_type,
-                target_column=task_info.target_column,
+            # the same request on unchanged inputs republishes the stored result
+            fingerprint = try_fingerprint(
+                lambda: job_fingerprint(
+                    QUEUE_NAME,
+                    {
+                        "dataset_id": task_info.dataset_id,
+                        "dataset_key": task_info.dataset_key,
+                        "task_type": task_info.task_type,
+                        "target_column": task_info.target_column,
+                    },
+                    [
+                        object_version(s3_service, task_info.dataset_key),
+                        content_digest(task_info.json_str),
+                    ],
+                )
             )
+
+            # Process the feature engineering task; a cancellation request for the dataset
+            # stops it before the next agent round
+            with cancellable(task_info.dataset_id, STAGE) as cancellation:
+                data_keys = job_store.run(
+                    fingerprint, lambda: engineer_features(task_info, cancellation)
+                )
             send_message(message={"dataset_id": task_info.dataset_id, "error": "", **data_keys})
             ch.basic_ack(delivery_tag=method.delivery_tag)
+        except JobCancelled as e:
+            # cancelled on request, nobody waits for the result any more
+            logger.info(f"Stopped job: {e}")
+            ch.basic_ack(delivery_tag=method.delivery_tag)
         except Exception as e:
             logger.error(f"Error processing feature engineering task: {e}")
             # publish the result to the result queue
@@ -51,8 +101,8 @@ def process_message(ch, method, properties, body):
                 },
             )
             ch.basic_ack(delivery_tag=method.delivery_tag)
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding JSON: {e}")
+    except MessageDecodeError as e:
+        logger.error(f"Error decoding message: {e}")
         send_message(
             message={
                 "dataset_id": dataset_id,
@@ -80,15 +130,15 @@ def process_message(ch, method, properties, body):
 
 
 def consume():
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672, heartbeat=10000)
-    )
-    channel = connection.channel()
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=process_message)
-    logger.info(" [*] Waiting for messages. To exit press CTRL+C")
-    channel.start_consuming()
+    # listen for cancellations before the first job starts
+    cancellations.start()
+    # small datasets run ahead of large ones, shared fairly between datasets
+    WorkerPoolConsumer(
+        QUEUE_NAME,
+        process_message,
+        RABBITMQ_HOST,
+        estimator=object_size_estimator(s3_service, memory_factor=ENGINEERING_MEMORY_FACTOR),
+    ).run()
 
 
 def start_consumer():
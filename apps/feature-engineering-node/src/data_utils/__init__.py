@@ -1,4 +1,5 @@
 from .serializer import serialize, custom_serializer
 from .schemas import TaskDefinition
+from .loader import load_dataframe_from_url
 
-__all__ = ["TaskDefinition", "custom_serializer", "YDataProfilingSchema", "Dataset"]
+__all__ = ["TaskDefinition", "custom_serializer", "YDataProfilingSchema", "Dataset", "load_dataframe_from_url"]
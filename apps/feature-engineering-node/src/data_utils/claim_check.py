@@ -0,0 +1,124 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterable
+
+from data_utils.artifacts import ArtifactWriter
+from data_utils.serializer import custom_serializer
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Message fields whose JSON is larger than this (bytes) travel through object storage instead
+CLAIM_CHECK_THRESHOLD = int(os.environ.get("CLAIM_CHECK_THRESHOLD", str(256 * 1024)))
+CLAIM_CHECK_PREFIX = os.environ.get("CLAIM_CHECK_PREFIX", "claim-checks/")
+CLAIM_CHECK_CONCURRENCY = int(os.environ.get("CLAIM_CHECK_CONCURRENCY", "4"))
+
+# A claim check is a field value of the form {"$claim_check": {"key", "size", "sha256"}}
+CLAIM_CHECK_MARKER = "$claim_check"
+
+
+def is_claim_check(value: Any) -> bool:
+    """
+    Tells whether a field value is a claim check rather than the value itself.
+    """
+    return isinstance(value, dict) and len(value) == 1 and CLAIM_CHECK_MARKER in value
+
+
+def check_in(
+    fields: dict,
+    storage,
+    *,
+    keep: Iterable[str] = (),
+    threshold: int = CLAIM_CHECK_THRESHOLD,
+) -> dict:
+    """
+    Moves the large fields of a message payload to object storage.
+
+    Every field whose JSON encoding exceeds the threshold is stored as its own object and
+    replaced by a claim check carrying the object key, size and SHA-256 digest. Objects are
+    keyed by their digest, so an unchanged value is never stored twice.
+
+    Args:
+        fields (dict): The payload, e.g. a profiling report.
+        storage (S3Service): The storage service of the node.
+        keep (Iterable[str]): Fields that always stay inline, e.g. keys other services read.
+        threshold (int): Size in bytes above which a field is moved.
+
+    Returns:
+        dict: A copy of the payload with large fields replaced by claim checks.
+    """
+    keep = set(keep)
+    checked = dict(fields)
+    with ArtifactWriter() as artifacts:
+        for name, value in fields.items():
+            if name in keep or is_claim_check(value):
+                continue
+            data = json.dumps(value, default=custom_serializer).encode("utf-8")
+            if len(data) <= threshold:
+                continue
+            digest = hashlib.sha256(data).hexdigest()
+            key = f"{CLAIM_CHECK_PREFIX}{digest}.json"
+            artifacts.create(name, key, "application/json").write(data)
+            checked[name] = {CLAIM_CHECK_MARKER: {"key": key, "size": len(data), "sha256": digest}}
+
+        if artifacts.artifacts:
+            artifacts.upload(storage, is_public=False)
+            logger.info(f"Checked in large fields: {', '.join(artifacts.artifacts)}")
+    return checked
+
+
+def check_out(value: Any, storage) -> Any:
+    """
+    Returns the value a claim check stands for, or the value itself if it is not one.
+
+    Raises:
+        ValueError: If the stored object does not match the size or digest of the claim check.
+    """
+    if not is_claim_check(value):
+        return value
+    claim = value[CLAIM_CHECK_MARKER]
+    response = storage.s3.get_object(Bucket=storage.bucket_name, Key=claim["key"])
+    data = response["Body"].read()
+    if len(data) != claim["size"] or hashlib.sha256(data).hexdigest() != claim["sha256"]:
+        raise ValueError(f"Claim check {claim['key']} does not match the stored object")
+    return json.loads(data)
+
+
+def resolve(fields: dict, storage) -> dict:
+    """
+    Returns a copy of a payload with every claim check replaced by its value.
+
+    The referenced objects are fetched concurrently; payloads without claim checks are
+    returned as they are.
+    """
+    claimed = [name for name, value in fields.items() if is_claim_check(value)]
+    if not claimed:
+        return fields
+
+    with ThreadPoolExecutor(max_workers=CLAIM_CHECK_CONCURRENCY) as pool:
+        values = pool.map(lambda name: check_out(fields[name], storage), claimed)
+        resolved = {**fields, **dict(zip(claimed, values))}
+    logger.info(f"Resolved claim checks: {', '.join(claimed)}")
+    return resolved
+
+
+def resolve_json(text: str, storage) -> str:
+    """
+    Resolves the claim checks of a payload passed around as a JSON string.
+
+    Strings without a claim check are returned untouched, without being parsed.
+    """
+    if not text or CLAIM_CHECK_MARKER not in text:
+        return text
+    fields = json.loads(text)
+    if not isinstance(fields, dict):
+        return text
+    return json.dumps(resolve(fields, storage), default=custom_serializer, indent=2)
@@ -0,0 +1,214 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from contextlib import contextmanager, suppress
+from functools import cache
+from typing import IO, Iterator, Optional
+from urllib.parse import urlparse
+
+import requests
+
+from .ranged_download import download_into_file, get_http_session, open_first_part
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Mount the same directory into every node sharing a host to share downloads between stages
+CACHE_DIR = os.environ.get(
+    "DATASET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "automl-dataset-cache")
+)
+CACHE_ENABLED = os.environ.get("DATASET_CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_BYTES = int(os.environ.get("DATASET_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024)))
+
+
+class DatasetCache:
+    """
+    On-disk, content-addressed cache for dataset objects.
+
+    Objects are stored under a digest of their key and ETag, so a new version of an object never
+    overwrites a file another process is still reading. Entries are revalidated with a
+    conditional GET (If-None-Match) and evicted least-recently-used once the cache grows past
+    its byte budget. File locks make it safe for several processes to share one directory.
+    """
+
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_dir = os.path.join(root, "index")
+        self.locks_dir = os.path.join(root, "locks")
+        for directory in (self.objects_dir, self.index_dir, self.locks_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """
+        Returns the object key for a URL, ignoring query parameters such as presigned tokens.
+        """
+        parsed = urlparse(url)
+        return f"{parsed.netloc}{parsed.path}"
+
+    @staticmethod
+    def _digest(*parts: str) -> str:
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        with open(os.path.join(self.locks_dir, f"{name}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_entry(self, key_digest: str) -> Optional[dict]:
+        try:
+            with open(os.path.join(self.index_dir, f"{key_digest}.json")) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.isfile(os.path.join(self.objects_dir, entry["object"])):
+            return None
+        return entry
+
+    def _write_entry(self, key_digest: str, entry: dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.index_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, os.path.join(self.index_dir, f"{key_digest}.json"))
+
+    def _store(
+        self, response: requests.Response, url: str, session: requests.Session, key: str, etag: str
+    ) -> str:
+        """
+        Downloads an object into the objects directory and returns the object name.
+
+        The response is the first part of the object; the rest is fetched with parallel range
+        requests when the server supports them.
+        """
+        object_name = self._digest(key, etag)
+        fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "w+b") as f:
+                download_into_file(response, url, f, session)
+            os.replace(tmp_path, os.path.join(self.objects_dir, object_name))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return object_name
+
+    def _evict(self, keep: str) -> None:
+        """
+        Removes least-recently-used objects until the cache fits in its byte budget.
+        """
+        with self._lock("evict"):
+            objects = []
+            for name in os.listdir(self.objects_dir):
+                if name.endswith(".part"):
+                    continue
+                # a stale version may be unlinked by its key's owner meanwhile
+                with suppress(FileNotFoundError):
+                    stat = os.stat(os.path.join(self.objects_dir, name))
+                    objects.append((stat.st_mtime, stat.st_size, name))
+
+            total = sum(size for _, size, _ in objects)
+            for _, size, name in sorted(objects):
+                if total <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                # readers that already opened the file keep their handle after the unlink
+                with suppress(FileNotFoundError):
+                    os.unlink(os.path.join(self.objects_dir, name))
+                total -= size
+                logger.info(f"Evicted cached dataset object {name} ({size} bytes)")
+
+    def _fetch(
+        self, url: str, http: requests.Session, key: str, key_digest: str, entry: Optional[dict]
+    ) -> tuple[str, str]:
+        """
+        Revalidates the cached copy described by entry, or downloads the object when there is
+        none or it changed. Must be called holding the key's lock.
+
+        Returns:
+            tuple: (str, str) The object name and its content-type.
+        """
+        headers = {"If-None-Match": entry["etag"]} if entry and entry["etag"] else {}
+
+        # the first ranged request doubles as the revalidation of the cached copy
+        with open_first_part(url, http, headers) as response:
+            if entry and response.status_code == 304:
+                logger.info(f"Dataset cache hit for {key}")
+                return entry["object"], entry["content_type"]
+
+            response.raise_for_status()
+            etag = response.headers.get("etag", "")
+            content_type = response.headers.get("content-type", "").lower()
+            object_name = self._store(response, url, http, key, etag)
+            self._write_entry(
+                key_digest,
+                {
+                    "key": key,
+                    "etag": etag,
+                    "object": object_name,
+                    "content_type": content_type,
+                },
+            )
+            if entry and entry["object"] != object_name:
+                # the previous version of the object is stale now; eviction may beat us to it
+                with suppress(FileNotFoundError):
+                    os.unlink(os.path.join(self.objects_dir, entry["object"]))
+            logger.info(f"Dataset cache miss for {key}, stored as {object_name}")
+            return object_name, content_type
+
+    def _open_object(self, object_name: str) -> IO[bytes]:
+        object_path = os.path.join(self.objects_dir, object_name)
+        # the modification time doubles as the LRU timestamp
+        os.utime(object_path)
+        return open(object_path, "rb")
+
+    def open(self, url: str, session: Optional[requests.Session] = None) -> tuple[IO[bytes], str]:
+        """
+        Returns an open binary handle on the cached copy of a URL, downloading it if needed.
+
+        Args:
+            url (str): Public or presigned URL of the object.
+            session (requests.Session, optional): Session to issue the request with.
+
+        Returns:
+            tuple: (IO[bytes], str) The opened object and its content-type.
+        """
+        key = self.cache_key(url)
+        key_digest = self._digest(key)
+        http = session or get_http_session()
+
+        with self._lock(key_digest):
+            entry = self._read_entry(key_digest)
+            object_name, content_type = self._fetch(url, http, key, key_digest, entry)
+            try:
+                handle = self._open_object(object_name)
+            except FileNotFoundError:
+                # eviction only holds its own lock, so another process may remove the copy
+                # between its revalidation and here; that is a miss, download it again
+                logger.info(f"Cached dataset object {object_name} was evicted, downloading")
+                object_name, content_type = self._fetch(url, http, key, key_digest, None)
+                handle = self._open_object(object_name)
+
+        self._evict(keep=object_name)
+        return handle, content_type
+
+
+@cache
+def get_dataset_cache() -> DatasetCache:
+    """
+    Returns the process-wide dataset cache configured from the environment.
+    """
+    return DatasetCache()
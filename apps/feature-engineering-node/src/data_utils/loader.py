@@ -0,0 +1,370 @@
+import gzip
+import io
+import logging
+import os
+import shutil
+import tempfile
+from typing import IO, Iterator, Optional
+
+import pandas as pd
+import requests
+
+from .dataset_cache import CACHE_ENABLED, get_dataset_cache
+from .ranged_download import get_http_session
+from .sniffer import SNIFF_SIZE, SniffedFormat, sniff
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional, pandas' C parser is used without it
+    pa = None
+    pa_csv = None
+    pq = None
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Size of the blocks pulled off the socket and handed to the parser
+CHUNK_SIZE = 8 * 1024 * 1024
+# Binary formats (xlsx, parquet) need random access; bodies up to this size stay in memory,
+# anything larger is spilled to a temporary file instead of being held as bytes
+SPOOL_MAX_SIZE = 64 * 1024 * 1024
+
+
+class _PrefixedStream(io.RawIOBase):
+    """
+    Replays the bytes consumed while sniffing before continuing with the rest of a stream.
+    """
+
+    def __init__(self, prefix: bytes, stream: IO[bytes]):
+        self._prefix = prefix
+        self._stream = stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._prefix:
+            size = min(len(buffer), len(self._prefix))
+            buffer[:size] = self._prefix[:size]
+            self._prefix = self._prefix[size:]
+            return size
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def close(self) -> None:
+        self._stream.close()
+        super().close()
+
+
+def _peek(stream: IO[bytes]) -> tuple[IO[bytes], bytes, bool]:
+    """
+    Reads the leading bytes of a stream without losing them.
+
+    Returns:
+        tuple: (IO[bytes], bytes, bool) A stream positioned at the start, the prefix and whether
+            the payload continues past it.
+    """
+    chunks = []
+    size = 0
+    while size < SNIFF_SIZE:
+        chunk = stream.read(SNIFF_SIZE - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    prefix = b"".join(chunks)
+
+    if stream.seekable():
+        stream.seek(0)
+    else:
+        stream = _PrefixedStream(prefix, stream)
+    return stream, prefix, size == SNIFF_SIZE
+
+
+def _decompress(stream: IO[bytes], compression: str) -> IO[bytes]:
+    """
+    Wraps a compressed stream in a decompressing reader.
+    """
+    if compression == "gzip":
+        decompressed = gzip.GzipFile(fileobj=stream, mode="rb")
+    elif pa is not None:
+        decompressed = pa.input_stream(stream, compression=compression)
+    else:
+        raise ValueError(f"Reading {compression} compressed datasets requires pyarrow")
+    # hide the name and seek support of the compressed file from the readers
+    return _PrefixedStream(b"", decompressed)
+
+
+def read_csv_stream(
+    stream: IO[bytes],
+    dialect: Optional[SniffedFormat] = None,
+    columns: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Parses a CSV byte stream block by block without materializing the raw body.
+
+    With pyarrow available the blocks are parsed by its multithreaded reader and the Arrow
+    buffers are released column by column while converting, so the peak footprint stays close
+    to a single copy of the resulting frame.
+
+    Args:
+        stream (IO[bytes]): A readable binary file-like object.
+        dialect (SniffedFormat, optional): Encoding, delimiter and header row of the payload.
+            Defaults to UTF-8, comma separated, with a header row.
+        columns (list[str], optional): Only parse these columns.
+
+    Returns:
+        pd.DataFrame: The parsed dataset.
+    """
+    dialect = dialect or SniffedFormat(file_format="csv")
+    # files without a header row get generated column names
+    names = None if dialect.has_header else [f"column_{i}" for i in range(dialect.column_count)]
+
+    if pa_csv is None:
+        return pd.read_csv(
+            stream,
+            sep=dialect.delimiter,
+            encoding=dialect.encoding,
+            header=0 if dialect.has_header else None,
+            names=names,
+            usecols=columns,
+        )
+
+    table = pa_csv.read_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(
+            use_threads=True,
+            block_size=CHUNK_SIZE,
+            # the UTF-8 byte order mark is skipped by the reader itself
+            encoding="utf8" if dialect.encoding.startswith("utf-8") else dialect.encoding,
+            column_names=names,
+        ),
+        parse_options=pa_csv.ParseOptions(delimiter=dialect.delimiter),
+        convert_options=pa_csv.ConvertOptions(
+            # keep pandas semantics: empty strings in text columns are missing values
+            strings_can_be_null=True,
+            include_columns=columns,
+        ),
+    )
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def read_parquet_stream(stream: IO[bytes], columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """
+    Reads the requested columns of a Parquet file.
+
+    Files on disk are memory-mapped, so only the column chunks that are projected get paged in
+    instead of copying the whole file through Python buffers.
+
+    Args:
+        stream (IO[bytes]): A seekable binary file-like object.
+        columns (list[str], optional): Only read these columns.
+
+    Returns:
+        pd.DataFrame: The loaded dataset.
+    """
+    if pq is None:
+        return pd.read_parquet(stream, columns=columns)
+
+    path = getattr(stream, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        table = pq.read_table(path, columns=columns, memory_map=True)
+    else:
+        table = pq.read_table(stream, columns=columns)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def _spool(stream: IO[bytes]) -> IO[bytes]:
+    """
+    Copies a stream into a spooled temporary file so readers needing random access can seek.
+    """
+    spooled = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    shutil.copyfileobj(stream, spooled, CHUNK_SIZE)
+    spooled.seek(0)
+    return spooled
+
+
+def _open_payload(stream: IO[bytes], source: str) -> tuple[IO[bytes], SniffedFormat]:
+    """
+    Sniffs a payload, transparently decompressing it.
+
+    Returns:
+        tuple: (IO[bytes], SniffedFormat) The stream to read the payload from and its format.
+    """
+    stream, prefix, truncated = _peek(stream)
+    detected = sniff(prefix, truncated, source)
+    if detected.compression:
+        stream, prefix, truncated = _peek(_decompress(stream, detected.compression))
+        detected = sniff(prefix, truncated, source)
+        if detected.compression:
+            raise ValueError(f"Unsupported file format. Payload is compressed twice: {source}")
+    logger.info(f"Detected {detected} for {source}")
+    return stream, detected
+
+
+def read_dataframe(
+    stream: IO[bytes],
+    source: str,
+    columns: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Reads a dataset from a binary stream, dispatching on the format found in its first bytes.
+
+    Parquet and Excel files are recognized by their magic numbers, gzip and zstd payloads are
+    decompressed on the fly, and anything else is parsed as delimited text with the sniffed
+    encoding, delimiter and header row. File names and content-type headers are not trusted.
+
+    Args:
+        stream (IO[bytes]): A readable binary file-like object positioned at the start.
+        source (str): Where the stream comes from, used in error messages.
+        columns (list[str], optional): Only load these columns.
+
+    Returns:
+        pd.DataFrame: The parsed dataset.
+
+    Raises:
+        ValueError: If the format is not supported or the payload fails to parse.
+    """
+    stream, detected = _open_payload(stream, source)
+
+    try:
+        if detected.file_format == "csv":
+            with stream:
+                return read_csv_stream(stream, detected, columns)
+
+        # local files (e.g. cached objects) can be read in place
+        with stream if stream.seekable() else _spool(stream) as body:
+            if detected.file_format == "parquet":
+                return read_parquet_stream(body, columns)
+            return pd.read_excel(body, usecols=columns)
+    except Exception as e:
+        raise ValueError(f"Failed to parse {detected.file_format} content. URL: {source}") from e
+
+
+def iter_dataframe_chunks(
+    stream: IO[bytes], source: str, chunk_rows: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads a dataset from a binary stream as consecutive frames of at most chunk_rows rows.
+
+    CSV and Parquet payloads are read incrementally, so only one chunk is held in memory at a
+    time. Excel workbooks cannot be read incrementally and are loaded whole, then sliced.
+    Column dtypes are inferred per chunk and may differ between chunks.
+
+    Args:
+        stream (IO[bytes]): A readable binary file-like object positioned at the start.
+        source (str): Where the stream comes from, used in error messages.
+        chunk_rows (int): Maximum number of rows per chunk.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    stream, detected = _open_payload(stream, source)
+
+    if detected.file_format == "csv":
+        names = (
+            None if detected.has_header else [f"column_{i}" for i in range(detected.column_count)]
+        )
+        with (
+            stream,
+            pd.read_csv(
+                stream,
+                sep=detected.delimiter,
+                encoding=detected.encoding,
+                header=0 if detected.has_header else None,
+                names=names,
+                chunksize=chunk_rows,
+            ) as reader,
+        ):
+            yield from reader
+        return
+
+    with stream if stream.seekable() else _spool(stream) as body:
+        if detected.file_format == "parquet" and pq is not None:
+            for batch in pq.ParquetFile(body).iter_batches(batch_size=chunk_rows):
+                yield batch.to_pandas(split_blocks=True, self_destruct=True)
+            return
+
+        dataframe = (
+            pd.read_parquet(body) if detected.file_format == "parquet" else pd.read_excel(body)
+        )
+        for start in range(0, len(dataframe), chunk_rows):
+            yield dataframe.iloc[start : start + chunk_rows]
+
+
+def iter_dataframe_chunks_from_url(
+    url: str, chunk_rows: int, session: Optional[requests.Session] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Streams a dataset from a URL as consecutive row chunks, see iter_dataframe_chunks.
+
+    With the dataset cache enabled the object is downloaded once and every further pass over
+    the chunks is read from disk.
+
+    Args:
+        url (str): Public or presigned URL of the dataset object.
+        chunk_rows (int): Maximum number of rows per chunk.
+        session (requests.Session, optional): Session to issue the request with.
+
+    Yields:
+        pd.DataFrame: The next chunk of rows.
+    """
+    logger.info(f"Streaming data in chunks of {chunk_rows} rows from URL: {url}")
+
+    if CACHE_ENABLED:
+        handle, _ = get_dataset_cache().open(url, session=session)
+        with handle:
+            yield from iter_dataframe_chunks(handle, url, chunk_rows)
+        return
+
+    http = session or get_http_session()
+    with http.get(url, stream=True) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        yield from iter_dataframe_chunks(response.raw, url, chunk_rows)
+
+
+def load_dataframe_from_url(
+    url: str,
+    session: Optional[requests.Session] = None,
+    columns: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Streams a dataset from a URL straight into the parser.
+
+    The response body is consumed in CHUNK_SIZE blocks and never held as a whole in memory;
+    the format is sniffed from the first bytes of the body.
+    Unless DATASET_CACHE_ENABLED is false the body goes through the node-local DatasetCache,
+    so repeated loads of an unchanged object only cost a conditional request and Parquet
+    objects are memory-mapped from the cache.
+
+    Args:
+        url (str): Public or presigned URL of the dataset object.
+        session (requests.Session, optional): Session to issue the request with.
+        columns (list[str], optional): Only load these columns.
+
+    Returns:
+        pd.DataFrame: The loaded dataset.
+    """
+    logger.info(f"Loading data from URL: {url}")
+
+    if CACHE_ENABLED:
+        # served from (or streamed into) the node-local cache, then parsed from disk
+        handle, _ = get_dataset_cache().open(url, session=session)
+        with handle:
+            return read_dataframe(handle, url, columns=columns)
+
+    http = session or get_http_session()
+    with http.get(url, stream=True) as response:
+        response.raise_for_status()
+        # let urllib3 undo any transfer compression while the parser reads
+        response.raw.decode_content = True
+        return read_dataframe(response.raw, url, columns=columns)
@@ -0,0 +1,145 @@
+import csv
+import io
+from dataclasses import dataclass
+from typing import Optional
+
+# Number of leading bytes inspected to recognize a payload
+SNIFF_SIZE = 64 * 1024
+
+# Magic numbers of the containers we accept
+PARQUET_MAGIC = b"PAR1"
+ZIP_MAGIC = b"PK\x03\x04"  # xlsx workbooks are zip archives
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # legacy xls workbooks
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+BOMS = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+CSV_DELIMITERS = ",;\t|"
+
+
+@dataclass(frozen=True)
+class SniffedFormat:
+    """
+    What a payload prefix says about the file.
+
+    Attributes:
+        file_format (str | None): "csv", "xlsx", "xls", "parquet", or None when the payload is
+            compressed and has to be sniffed again after decompression.
+        compression (str | None): "gzip" or "zstd" when the payload is compressed.
+        encoding (str): Text encoding of a CSV payload.
+        delimiter (str): Field delimiter of a CSV payload.
+        has_header (bool): Whether the first CSV row holds column names.
+        column_count (int): Number of fields in the first CSV row.
+    """
+
+    file_format: Optional[str]
+    compression: Optional[str] = None
+    encoding: str = "utf-8"
+    delimiter: str = ","
+    has_header: bool = True
+    column_count: int = 0
+
+
+def _detect_encoding(prefix: bytes, truncated: bool) -> str:
+    """
+    Picks the text encoding of a prefix: BOM first, then UTF-8, then the Windows code page.
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+    try:
+        prefix.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError as e:
+        # the prefix may end in the middle of a multi-byte character
+        if truncated and e.start >= len(prefix) - 3:
+            return "utf-8"
+    try:
+        prefix.decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _is_number(value: str) -> bool:
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _sniff_csv(prefix: bytes, truncated: bool, source: str) -> SniffedFormat:
+    """
+    Detects encoding, delimiter and header row of a delimited text payload.
+    """
+    encoding = _detect_encoding(prefix, truncated)
+    if b"\x00" in prefix and encoding != "utf-16":
+        raise ValueError(
+            f"Unsupported file format. Payload is neither text nor a known format: {source}"
+        )
+
+    text = prefix.decode(encoding, errors="ignore")
+    lines = text.splitlines()
+    if truncated and len(lines) > 1:
+        # the last line is most likely cut off
+        lines = lines[:-1]
+    sample = "\n".join(lines[:50])
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        delimiter = ","
+
+    rows = list(csv.reader(io.StringIO(sample), delimiter=delimiter))
+    first_row = rows[0] if rows else []
+    # a header is assumed like pandas does; numeric names such as years are common, so the
+    # first row is taken for data only when all of it is numeric and the csv sniffer agrees
+    has_header = not first_row or not all(value and _is_number(value) for value in first_row)
+    if not has_header:
+        try:
+            has_header = csv.Sniffer().has_header(sample)
+        except csv.Error:
+            has_header = True
+
+    return SniffedFormat(
+        file_format="csv",
+        encoding=encoding,
+        delimiter=delimiter,
+        has_header=has_header,
+        column_count=len(first_row),
+    )
+
+
+def sniff(prefix: bytes, truncated: bool, source: str) -> SniffedFormat:
+    """
+    Identifies a payload from its first bytes.
+
+    Args:
+        prefix (bytes): Up to SNIFF_SIZE leading bytes of the payload.
+        truncated (bool): Whether the payload continues past the prefix.
+        source (str): Where the payload comes from, used in error messages.
+
+    Returns:
+        SniffedFormat: The detected format and, for CSV, its dialect.
+
+    Raises:
+        ValueError: If the payload is empty or binary in an unknown format.
+    """
+    if not prefix:
+        raise ValueError(f"Unsupported file format. Payload is empty: {source}")
+    if prefix.startswith(PARQUET_MAGIC):
+        return SniffedFormat(file_format="parquet")
+    if prefix.startswith(ZIP_MAGIC):
+        return SniffedFormat(file_format="xlsx")
+    if prefix.startswith(OLE2_MAGIC):
+        return SniffedFormat(file_format="xls")
+    if prefix.startswith(GZIP_MAGIC):
+        return SniffedFormat(file_format=None, compression="gzip")
+    if prefix.startswith(ZSTD_MAGIC):
+        return SniffedFormat(file_format=None, compression="zstd")
+    return _sniff_csv(prefix, truncated, source)
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from services.feature_service import process_feature_engineering
+from data_utils.job_context import JobContext
 import pandas as pd
 import json
 import io
@@ -29,6 +30,7 @@ async def process_features(
         raise HTTPException(status_code=400, detail=f"Error parsing files: {e}")
 
     # Now, pass the DataFrame and dictionary to your service function
-    return process_feature_engineering(
-        csv_df, profiling_dict, target_column, task
-    )
\ No newline at end of file
+    with JobContext("api", "feature_engineering") as context:
+        return process_feature_engineering(
+            csv_df, profiling_dict, target_column, task, context
+        )
\ No newline at end of file
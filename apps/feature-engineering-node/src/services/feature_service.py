@@ -1,13 +1,16 @@
-from io import BytesIO, StringIO
-from urllib.parse import urlparse
 import pandas as pd
 import logging, json
 
-import requests, uuid
 from agents.feature_engineer.agent import feature_engineer
 from agents.predict_feature_creator.agent import predict_feature_creator
 from agents.summarizer.agent import page_generator
 from services.s3_service import S3Service
+from data_utils.loader import load_dataframe_from_url
+from data_utils.artifacts import ArtifactWriter
+from data_utils.claim_check import resolve
+from data_utils.compaction import apply_frame_policy
+from data_utils.columnar import PARQUET_CONTENT_TYPE, PARQUET_EXTENSION, write_parquet
+from data_utils.job_context import JobContext
 
 s3_service = S3Service()
 
@@ -21,8 +24,15 @@ logger.setLevel(logging.DEBUG)
 
 
 def process_feature_engineering(
-    csv_data: pd.DataFrame, profiling_data: dict, target_column: str, task: str
+    csv_data: pd.DataFrame,
+    profiling_data: dict,
+    target_column: str,
+    task: str,
+    context: JobContext,
 ):
+    # the agent reads the whole report, so large sections left as claim checks are fetched now
+    profiling_data = resolve(profiling_data, s3_service)
+
     # invode the agent to process the feature engineering
     feature_engineering_result = feature_engineer.invoke(
         {
@@ -30,6 +40,7 @@ def process_feature_engineering(
             "profiling": profiling_data,
             "target_column": target_column,
             "task_type": task,
+            "cancellation": context.cancellation,
         }
     )
     feature_engineering_code = feature_engineering_result["code"]
@@ -43,23 +54,27 @@ def process_feature_engineering(
             "data": test_data,
             "task_type": task,
             "learned_params": learned_parameters,
+            "cancellation": context.cancellation,
         }
     )
 
-    # save the codes to files
-    with open("files/feature_engineering_code.py", "w") as f:
-        f.write(feature_engineering_code)
-    with open("files/feature_transformation_code.py", "w") as f:
-        f.write(prediction_result["code"])
-
-    # save the resulting data to a csv file
-    resulting_data.to_csv("files/resulting_data.csv", index=False)
+    # serialize the codes as artifacts, all keyed in the job's namespace
+    artifacts = context.artifacts
+    artifacts.create(
+        "feature_engineering_code", context.key("feature_engineering.py"), "text/x-python"
+    ).write_text(feature_engineering_code)
+    artifacts.create(
+        "feature_transformation_code",
+        context.key("feature_transformation.py"),
+        "text/x-python",
+    ).write_text(prediction_result["code"])
 
-    # save the learned parameters to a json file
-    with open("files/learned_parameters.json", "w") as f:
-        import json
+    # serialize the resulting data as parquet, so the next stage keeps its dtypes
+    data_artifact = artifacts.create("data", context.key(PARQUET_EXTENSION), PARQUET_CONTENT_TYPE)
+    write_parquet(resulting_data, data_artifact.buffer)
 
-        json.dump(learned_parameters, f)
+    # the agents check the token between their rounds, the summary is the last LLM call
+    context.check_cancelled()
 
     # invoke the summarizer agent to generate a page
     summary = page_generator.invoke(
@@ -110,9 +125,13 @@ def process_feature_engineering(
 
     """
 
-    # save the rendered template to a file
-    with open("files/summary.html", "w", encoding="utf-8") as f:
-        f.write(resulting_page)
+    # serialize the rendered template as an artifact
+    artifacts.create("summary", context.key("summary.html"), "text/html").write_text(
+        resulting_page
+    )
+
+    # report the learned parameters the way they read back from JSON
+    return json.loads(json.dumps(learned_parameters))
 
 
 def download_dataset(dataset_key: str):
@@ -121,93 +140,19 @@ def download_dataset(dataset_key: str):
     if not file_uri:
         raise ValueError(f"Failed to get presigned URL for dataset file: {dataset_key}")
 
-    response = requests.get(file_uri)
-    response.raise_for_status()
-
-    # 1. Extract filename without query parameters
-    parsed_url = urlparse(file_uri)
-    filepath = parsed_url.path  # /datasets/.../file.csv
-    filename = filepath.split("/")[-1].lower()  # file.csv
-
-    # 2. Get content-type (fallback to empty string)
-    content_type = response.headers.get("content-type", "").lower()
-
-    # 3. Determine file type
-    if filename.endswith(".csv") or "csv" in content_type:
-        return pd.read_csv(StringIO(response.text))
-    elif filename.endswith(".xlsx") or "excel" in content_type:
-        return pd.read_excel(BytesIO(response.content))
-    elif filename.endswith(".parquet") or "parquet" in content_type:
-        return pd.read_parquet(BytesIO(response.content))
-    else:
-        # 4. Fallback: Attempt to parse content directly
-        try:
-            # Try CSV first (common case)
-            return pd.read_csv(StringIO(response.text))
-        except pd.errors.ParserError:
-            try:
-                # Try Excel
-                return pd.read_excel(BytesIO(response.content))
-            except Exception:
-                try:
-                    # Try Parquet
-                    return pd.read_parquet(BytesIO(response.content))
-                except Exception as e:
-                    raise ValueError(
-                        f"Unsupported file format. Failed to parse content. URL: {file_uri}"
-                    ) from e
-
-
-def upload_results_to_s3():
-    # upload the feature engineered data to s3
-    with open("files/resulting_data.csv", "rb") as f:
-        data_name = str(str(uuid.uuid4())) + ".csv"
-        s3_service.upload_single_file(
-            file_obj=f, filename=data_name, content_type="text/csv", is_public=True, key=data_name
-        )
+    # stream the object straight into the parser
+    return load_dataframe_from_url(file_uri)
 
-    # upload the feature_engineering code to s3
-    with open("files/feature_engineering_code.py", "rb") as f:
-        feature_engineering_name = str(str(uuid.uuid4())) + "feature_engineering.py"
-        s3_service.upload_single_file(
-            file_obj=f,
-            filename=feature_engineering_name,
-            content_type="text/x-python",
-            is_public=True,
-            key=feature_engineering_name,
-        )
 
-    # upload the feature_transformation code to s3
-    with open("files/feature_transformation_code.py", "rb") as f:
-        feature_transformation_name = str(str(uuid.uuid4())) + "feature_transformation.py"
-        s3_service.upload_single_file(
-            file_obj=f,
-            filename=feature_transformation_name,
-            content_type="text/x-python",
-            is_public=True,
-            key=feature_transformation_name,
-        )
-
-    # upload the summary page to s3
-    with open("files/summary.html", "rb") as f:
-        summary_name = str(str(uuid.uuid4())) + "summary.html"
-        s3_service.upload_single_file(
-            file_obj=f,
-            filename=summary_name,
-            content_type="text/html",
-            is_public=True,
-            key=summary_name,
-        )
-
-    # load the learned parameters from the json file
-    with open("files/learned_parameters.json", "r") as f:
-        learned_parameters = json.load(f)
+def upload_results_to_s3(artifacts: ArtifactWriter, learned_parameters: dict):
+    # upload the feature engineered data, both codes and the summary page to s3 together
+    keys = artifacts.upload(s3_service)
 
     return {
-        "data_key": data_name,
-        "feature_engineering_code_key": feature_engineering_name,
-        "feature_transformation_code_key": feature_transformation_name,
-        "summary_key": summary_name,
+        "data_key": keys["data"],
+        "feature_engineering_code_key": keys["feature_engineering_code"],
+        "feature_transformation_code_key": keys["feature_transformation_code"],
+        "summary_key": keys["summary"],
         "learned_parameters": learned_parameters,
     }
 
@@ -217,21 +162,30 @@ def process_feature_engineering_from_queue(
     profiling: str,
     task_type: str,
     target_column: str,
+    context: JobContext,
 ):
     try:
-        # load the dataset from the dataset_key
-        csv_data = download_dataset(dataset_key)
-        logger.info("Dataset loaded successfully.")
-
         # load the profiling data from the json_key
         profiling_data = json.loads(profiling)
         logger.info("Profiling data loaded successfully.")
 
+        # prefer the columnar copy written by the profiling node over the raw upload
+        csv_data = download_dataset(profiling_data.get("columnar_object_name") or dataset_key)
+        # the generated code does arithmetic on the columns and fills or relabels text values,
+        # so numeric widths are kept and text stays text instead of becoming categories
+        csv_data, bytes_saved = apply_frame_policy(
+            csv_data, downcast_numeric=False, category_max_ratio=0
+        )
+        logger.info(f"Bytes saved per column: {bytes_saved}")
+        logger.info("Dataset loaded successfully.")
+
         # now profile the dataset
-        process_feature_engineering(csv_data, profiling_data, target_column, task_type)
+        learned_parameters = process_feature_engineering(
+            csv_data, profiling_data, target_column, task_type, context
+        )
 
         # now upload the results to s3
-        return upload_results_to_s3()
+        return upload_results_to_s3(context.artifacts, learned_parameters)
 
     except Exception as e:
         logger.error(f"Error loading dataset: {e}")
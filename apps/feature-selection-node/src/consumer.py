@@ -1,18 +1,27 @@
-import json
-import pika
 import threading
 import os
 import logging
 from dotenv import load_dotenv, find_dotenv
 from data_utils.schemas import TaskDefinition
-from services.featuer_selector import process_feature_selection_from_queue
+from services.featuer_selector import process_feature_selection_from_queue, s3_service
 from producer import send_message
 
 load_dotenv(find_dotenv())
 
+from data_utils.cancellation import CancellationToken, JobCancelled, cancellable
+from data_utils.codec import MessageDecodeError, decode_message
+from data_utils.job_context import JobContext
+from data_utils.job_store import JobStore, job_fingerprint, object_version, try_fingerprint
+from data_utils.scheduler import object_size_estimator
+from data_utils.worker_pool import WorkerPoolConsumer, cores_per_worker
+
 RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
 QUEUE_NAME = os.environ.get("DATA_SELECTION_REQUEST_QUEUE", "DATA_SELECTION_REQUEST_QUEUE")
 
+# Peak memory per byte of the dataset: featurewiz copies the frame for its correlation and
+# boosting rounds, and a process worker holds its own imports
+SELECTION_MEMORY_FACTOR = 8
+
 # Logger Config
 logging.basicConfig(
     level=logging.INFO,
@@ -21,24 +30,55 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+job_store = JobStore()
+
+STAGE = "feature_selection"
+
+
+def select(task_info: TaskDefinition, cancellation: CancellationToken) -> dict:
+    # the job keeps its artifacts and scratch files to itself, so concurrent jobs never collide
+    with JobContext(task_info.dataset_id, STAGE, cancellation=cancellation) as context:
+        return process_feature_selection_from_queue(
+            dataset_key=task_info.dataset_key,
+            target_column=task_info.target_column,
+            context=context,
+        )
+
 
 def process_message(ch, method, properties, body):
-    logger.info(f"Received message: {body.decode()}")
+    logger.info(f"Received message: {len(body)} bytes ({properties.content_type or 'untyped'})")
     dataset_id = ""
     try:
-        message_data = json.loads(body.decode())
+        message_data = decode_message(body, properties)
         task_info = TaskDefinition.from_dict(message_data)
         dataset_id = task_info.dataset_id
         logger.info(f"Task Definition: {task_info}")
         try:
-            # Process the feature selection task
-            data_keys = process_feature_selection_from_queue(
-                dataset_key=task_info.dataset_key, target_column=task_info.target_column
+            # the same request on unchanged data republishes the stored result
+            fingerprint = try_fingerprint(
+                lambda: job_fingerprint(
+                    QUEUE_NAME,
+                    {
+                        "dataset_id": task_info.dataset_id,
+                        "dataset_key": task_info.dataset_key,
+                        "target_column": task_info.target_column,
+                    },
+                    [object_version(s3_service, task_info.dataset_key)],
+                )
             )
 
+            # Process the feature selection task; a cancellation request for the dataset stops
+            # it before its artifacts are uploaded
+            with cancellable(task_info.dataset_id, STAGE) as cancellation:
+                data_keys = job_store.run(fingerprint, lambda: select(task_info, cancellation))
+
             # publish the result to the result queue
             send_message(message={"dataset_id": task_info.dataset_id, "error": "", **data_keys})
 
+            ch.basic_ack(delivery_tag=method.delivery_tag)
+        except JobCancelled as e:
+            # cancelled on request, nobody waits for the result any more
+            logger.info(f"Stopped job: {e}")
             ch.basic_ack(delivery_tag=method.delivery_tag)
         except Exception as e:
             logger.error(f"Error processing feature selection task: {e}")
@@ -56,8 +96,8 @@ def process_message(ch, method, properties, body):
                 }
             )
             ch.basic_ack(delivery_tag=method.delivery_tag)
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding JSON: {e}")
+    except MessageDecodeError as e:
+        logger.error(f"Error decoding message: {e}")
         send_message(
             message={
                 "dataset_id": dataset_id,
@@ -87,15 +127,19 @@ def process_message(ch, method, properties, body):
 
 
 def consume():
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672, heartbeat=10000)
+    # featurewiz redirects stdout and draws on global pyplot figures, so concurrent
+    # jobs run in separate processes by default
+    consumer = WorkerPoolConsumer(
+        QUEUE_NAME,
+        process_message,
+        RABBITMQ_HOST,
+        pool=os.environ.get("CONSUMER_POOL", "process"),
+        # small datasets run ahead of large ones, shared fairly between datasets
+        estimator=object_size_estimator(
+            s3_service, memory_factor=SELECTION_MEMORY_FACTOR, cpus=cores_per_worker()
+        ),
     )
-    channel = connection.channel()
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=process_message)
-    logger.info(" [*] Waiting for messages. To exit press CTRL+C")
-    channel.start_consuming()
+    consumer.run()
 
 
 def start_consumer():
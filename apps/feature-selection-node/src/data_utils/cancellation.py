@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional, TypeVar
+
+import pika
+from pika.exceptions import AMQPError
+
+from data_utils.codec import MessageDecodeError, decode_message
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+RABBITMQ_HOST = os.environ.get("RABBITMQ_HOST", "rabbitmq")
+# Fanout exchange cancellation requests are published to; every node process receives them
+JOB_CONTROL_EXCHANGE = os.environ.get("JOB_CONTROL_EXCHANGE", "JOB_CONTROL_EXCHANGE")
+JOB_CONTROL_RECONNECT_DELAY = float(os.environ.get("JOB_CONTROL_RECONNECT_DELAY", "5"))
+
+T = TypeVar("T")
+
+
+class JobCancelled(Exception):
+    """Raised inside a job once its cancellation was requested."""
+
+
+class CancellationToken:
+    """
+    Tells a running job whether it was asked to stop.
+
+    Jobs check the token between their stages, e.g. between Optuna trials or agent rounds,
+    and stop by raising JobCancelled, which releases the worker for the next message.
+
+    Args:
+        job_id (str): Identifies the job in cancellation requests, i.e. its dataset_id.
+        stage (str): Name of the job, e.g. "data_profiling".
+    """
+
+    def __init__(self, job_id: str, stage: str):
+        self.job_id = job_id
+        self.stage = stage
+        self.reason = ""
+        self._event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "") -> None:
+        self.reason = reason
+        self._event.set()
+
+    def raise_if_cancelled(self) -> None:
+        """
+        Raises:
+            JobCancelled: If the job was cancelled.
+        """
+        if self._event.is_set():
+            reason = f": {self.reason}" if self.reason else ""
+            raise JobCancelled(f"{self.stage} of {self.job_id} was cancelled{reason}")
+
+    def checked(self, items: Iterable[T]) -> Iterator[T]:
+        """
+        Yields the items, checking the token before each one, e.g. between dataset chunks.
+        """
+        for item in items:
+            self.raise_if_cancelled()
+            yield item
+
+
+class CancellationListener:
+    """
+    Receives cancellation requests and cancels the tokens of the jobs they name.
+
+    Requests are published to the JOB_CONTROL_EXCHANGE fanout exchange as
+    {"dataset_id", "stage", "reason"}, where an empty stage cancels every stage working on the
+    dataset. Each process binds its own exclusive queue, so a request reaches whichever node
+    runs the job. Only jobs running when the request arrives are cancelled; a later request
+    for the same dataset, such as a resubmission, runs normally.
+
+    The listener consumes on a daemon thread started with the first job and reconnects when
+    the connection drops.
+
+    Args:
+        parameters (pika.ConnectionParameters): Where and how to connect to the broker.
+        exchange (str): Name of the control exchange.
+    """
+
+    def __init__(
+        self, parameters: pika.ConnectionParameters, exchange: str = JOB_CONTROL_EXCHANGE
+    ):
+        self.parameters = parameters
+        self.exchange = exchange
+        self._lock = threading.Lock()
+        self._tokens: dict[str, set[CancellationToken]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """
+        Starts listening, unless the listener already runs.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="job-control-listener", daemon=True
+                )
+                self._thread.start()
+
+    def register(self, job_id: str, stage: str) -> CancellationToken:
+        self.start()
+        token = CancellationToken(job_id, stage)
+        with self._lock:
+            self._tokens.setdefault(job_id, set()).add(token)
+        return token
+
+    def unregister(self, token: CancellationToken) -> None:
+        with self._lock:
+            tokens = self._tokens.get(token.job_id, set())
+            tokens.discard(token)
+            if not tokens:
+                self._tokens.pop(token.job_id, None)
+
+    def cancel(self, job_id: str, stage: str = "", reason: str = "") -> int:
+        """
+        Cancels the running jobs on a dataset, optionally only those of one stage.
+
+        Returns:
+            int: The number of jobs cancelled in this process.
+        """
+        with self._lock:
+            tokens = [
+                token
+                for token in self._tokens.get(job_id, ())
+                if not stage or token.stage == stage
+            ]
+        for token in tokens:
+            token.cancel(reason)
+            logger.info(f"Cancelling {token.stage} of {job_id}{f': {reason}' if reason else ''}")
+        return len(tokens)
+
+    def _run(self) -> None:
+        while True:
+            try:
+                connection = pika.BlockingConnection(self.parameters)
+                channel = connection.channel()
+                channel.exchange_declare(
+                    exchange=self.exchange, exchange_type="fanout", durable=True
+                )
+                queue = channel.queue_declare(queue="", exclusive=True).method.queue
+                channel.queue_bind(queue=queue, exchange=self.exchange)
+                channel.basic_consume(
+                    queue=queue, on_message_callback=self._on_request, auto_ack=True
+                )
+                logger.info(f" [*] Listening for cancellations on {self.exchange}")
+                channel.start_consuming()
+            except AMQPError as e:
+                logger.warning(
+                    f"Job control connection lost, reconnecting in "
+                    f"{JOB_CONTROL_RECONNECT_DELAY}s: {e}"
+                )
+                time.sleep(JOB_CONTROL_RECONNECT_DELAY)
+
+    def _on_request(self, channel, method, properties, body) -> None:
+        try:
+            request = decode_message(body, properties)
+            job_id = str(request["dataset_id"])
+        except (MessageDecodeError, KeyError, TypeError) as e:
+            logger.error(f"Ignoring malformed cancellation request: {e}")
+            return
+        self.cancel(job_id, request.get("stage") or "", request.get("reason") or "")
+
+
+cancellations = CancellationListener(pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672))
+
+
+@contextmanager
+def cancellable(job_id: str, stage: str) -> Iterator[CancellationToken]:
+    """
+    Registers a job for cancellation while the block runs and yields its token.
+    """
+    token = cancellations.register(str(job_id), stage)
+    try:
+        yield token
+    finally:
+        cancellations.unregister(token)
+
+
+def request_cancellation(job_id: str, stage: str = "", reason: str = "") -> None:
+    """
+    Asks every node to stop its running jobs on a dataset, optionally only one stage.
+    """
+    connection = pika.BlockingConnection(cancellations.parameters)
+    try:
+        channel = connection.channel()
+        channel.exchange_declare(
+            exchange=JOB_CONTROL_EXCHANGE, exchange_type="fanout", durable=True
+        )
+        channel.basic_publish(
+            exchange=JOB_CONTROL_EXCHANGE,
+            routing_key="",
+            body=json.dumps({"dataset_id": str(job_id), "stage": stage, "reason": reason}),
+            properties=pika.BasicProperties(content_type="application/json"),
+        )
+    finally:
+        connection.close()
@@ -0,0 +1,148 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+COMPACTION_ENABLED = os.environ.get("DATAFRAME_COMPACTION_ENABLED", "true").lower() == "true"
+# Text columns whose distinct values make up at most this share of their rows become categories
+CATEGORY_MAX_RATIO = float(os.environ.get("DATAFRAME_CATEGORY_MAX_RATIO", "0.5"))
+STRING_DTYPE = "string[pyarrow]"
+
+
+def enable_copy_on_write() -> None:
+    """
+    Turns on pandas copy-on-write, so column selections and df.copy() share buffers until written.
+    """
+    pd.set_option("mode.copy_on_write", True)
+
+
+def _downcast_float(series: pd.Series) -> pd.Series:
+    """
+    Converts a float64 column to float32 when every value survives the round trip.
+    """
+    downcast = series.astype(np.float32)
+    if np.array_equal(
+        downcast.to_numpy(dtype=np.float64), series.to_numpy(dtype=np.float64), equal_nan=True
+    ):
+        return downcast
+    return series
+
+
+def _compact_text(series: pd.Series, category_max_ratio: float) -> pd.Series:
+    """
+    Stores a column holding only strings as a category or an Arrow-backed string column.
+
+    Columns holding other Python objects, or strings mixed with other types, are left as they
+    are so that mixed columns are still reported as such.
+    """
+    if pd.api.types.infer_dtype(series, skipna=True) != "string":
+        return series
+
+    non_null = int(series.count())
+    if non_null and series.nunique(dropna=True) <= non_null * category_max_ratio:
+        return series.astype("category")
+    return series.astype(STRING_DTYPE)
+
+
+def compact_series(
+    series: pd.Series,
+    category_max_ratio: float = CATEGORY_MAX_RATIO,
+    downcast_numeric: bool = True,
+) -> pd.Series:
+    """
+    Returns the column in the smallest dtype that represents its values without loss.
+
+    Args:
+        series (pd.Series): The column to compact.
+        category_max_ratio (float): Maximum share of distinct values for a text column to be
+            stored as a category.
+        downcast_numeric (bool): Whether to narrow integer and float columns.
+
+    Returns:
+        pd.Series: The compacted column, or the original one when nothing can be saved.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not isinstance(dtype, np.dtype):
+        # booleans are already one byte; extension dtypes are compact already
+        return series
+    if pd.api.types.is_object_dtype(dtype):
+        return _compact_text(series, category_max_ratio)
+    if not downcast_numeric:
+        return series
+    if pd.api.types.is_unsigned_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast="unsigned")
+    if pd.api.types.is_integer_dtype(dtype):
+        return pd.to_numeric(series, downcast="integer")
+    if pd.api.types.is_float_dtype(dtype):
+        return _downcast_float(series)
+    return series
+
+
+def compact_dataframe(
+    dataframe: pd.DataFrame,
+    category_max_ratio: float = CATEGORY_MAX_RATIO,
+    downcast_numeric: bool = True,
+) -> tuple[pd.DataFrame, dict[str, int]]:
+    """
+    Shrinks a freshly loaded dataset to a compact representation.
+
+    Integer columns are downcast to the narrowest type holding their range, float columns to
+    float32 when lossless, low-cardinality text columns become categories and the remaining
+    text columns Arrow-backed strings.
+
+    Args:
+        dataframe (pd.DataFrame): The dataset to compact.
+        category_max_ratio (float): Maximum share of distinct values for a text column to be
+            stored as a category.
+        downcast_numeric (bool): Whether to narrow integer and float columns. Narrow integers
+            wrap around silently in arithmetic, so code transforming the values may opt out.
+
+    Returns:
+        tuple: (pd.DataFrame, dict) The compacted dataset and the bytes saved per column.
+    """
+    compacted = {}
+    bytes_saved = {}
+    for position, col in enumerate(dataframe.columns):
+        series = dataframe.iloc[:, position]
+        before = int(series.memory_usage(index=False, deep=True))
+        series = compact_series(series, category_max_ratio, downcast_numeric)
+        bytes_saved[str(col)] = before - int(series.memory_usage(index=False, deep=True))
+        compacted[position] = series
+
+    result = pd.concat(compacted, axis=1, copy=False) if compacted else dataframe.copy()
+    result.columns = dataframe.columns
+    result.index = dataframe.index
+
+    logger.info(f"Compacted dataset, {sum(bytes_saved.values())} bytes saved")
+    return result, bytes_saved
+
+
+def apply_frame_policy(dataframe: pd.DataFrame, **options) -> tuple[pd.DataFrame, dict[str, int]]:
+    """
+    Applies the node's frame policy to a loaded dataset: copy-on-write and compact dtypes.
+
+    Compaction can be turned off with DATAFRAME_COMPACTION_ENABLED=false.
+
+    Args:
+        dataframe (pd.DataFrame): The dataset as returned by the loader.
+        **options: Passed on to compact_dataframe.
+
+    Returns:
+        tuple: (pd.DataFrame, dict) The dataset to work with and the bytes saved per column.
+    """
+    enable_copy_on_write()
+    if not COMPACTION_ENABLED:
+        return dataframe, {}
+
+    compacted, bytes_saved = compact_dataframe(dataframe, **options)
+    logger.debug(f"Bytes saved per column: {bytes_saved}")
+    return compacted, bytes_saved
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException
 from services.featuer_selector import process_feature_selection_from_api
+from data_utils.job_context import JobContext
 import pandas as pd
 import json
 import io
@@ -21,6 +22,7 @@ async def process_features(
         raise HTTPException(status_code=400, detail=f"Error parsing files: {e}")
 
     # Now, pass the DataFrame and dictionary to your service function
-    return process_feature_selection_from_api(
-        csv_df, target_column
-    )
\ No newline at end of file
+    with JobContext("api", "feature_selection") as context:
+        return process_feature_selection_from_api(
+            csv_df, target_column, context
+        )
\ No newline at end of file
@@ -1,9 +1,11 @@
-from urllib.parse import urlparse
-import uuid
 import matplotlib
-import requests
 
 from services.s3_service import S3Service
+from data_utils.loader import load_dataframe_from_url
+from data_utils.compaction import apply_frame_policy
+from data_utils.columnar import PARQUET_CONTENT_TYPE, PARQUET_EXTENSION, write_parquet
+from data_utils.job_context import JobContext
+from data_utils.worker_pool import cores_per_worker
 
 matplotlib.use("Agg")
 
@@ -12,6 +14,7 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from featurewiz import featurewiz
 from contextlib import redirect_stdout
+from threadpoolctl import threadpool_limits
 from agents.agent import page_generator
 
 s3_service = S3Service()
@@ -72,8 +75,7 @@ def generate_summary(context: dict):
 
       """
 
-    with open("files/summary.html", "w") as file:
-        file.write(resulting_page)
+    return resulting_page
 
 
 def download_dataset(dataset_key: str):
@@ -82,41 +84,8 @@ def download_dataset(dataset_key: str):
     if not file_uri:
         raise ValueError(f"Failed to get presigned URL for dataset file: {dataset_key}")
 
-    response = requests.get(file_uri)
-    response.raise_for_status()
-
-    # 1. Extract filename without query parameters
-    parsed_url = urlparse(file_uri)
-    filepath = parsed_url.path  # /datasets/.../file.csv
-    filename = filepath.split("/")[-1].lower()  # file.csv
-
-    # 2. Get content-type (fallback to empty string)
-    content_type = response.headers.get("content-type", "").lower()
-
-    # 3. Determine file type
-    if filename.endswith(".csv") or "csv" in content_type:
-        return pd.read_csv(io.StringIO(response.text))
-    elif filename.endswith(".xlsx") or "excel" in content_type:
-        return pd.read_excel(io.BytesIO(response.content))
-    elif filename.endswith(".parquet") or "parquet" in content_type:
-        return pd.read_parquet(io.BytesIO(response.content))
-    else:
-        # 4. Fallback: Attempt to parse content directly
-        try:
-            # Try CSV first (common case)
-            return pd.read_csv(io.StringIO(response.text))
-        except pd.errors.ParserError:
-            try:
-                # Try Excel
-                return pd.read_excel(io.BytesIO(response.content))
-            except Exception:
-                try:
-                    # Try Parquet
-                    return pd.read_parquet(io.BytesIO(response.content))
-                except Exception as e:
-                    raise ValueError(
-                        f"Unsupported file format. Failed to parse content. URL: {file_uri}"
-                    ) from e
+    # stream the object straight into the parser
+    return load_dataframe_from_url(file_uri)
 
 
 def extract_data_from_figure(fig):
@@ -189,7 +158,9 @@ def select_features(data: pd.DataFrame, target: str):
     """
     log_stream = io.StringIO()
 
-    with redirect_stdout(log_stream):
+    # featurewiz's models and BLAS calls run on this job's share of the cores, next to the
+    # pool's other jobs
+    with redirect_stdout(log_stream), threadpool_limits(limits=cores_per_worker()):
         selected_features, new_df = featurewiz(
             dataname=data,
             target=target,
@@ -223,13 +194,18 @@ def select_features(data: pd.DataFrame, target: str):
     }
 
 
-def process_feature_selection_from_queue(dataset_key: str, target_column: str):
+def process_feature_selection_from_queue(
+    dataset_key: str, target_column: str, context: JobContext
+):
     """
     Process feature selection from a dataset stored in S3.
     """
     try:
-        # Download the dataset
-        data = download_dataset(dataset_key)
+        # Download the dataset, text columns are handed to featurewiz as categories
+        data, bytes_saved = apply_frame_policy(
+            download_dataset(dataset_key), category_max_ratio=1.0
+        )
+        logger.info(f"Bytes saved per column: {bytes_saved}")
 
         logger.info(f"\n\n {target_column} \n\n")
 
@@ -237,43 +213,43 @@ def process_feature_selection_from_queue(dataset_key: str, target_column: str):
         if target_column not in data.columns:
             raise ValueError(f"Target column '{target_column}' not found in dataset.")
 
+        # featurewiz is one library call, cancellation is checked around it
+        context.check_cancelled()
+
         # Run feature selection
         result = select_features(data, target_column)
+        context.check_cancelled()
 
         # select the features of the dataset
         transformed_data = data[result["selected_features"] + [target_column]]
 
-        # save the transformed data to the files directory
-        with open("files/transformed_data.csv", "w") as f:
-            transformed_data.to_csv(f, index=False)
-
-        # upload the dataset to S3
-        name = str(uuid.uuid4())
-        with open("files/transformed_data.csv", "rb") as f:
-            upload_result = s3_service.upload_single_file(
-                file_obj=f, filename=f"{name}.csv", content_type="text/csv", key=name
-            )
+        # serialize the transformed data as parquet, keyed in the job's namespace
+        artifacts = context.artifacts
+        write_parquet(
+            transformed_data,
+            artifacts.create(
+                "transformed_data", context.key(PARQUET_EXTENSION), PARQUET_CONTENT_TYPE
+            ).buffer,
+        )
 
         # generate summary
-        generate_summary(
+        summary = generate_summary(
             {
                 "selected_features": result["selected_features"],
                 "logs": result["logs"],
             }
         )
+        artifacts.create("summary", context.key("_summary"), "text/html").write_text(summary)
 
-        # Upload the summary data to S3
-        with open("files/summary.html", "rb") as f:
-            upload_summary_result = s3_service.upload_single_file(
-                file_obj=f,
-                filename=f"{name}_summary.html",
-                content_type="text/html",
-                key=f"{name}_summary",
-            )
+        # a job cancelled while the summary was generated uploads nothing
+        context.check_cancelled()
 
-        logger.info(f"Uploading transformed data with name: {name}")
-        result["transformed_data"] = upload_result["key"]
-        result["summary"] = upload_summary_result["key"]
+        # upload the dataset and the summary data to S3 together
+        logger.info(f"Uploading transformed data with name: {context.namespace}")
+        keys = artifacts.upload(s3_service)
+
+        result["transformed_data"] = keys["transformed_data"]
+        result["summary"] = keys["summary"]
 
         # Upload the results to S3 or return them as needed
         return result
@@ -282,11 +258,17 @@ def process_feature_selection_from_queue(dataset_key: str, target_column: str):
         raise e
 
 
-def process_feature_selection_from_api(dataset: pd.DataFrame, target_column: str):
+def process_feature_selection_from_api(
+    dataset: pd.DataFrame, target_column: str, context: JobContext
+):
     """
     Process feature selection from a dataset provided as a DataFrame.
     """
     try:
+        # text columns are handed to featurewiz as categories
+        dataset, bytes_saved = apply_frame_policy(dataset, category_max_ratio=1.0)
+        logger.info(f"Bytes saved per column: {bytes_saved}")
+
         # Ensure the target column exists
         if target_column not in dataset.columns:
             raise ValueError(f"Target column '{target_column}' not found in dataset.")
@@ -297,37 +279,30 @@ def process_feature_selection_from_api(dataset: pd.DataFrame, target_column: str
         # select the features of the dataset
         transformed_data = dataset[result["selected_features"] + [target_column]]
 
-        # save the transformed data to files director
-        with open("files/transformed_data.csv", "w") as f:
-            transformed_data.to_csv(f, index=False)
-
-        # upload the dataset to S3
-        name = str(uuid.uuid4())
-        with open("files/transformed_data.csv", "rb") as f:
-            upload_result = s3_service.upload_single_file(
-                file_obj=f, filename=f"{name}.csv", content_type="text/csv", key=name
-            )
+        # serialize the transformed data as parquet, keyed in the job's namespace
+        artifacts = context.artifacts
+        write_parquet(
+            transformed_data,
+            artifacts.create(
+                "transformed_data", context.key(PARQUET_EXTENSION), PARQUET_CONTENT_TYPE
+            ).buffer,
+        )
 
         # generate summary
-        generate_summary(
+        summary = generate_summary(
             {
                 "selected_features": result["selected_features"],
                 "logs": result["logs"],
             }
         )
+        artifacts.create("summary", context.key("_summary"), "text/html").write_text(summary)
 
-        # Upload the summary data to S3
-        with open("files/summary.html", "rb") as f:
-            upload_summary_result = s3_service.upload_single_file(
-                file_obj=f,
-                filename=f"{name}_summary.html",
-                content_type="text/html",
-                key=f"{name}_summary",
-            )
+        # upload the dataset and the summary data to S3 together
+        logger.info(f"Uploading transformed data with name: {context.namespace}")
+        keys = artifacts.upload(s3_service)
 
-        logger.info(f"Uploading transformed data with name: {name}")
-        result["transformed_data"] = upload_result["key"]
-        result["summary"] = upload_summary_result["key"]
+        result["transformed_data"] = keys["transformed_data"]
+        result["summary"] = keys["summary"]
 
         return result
     except Exception as e:
@@ -1,5 +1,7 @@
+import io
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Iterable, Optional, Union
 import uuid
 import logging
 import mimetypes
@@ -9,11 +11,31 @@ from dotenv import load_dotenv, find_dotenv
 load_dotenv(find_dotenv())
 
 import boto3
+import requests
+from boto3.exceptions import S3UploadFailedError
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
 
+from data_utils.ranged_download import (
+    DOWNLOAD_CONCURRENCY,
+    DOWNLOAD_PART_SIZE,
+    download,
+    get_http_session,
+)
+
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
+# Bodies of at least this size are uploaded in concurrent parts instead of one put_object call
+UPLOAD_MULTIPART_THRESHOLD = int(os.environ.get("UPLOAD_MULTIPART_THRESHOLD", str(64 * 1024 * 1024)))
+UPLOAD_PART_SIZE = int(os.environ.get("UPLOAD_PART_SIZE", str(16 * 1024 * 1024)))
+UPLOAD_CONCURRENCY = int(os.environ.get("UPLOAD_CONCURRENCY", "8"))
+# Checksum S3 verifies for every upload (and every part); empty to send none
+UPLOAD_CHECKSUM_ALGORITHM = os.environ.get("UPLOAD_CHECKSUM_ALGORITHM", "CRC32")
+# Number of artifacts upload_many sends at the same time
+UPLOAD_BATCH_CONCURRENCY = int(os.environ.get("UPLOAD_BATCH_CONCURRENCY", "4"))
+
 
 class S3Service:
     def __init__(self):
@@ -30,11 +52,20 @@ class S3Service:
             region_name=region,
             aws_access_key_id=access_key_id,
             aws_secret_access_key=secret_access_key,
+            # one pooled connection per concurrently uploaded part
+            config=Config(max_pool_connections=max(UPLOAD_CONCURRENCY, 10)),
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=UPLOAD_MULTIPART_THRESHOLD,
+            multipart_chunksize=UPLOAD_PART_SIZE,
+            max_concurrency=UPLOAD_CONCURRENCY,
         )
+        # pooled connections shared by the parallel part requests of downloads
+        self.http = get_http_session()
 
     def upload_single_file(
         self,
-        file_obj,
+        file_obj: Union[IO[bytes], bytes],
         filename: str,
         content_type: str,
         *,
@@ -45,24 +76,76 @@ class S3Service:
             key = str(uuid.uuid4())
         acl = "public-read" if is_public else "private"
 
+        if isinstance(file_obj, (bytes, bytearray)):
+            file_obj = io.BytesIO(file_obj)
+        extra_args = {
+            "ContentType": content_type,
+            "ACL": acl,
+            "Metadata": {"originalName": filename},
+        }
+        if UPLOAD_CHECKSUM_ALGORITHM:
+            extra_args["ChecksumAlgorithm"] = UPLOAD_CHECKSUM_ALGORITHM
+
         try:
-            self.s3.put_object(
-                Bucket=self.bucket_name,
-                Key=key,
-                Body=file_obj,
-                ContentType=content_type,
-                ACL=acl,
-                Metadata={"originalName": filename},
-            )
+            size = self._remaining_size(file_obj)
+            if size is not None and size < UPLOAD_MULTIPART_THRESHOLD:
+                # small bodies keep the single request fast path
+                self.s3.put_object(Bucket=self.bucket_name, Key=key, Body=file_obj, **extra_args)
+            else:
+                self.s3.upload_fileobj(
+                    file_obj,
+                    self.bucket_name,
+                    key,
+                    ExtraArgs=extra_args,
+                    Config=self.transfer_config,
+                )
 
             url = self._public_object_url(key) if is_public else self._presigned_url(key)
 
             return {"url": url, "key": key, "is_public": is_public}
 
-        except (BotoCoreError, ClientError) as exc:
+        except (BotoCoreError, ClientError, S3UploadFailedError) as exc:
             logger.error("S3 upload failed: %s", exc)
             raise exc
 
+    def upload_many(
+        self,
+        entries: Iterable[tuple[Union[IO[bytes], bytes], str, str]],
+        *,
+        is_public: bool = True,
+        max_workers: int = UPLOAD_BATCH_CONCURRENCY,
+    ) -> list[dict]:
+        """
+        Uploads several artifacts concurrently, so a stage waits for the slowest one only.
+
+        Args:
+            entries: (file_obj, key, content_type) of every artifact; the key doubles as the
+                original file name.
+            is_public (bool): Whether the objects are publicly readable.
+            max_workers (int): Maximum number of artifacts uploaded at the same time.
+
+        Returns:
+            list[dict]: The result of upload_single_file for every entry, in the given order.
+        """
+        entries = list(entries)
+        if not entries:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(entries)))) as pool:
+            futures = [
+                pool.submit(
+                    self.upload_single_file,
+                    file_obj=file_obj,
+                    filename=os.path.basename(key),
+                    content_type=content_type,
+                    is_public=is_public,
+                    key=key,
+                )
+                for file_obj, key, content_type in entries
+            ]
+            # the pool waits for every upload, the first failure is raised afterwards
+            return [future.result() for future in futures]
+
     def upload_single_file_from_path(
         self, path: str, is_public: bool = True, key: Optional[str] = None
     ):
@@ -82,6 +165,41 @@ class S3Service:
                 key=key,
             )
 
+    def download(
+        self,
+        key: str,
+        *,
+        is_public: bool = True,
+        part_size: int = DOWNLOAD_PART_SIZE,
+        concurrency: int = DOWNLOAD_CONCURRENCY,
+    ) -> IO[bytes]:
+        """
+        Downloads an object with parallel HTTP range requests over pooled connections.
+
+        Each part is retried on its own; the parts are reassembled in a pre-sized buffer, or a
+        memory-mapped temporary file for large objects.
+        """
+        url = self._public_object_url(key) if is_public else self._presigned_url(key)
+
+        try:
+            return download(url, self.http, part_size=part_size, concurrency=concurrency)
+        except (requests.RequestException, OSError, ValueError) as exc:
+            logger.error("S3 download failed: %s", exc)
+            raise exc
+
+    @staticmethod
+    def _remaining_size(file_obj: IO[bytes]) -> Optional[int]:
+        """
+        Returns the number of bytes left in a seekable body, or None when it cannot be told.
+        """
+        try:
+            position = file_obj.tell()
+            end = file_obj.seek(0, io.SEEK_END)
+            file_obj.seek(position)
+            return end - position
+        except (AttributeError, OSError, ValueError):
+            return None
+
     def _public_object_url(self, key: str) -> str:
         return f"https://{self.bucket_name}.s3.amazonaws.com/{quote(key)}"
 
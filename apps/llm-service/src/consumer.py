@@ -1,9 +1,13 @@
-import json
-import pika
 import threading
 import os
 import logging
+from data_utils.cancellation import CancellationToken, JobCancelled, cancellable
+from data_utils.codec import MessageDecodeError, decode_message
+from data_utils.job_context import JobContext
+from data_utils.job_store import JobStore, content_digest, job_fingerprint
 from data_utils.schemas import TaskDefinition
+from data_utils.scheduler import JobEstimate, share_of
+from data_utils.worker_pool import WorkerPoolConsumer
 from services.report_service import generate_report_from_queue
 from producer import send_message
 
@@ -18,26 +22,56 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+job_store = JobStore()
+
+STAGE = "report_generation"
+
+
+def generate_report(task_info: TaskDefinition, cancellation: CancellationToken) -> dict:
+    # the job keeps its reports and scratch files to itself, so concurrent jobs never collide
+    with JobContext(task_info.dataset_id, STAGE, cancellation=cancellation) as context:
+        return generate_report_from_queue(
+            profiling_context=task_info.profiling_context,
+            feature_engineering_context=task_info.feature_engineering_context,
+            feature_selection_context=task_info.feature_selection_context,
+            model_training_context=task_info.model_training_context,
+            context=context,
+        )
+
 
 def process_message(ch, method, properties, body):
-    logger.info(f"Received message: {body.decode()}")
+    logger.info(f"Received message: {len(body)} bytes ({properties.content_type or 'untyped'})")
     dataset_id = ""
     try:
-        message_data = json.loads(body.decode())
+        message_data = decode_message(body, properties)
         task_info = TaskDefinition.from_dict(message_data)
         dataset_id = task_info.dataset_id
         logger.info(f"Task Definition: {task_info}")
-        data_keys = generate_report_from_queue(
-            profiling_context=task_info.profiling_context,
-            feature_engineering_context=task_info.feature_engineering_context,
-            feature_selection_context=task_info.feature_selection_context,
-            model_training_context=task_info.model_training_context,
+        # the contexts are the whole input, the same ones republish the stored report
+        fingerprint = job_fingerprint(
+            QUEUE_NAME,
+            {"dataset_id": task_info.dataset_id},
+            [
+                content_digest(
+                    task_info.profiling_context,
+                    task_info.feature_engineering_context,
+                    task_info.feature_selection_context,
+                    task_info.model_training_context,
+                )
+            ],
         )
+        # a cancellation request for the dataset stops the job before the reports are uploaded
+        with cancellable(task_info.dataset_id, STAGE) as cancellation:
+            data_keys = job_store.run(fingerprint, lambda: generate_report(task_info, cancellation))
 
         send_message(message={"dataset_id": task_info.dataset_id, "error": "", **data_keys})
         ch.basic_ack(delivery_tag=method.delivery_tag)
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding JSON: {e}")
+    except JobCancelled as e:
+        # cancelled on request, nobody waits for the result any more
+        logger.info(f"Stopped job: {e}")
+        ch.basic_ack(delivery_tag=method.delivery_tag)
+    except MessageDecodeError as e:
+        logger.error(f"Error decoding message: {e}")
         send_message(
             message={"dataset_id": dataset_id, "error": str(e), "html_key": "", "pdf_key": ""}
         )
@@ -50,16 +84,22 @@ def process_message(ch, method, properties, body):
         ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
 
 
+CONTEXT_FIELDS = (
+    "profiling_context",
+    "feature_engineering_context",
+    "feature_selection_context",
+    "model_training_context",
+)
+
+
+def estimate_report(message: dict) -> JobEstimate:
+    # the prompt grows with the contexts, and so does the generation time
+    cost = sum(len(message.get(field) or "") for field in CONTEXT_FIELDS)
+    return JobEstimate(cost=cost, share=share_of(message))
+
+
 def consume():
-    connection = pika.BlockingConnection(
-        pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672, heartbeat=10000)
-    )
-    channel = connection.channel()
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
-    channel.basic_qos(prefetch_count=1)
-    channel.basic_consume(queue=QUEUE_NAME, on_message_callback=process_message)
-    logger.info(" [*] Waiting for messages. To exit press CTRL+C")
-    channel.start_consuming()
+    WorkerPoolConsumer(QUEUE_NAME, process_message, RABBITMQ_HOST, estimator=estimate_report).run()
 
 
 def start_consumer():
@@ -0,0 +1,103 @@
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, Optional
+
+from data_utils.artifacts import ArtifactWriter
+from data_utils.cancellation import CancellationToken
+from data_utils.progress import ProgressReporter
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Directory the per-job scratch directories are created in
+JOB_SCRATCH_ROOT = os.environ.get("JOB_SCRATCH_ROOT") or tempfile.gettempdir()
+
+
+class JobContext:
+    """
+    Everything one job owns, so several jobs can run in the same process.
+
+    Each job gets its own scratch directory, where its artifacts spill when they outgrow
+    memory and where it puts any file a library insists on writing, and its own artifact
+    namespace, a UUID prefixing the object keys of everything it stores. The directory is
+    removed with the artifacts when the context closes. The context also carries the job's
+    progress reporter and cancellation token, both optional.
+
+    Example:
+        with JobContext(dataset_id, "feature_selection") as context:
+            context.artifacts.create("summary", context.key("_summary"), "text/html")
+            keys = context.artifacts.upload(s3_service)
+
+    Args:
+        job_id (Any): Identifies the job, i.e. its dataset_id.
+        stage (str): Name of the job, e.g. "classical_training".
+        reporter (ProgressReporter, optional): Publishes progress and partial results.
+        cancellation (CancellationToken, optional): Tells the job to stop.
+        root (str): Directory the scratch directory is created in.
+    """
+
+    def __init__(
+        self,
+        job_id: Any,
+        stage: str,
+        *,
+        reporter: Optional[ProgressReporter] = None,
+        cancellation: Optional[CancellationToken] = None,
+        root: str = JOB_SCRATCH_ROOT,
+    ):
+        self.job_id = str(job_id)
+        self.stage = stage
+        self.reporter = reporter
+        self.cancellation = cancellation
+        self.namespace = str(uuid.uuid4())
+        os.makedirs(root, exist_ok=True)
+        self.scratch = tempfile.mkdtemp(prefix=f"{stage}-", dir=root)
+        self.artifacts = ArtifactWriter(directory=self.scratch)
+
+    def key(self, suffix: str) -> str:
+        """
+        Returns an object key in the job's namespace, e.g. key(".pkl") for a model.
+        """
+        return f"{self.namespace}{suffix}"
+
+    def path(self, name: str) -> str:
+        """
+        Returns the path of a file in the job's scratch directory.
+        """
+        return os.path.join(self.scratch, name)
+
+    def progress(self, step: str, done: Optional[int] = None, total: Optional[int] = None) -> None:
+        if self.reporter is not None:
+            self.reporter.progress(step, done, total)
+
+    def partial(
+        self, name: str, result: Any, done: Optional[int] = None, total: Optional[int] = None
+    ) -> None:
+        if self.reporter is not None:
+            self.reporter.partial(name, result, done, total)
+
+    def check_cancelled(self) -> None:
+        """
+        Raises:
+            JobCancelled: If the job was cancelled.
+        """
+        if self.cancellation is not None:
+            self.cancellation.raise_if_cancelled()
+
+    def close(self) -> None:
+        self.artifacts.close()
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+    def __enter__(self) -> "JobContext":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,353 @@
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, NamedTuple, Optional
+
+import pika
+from pika.exceptions import AMQPConnectionError, AMQPError
+
+from data_utils.admission import (
+    ADMISSION_LARGE_JOB_SUFFIX,
+    ADMISSION_RETRY_DELAY,
+    ADMIT,
+    DEFER,
+    AdmissionController,
+)
+from data_utils.codec import decode_message
+from data_utils.scheduler import CONSUMER_SCHEDULING_WINDOW, FairShareQueue, JobEstimate
+
+# Logger Config
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger()
+logger.setLevel(logging.DEBUG)
+
+# Jobs a node works on at the same time; also the prefetch of a consumer that does not schedule
+CONSUMER_WORKERS = int(os.environ.get("CONSUMER_WORKERS", "1"))
+# "thread" or "process"; processes isolate jobs that touch process-wide state
+CONSUMER_POOL = os.environ.get("CONSUMER_POOL", "thread")
+RABBITMQ_HEARTBEAT = int(os.environ.get("RABBITMQ_HEARTBEAT", "60"))
+CONSUMER_RECONNECT_DELAY = float(os.environ.get("CONSUMER_RECONNECT_DELAY", "5"))
+
+# (channel, method, properties, body), the signature of a pika on_message_callback
+MessageCallback = Callable[..., None]
+# Estimates a job from its decoded request
+Estimator = Callable[[dict], JobEstimate]
+
+
+def cores_per_worker(workers: int = CONSUMER_WORKERS) -> int:
+    """
+    Cores each job of a full pool may keep busy, the node's cores shared between its workers.
+    Jobs that parallelize internally size their parallelism, and their CPU estimate, by it.
+    """
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+class _Delivery(NamedTuple):
+    connection: pika.BlockingConnection
+    channel: object
+    method: object
+    properties: pika.BasicProperties
+    body: bytes
+
+
+class _Settlement:
+    """
+    Stands in for the channel inside a worker and records how the message was settled.
+
+    Workers never touch the real channel, which belongs to the connection thread; the
+    recorded decision is applied there once the worker is done.
+    """
+
+    def __init__(self):
+        self.outcome: Optional[tuple[str, bool]] = None
+
+    def basic_ack(self, delivery_tag: int = 0, multiple: bool = False) -> None:
+        self.outcome = ("ack", False)
+
+    def basic_nack(
+        self, delivery_tag: int = 0, multiple: bool = False, requeue: bool = True
+    ) -> None:
+        self.outcome = ("nack", requeue)
+
+    def basic_reject(self, delivery_tag: int = 0, requeue: bool = True) -> None:
+        self.outcome = ("nack", requeue)
+
+
+def _run_job(callback: MessageCallback, method, properties, body: bytes) -> tuple[str, bool]:
+    """
+    Runs a message callback in a worker and returns its (outcome, requeue) decision.
+    """
+    settlement = _Settlement()
+    callback(settlement, method, properties, body)
+    if settlement.outcome is None:
+        logger.warning(f"Message {method.delivery_tag} was not settled, rejecting it")
+        return ("nack", False)
+    return settlement.outcome
+
+
+class WorkerPoolConsumer:
+    """
+    Consumes a queue with a pool of workers while the connection thread stays responsive.
+
+    The pika callback only hands each delivery to the pool, so the connection keeps serving
+    heartbeats during long jobs. Workers settle messages through the channel argument of
+    the callback as before; the ack or nack is applied on the connection thread through
+    add_callback_threadsafe.
+
+    Without an estimator the prefetch equals the pool size and messages run in arrival order.
+    With one, the consumer prefetches a window of messages, estimates each on a scheduler
+    thread and starts them in FairShareQueue order whenever a worker is free.
+
+    Scheduled jobs also pass admission control. A job the node has no memory or CPU headroom
+    for is requeued after ADMISSION_RETRY_DELAY, so this or another replica runs it once
+    headroom is back, while smaller jobs behind it go ahead. A job larger than the node is
+    moved to the large-job queue when ADMISSION_LARGE_JOB_SUFFIX is set.
+
+    Args:
+        queue (str): Name of the durable queue to consume.
+        callback (MessageCallback): The node's on_message_callback. It must be a module-level
+            function when a process pool is used.
+        host (str): Host of the RabbitMQ broker.
+        workers (int): Number of messages processed at the same time.
+        pool (str): "thread" or "process".
+        port (int): Port of the RabbitMQ broker.
+        estimator (Estimator, optional): Estimates the cost and fair-share group of a request.
+        window (int): Messages held for scheduling; at most the pool size disables it.
+    """
+
+    def __init__(
+        self,
+        queue: str,
+        callback: MessageCallback,
+        host: str,
+        workers: int = CONSUMER_WORKERS,
+        pool: str = CONSUMER_POOL,
+        port: int = 5672,
+        estimator: Optional[Estimator] = None,
+        window: int = CONSUMER_SCHEDULING_WINDOW,
+    ):
+        if pool not in ("thread", "process"):
+            raise ValueError(f"Unknown consumer pool: {pool}")
+        self.queue = queue
+        self.callback = callback
+        self.workers = max(1, workers)
+        self.pool = pool
+        self.parameters = pika.ConnectionParameters(
+            host=host, port=port, heartbeat=RABBITMQ_HEARTBEAT
+        )
+        self.estimator = estimator
+        self.scheduled = estimator is not None and window > self.workers
+        self.prefetch = window if self.scheduled else self.workers
+
+        # scheduler state, guarded by the condition
+        self._condition = threading.Condition()
+        self._intake: deque[_Delivery] = deque()
+        self._ready = FairShareQueue()
+        self._running = 0
+        self.large_job_queue = (
+            f"{queue}{ADMISSION_LARGE_JOB_SUFFIX}" if ADMISSION_LARGE_JOB_SUFFIX else None
+        )
+        self._admission = AdmissionController(large_job_queue=self.large_job_queue)
+
+    def _executor(self) -> Executor:
+        if self.pool == "process":
+            # spawned workers do not inherit the connection or locks held by other threads
+            return ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="consumer-worker")
+
+    def run(self) -> None:
+        """
+        Consumes the queue forever, reconnecting when the connection is lost.
+        """
+        with self._executor() as executor:
+            if self.scheduled:
+                threading.Thread(
+                    target=self._schedule, args=(executor,), name="consumer-scheduler", daemon=True
+                ).start()
+            while True:
+                try:
+                    self._consume(executor)
+                except AMQPConnectionError as e:
+                    logger.warning(
+                        f"Consumer connection to {self.queue} lost, reconnecting "
+                        f"in {CONSUMER_RECONNECT_DELAY}s: {e}"
+                    )
+                    time.sleep(CONSUMER_RECONNECT_DELAY)
+
+    def _consume(self, executor: Executor) -> None:
+        connection = pika.BlockingConnection(self.parameters)
+        channel = connection.channel()
+        channel.queue_declare(queue=self.queue, durable=True)
+        channel.basic_qos(prefetch_count=self.prefetch)
+        channel.basic_consume(
+            queue=self.queue,
+            on_message_callback=functools.partial(self._dispatch, executor, connection),
+        )
+        logger.info(
+            f" [*] Waiting for messages on {self.queue} with {self.workers} {self.pool} workers"
+            + (f", scheduling {self.prefetch} at a time" if self.scheduled else "")
+        )
+        channel.start_consuming()
+
+    def _dispatch(self, executor: Executor, connection, channel, method, properties, body) -> None:
+        delivery = _Delivery(connection, channel, method, properties, body)
+        if not self.scheduled:
+            self._submit(executor, delivery)
+            return
+        with self._condition:
+            self._intake.append(delivery)
+            self._condition.notify()
+
+    def _submit(
+        self, executor: Executor, delivery: _Delivery, estimate: Optional[JobEstimate] = None
+    ) -> None:
+        future = executor.submit(
+            _run_job, self.callback, delivery.method, delivery.properties, delivery.body
+        )
+        future.add_done_callback(
+            functools.partial(
+                self._on_job_done,
+                delivery.connection,
+                delivery.channel,
+                delivery.method.delivery_tag,
+                estimate,
+            )
+        )
+
+    def _schedule(self, executor: Executor) -> None:
+        """
+        Estimates incoming deliveries and starts the next ones whenever workers are free.
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._intake or (self._running < self.workers and len(self._ready))
+                )
+                intake = list(self._intake)
+                self._intake.clear()
+
+            # estimating may call storage, so it runs outside the lock
+            estimates = [self._estimate(delivery) for delivery in intake]
+
+            with self._condition:
+                for delivery, estimate in zip(intake, estimates):
+                    self._ready.push((delivery, estimate), estimate)
+                batch, turned_away = [], []
+                while self._running < self.workers and len(self._ready):
+                    delivery, estimate = self._ready.pop()
+                    if not delivery.channel.is_open:
+                        # the broker redelivers what was held on a lost connection
+                        continue
+                    decision = self._admission.decide(estimate)
+                    if decision != ADMIT:
+                        turned_away.append((delivery, estimate, decision))
+                        continue
+                    self._admission.admit(estimate)
+                    self._running += 1
+                    batch.append((delivery, estimate))
+
+            for delivery, estimate, decision in turned_away:
+                self._turn_away(delivery, estimate, decision)
+            for delivery, estimate in batch:
+                try:
+                    self._submit(executor, delivery, estimate)
+                except RuntimeError as e:
+                    logger.error(f"Could not start message {delivery.method.delivery_tag}: {e}")
+                    self._release_worker(estimate)
+
+    def _estimate(self, delivery: _Delivery) -> JobEstimate:
+        try:
+            message = decode_message(delivery.body, delivery.properties)
+            if isinstance(message, dict):
+                return self.estimator(message)  # pyright: ignore
+        except Exception as e:
+            # unreadable requests are cheap to fail, the callback rejects them
+            logger.warning(f"Could not estimate message {delivery.method.delivery_tag}: {e}")
+        return JobEstimate()
+
+    def _turn_away(self, delivery: _Delivery, estimate: JobEstimate, decision: str) -> None:
+        tag = delivery.method.delivery_tag
+        need = f"{estimate.memory / 2**20:.0f} MiB, {estimate.cpus:g} cores"
+        if decision == DEFER:
+            logger.info(f"No headroom for message {tag} ({need}), requeueing it later")
+            callback = functools.partial(
+                delivery.connection.call_later,
+                ADMISSION_RETRY_DELAY,
+                functools.partial(self._requeue, delivery.channel, tag),
+            )
+        else:
+            logger.info(f"Message {tag} ({need}) exceeds the node, moving it to large jobs")
+            callback = functools.partial(self._forward, delivery)
+        try:
+            delivery.connection.add_callback_threadsafe(callback)
+        except AMQPError as e:
+            logger.warning(f"Connection closed before message {tag} was turned away: {e}")
+
+    @staticmethod
+    def _requeue(channel, delivery_tag: int) -> None:
+        if channel.is_open:
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=True)
+
+    def _forward(self, delivery: _Delivery) -> None:
+        channel = delivery.channel
+        if not channel.is_open:
+            return
+        channel.queue_declare(queue=self.large_job_queue, durable=True)
+        channel.basic_publish(
+            exchange="",
+            routing_key=self.large_job_queue,
+            body=delivery.body,
+            properties=delivery.properties,
+        )
+        channel.basic_ack(delivery_tag=delivery.method.delivery_tag)
+
+    def _release_worker(self, estimate: Optional[JobEstimate]) -> None:
+        with self._condition:
+            self._running -= 1
+            if estimate is not None:
+                self._admission.release(estimate)
+            self._condition.notify()
+
+    def _on_job_done(
+        self,
+        connection,
+        channel,
+        delivery_tag: int,
+        estimate: Optional[JobEstimate],
+        future: Future,
+    ) -> None:
+        # runs on the worker side, the channel may only be used from the connection thread
+        if self.scheduled:
+            self._release_worker(estimate)
+        try:
+            connection.add_callback_threadsafe(
+                functools.partial(self._settle, channel, delivery_tag, future)
+            )
+        except AMQPError as e:
+            logger.warning(f"Connection closed before message {delivery_tag} was settled: {e}")
+
+    @staticmethod
+    def _settle(channel, delivery_tag: int, future: Future) -> None:
+        try:
+            outcome, requeue = future.result()
+        except Exception as e:
+            logger.error(f"Error processing message {delivery_tag}: {e}")
+            outcome, requeue = "nack", False
+
+        if not channel.is_open:
+            logger.warning(f"Channel closed, message {delivery_tag} will be redelivered")
+            return
+        if outcome == "ack":
+            channel.basic_ack(delivery_tag=delivery_tag)
+        else:
+            channel.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
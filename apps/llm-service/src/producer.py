@@ -1,7 +1,9 @@
 import logging
 import pika
 import os
-import json
+
+from data_utils.codec import encode_message
+from data_utils.publisher import Publisher
 
 
 # RabbitMQ Configuration
@@ -16,32 +18,19 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger.setLevel(logging.DEBUG)
 
+# One connection and channel per process, shared by every result this node sends
+publisher = Publisher(pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672))
+
 
 def send_message(message: dict | None):
-    """Sends a message to the RabbitMQ queue"""
-    connection = pika.BlockingConnection(pika.ConnectionParameters(host=RABBITMQ_HOST, port=5672))
-    channel = connection.channel()
-
-    # Declare queue (must match the consumer queue)
-    channel.queue_declare(queue=QUEUE_NAME, durable=True)
-
-    # Convert message to JSON string
-    message_json = json.dumps(message)
-
-    # Publish message
-    channel.basic_publish(
-        exchange="",
-        routing_key=QUEUE_NAME,
-        body=message_json,
-        properties=pika.BasicProperties(
-            delivery_mode=2  # Make message persistent
-        ),
-    )
-
-    logger.info(f" [x] Sent: {message_json}")
-
-    # Close connection
-    connection.close()
+    """Sends a message to the RabbitMQ queue and waits until the broker confirms it"""
+    # Encode the message, the properties name the codec for the consumer
+    body, properties = encode_message(message)
+
+    # Publish a persistent message over the process-wide connection
+    publisher.publish(QUEUE_NAME, body, properties)
+
+    logger.info(f" [x] Sent {len(body)} bytes ({properties.content_type}): {message}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,13 @@
+from typing import IO
 from agents.agent import report_generator
-from markdown2 import markdown
 from xhtml2pdf import pisa
+from data_utils.job_context import JobContext
+from data_utils.claim_check import resolve_json
 from services.s3_service import S3Service
 
 s3_service = S3Service()
 
-def save_html(summary: str):
+def render_html(summary: str) -> str:
     summary = summary.replace("`", "").replace("html", "")
     resulting_page = f"""
       <!DOCTYPE html>
@@ -49,16 +51,15 @@ def save_html(summary: str):
 
     print("################## GENERATED SUMMARY ##################")
     print(summary)
-    with open("files/report.html", "w", encoding="utf-8") as file:
-          file.write(resulting_page)
     return resulting_page
 
 def generate_report(profiling_context, feature_engineering_context, feature_selection_context, model_training_context):
     """
     Generate a comprehensive report based on the provided contexts.
     """
+    # large profiling sections arrive as claim checks, fetch them only now that they are needed
     report = report_generator.invoke({
-        "profiling_context": profiling_context,
+        "profiling_context": resolve_json(profiling_context, s3_service),
         "feature_engineering_context": feature_engineering_context,
         "feature_selection_context": feature_selection_context,
         "model_training_context": model_training_context
@@ -68,29 +69,21 @@ def generate_report(profiling_context, feature_engineering_context, feature_sele
 
     return report
 
-def md_to_pdf(md_content):
+def html_to_pdf(html_page: str, pdf_file: IO[bytes]):
     """
-    Convert markdown content to PDF and save it to the specified output file.
+    Convert the rendered HTML report to PDF, writing it to the given binary buffer.
     Uses xhtml2pdf instead of WeasyPrint.
     """
-    output_file = "files/report.pdf" # Ensure 'files' directory exists
-
-    html_content = markdown(md_content)
-
-    # Open the output PDF file in binary write mode
-    with open("files/report.html", "rb") as html_file:
-        with open("files/report.pdf", "wb") as pdf_file:
-            # Create the PDF from the HTML content
-            # pisa.CreatePDF expects a file-like object or a BytesIO object for input HTML
-            pisa_status = pisa.CreatePDF(
-                src=html_file,  # HTML content as bytes
-                dest=pdf_file                             # Destination file handle
-            )
+    # pisa.CreatePDF takes the HTML as a string and writes to any file-like object
+    pisa_status = pisa.CreatePDF(
+        src=html_page,
+        dest=pdf_file
+    )
 
     if pisa_status.err:
         print(f"Error generating PDF: {pisa_status.err}")
     else:
-        print(f"PDF generated successfully to {output_file}")
+        print("PDF generated successfully")
 
 def generate_report_from_api(profiling_context, feature_engineering_context, feature_selection_context, model_training_context):
     md = generate_report(
@@ -99,14 +92,9 @@ def generate_report_from_api(profiling_context, feature_engineering_context, fea
         feature_selection_context=feature_selection_context,
         model_training_context=model_training_context
         )
-    html = save_html(summary=md)
-
-    md_to_pdf(md_content=md)
-    return html
-
-def generate_report_from_queue(profiling_context, feature_engineering_context, feature_selection_context, model_training_context):
-    import uuid
+    return render_html(summary=md)
 
+def generate_report_from_queue(profiling_context, feature_engineering_context, feature_selection_context, model_training_context, context: JobContext):
     try:
       md = generate_report(
           profiling_context=profiling_context,
@@ -114,31 +102,21 @@ def generate_report_from_queue(profiling_context, feature_engineering_context, f
           feature_selection_context=feature_selection_context,
           model_training_context=model_training_context
       )
-      save_html(summary=md)
-
-      md_to_pdf(md_content=md)
-
-      with open("files/report.html", "rb") as file:
-          html_key = str(uuid.uuid4()) + '.html'
-          s3_service.upload_single_file(
-              file_obj=file,
-              filename="report.html",
-              content_type="text/html",
-              key=html_key,
-          )
-
-      with open("files/report.pdf", "rb") as file:
-          pdf_key = str(uuid.uuid4()) + '.pdf'
-          s3_service.upload_single_file(
-              file_obj=file,
-              filename="report.pdf",
-              content_type="application/pdf",
-              key=pdf_key,
-          )
+      html = render_html(summary=md)
+      # the report is one LLM call, a job cancelled meanwhile uploads nothing
+      context.check_cancelled()
+
+      # both reports are keyed in the job's namespace, the pdf spills to its scratch directory
+      artifacts = context.artifacts
+      artifacts.create('html', context.key('.html'), 'text/html').write_text(html)
+      html_to_pdf(html, artifacts.create('pdf', context.key('.pdf'), 'application/pdf').buffer)
+
+      # upload the html and pdf reports together
+      keys = artifacts.upload(s3_service)
 
       return {
-          "html_key": html_key,
-          "pdf_key": pdf_key,
+          "html_key": keys['html'],
+          "pdf_key": keys['pdf'],
       }
     except Exception as e:
         raise e
\ No newline at end of file
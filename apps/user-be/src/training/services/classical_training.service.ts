@@ -65,11 +65,13 @@ export class ClassicalService{
         // dataset_key: the transformed dataset after feature engineering & selection
         // task_type: either regression or classification : convert to lowercase
         // target_column: the name of the target column
+        // feature_columns: the columns kept by feature selection, the only ones the node reads
         const classical_training_payload = {
             dataset_id: dataset.id,
             dataset_key: dataset.afterFeatureSelectionFile,
             task_type: dataset.project.taskType.toLowerCase(),
-            target_column: dataset.targetColumnName
+            target_column: dataset.targetColumnName,
+            feature_columns: dataset.selectedColumns
         }
 
         // Send a message to message queue to start training
@@ -1,7 +1,15 @@
-import boto3, logging, os, io
+import boto3, logging, os, io, tempfile
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from io import BufferedReader
 
+DOWNLOAD_PART_SIZE = int(os.environ.get('DOWNLOAD_PART_SIZE', str(16 * 1024 * 1024)))
+DOWNLOAD_CONCURRENCY = int(os.environ.get('DOWNLOAD_CONCURRENCY', '8'))
+DOWNLOAD_RETRIES = int(os.environ.get('DOWNLOAD_RETRIES', '3'))
+# Objects up to this size are reassembled in memory, larger ones in a temporary file
+DOWNLOAD_IN_MEMORY_MAX_SIZE = int(os.environ.get('DOWNLOAD_IN_MEMORY_MAX_SIZE', str(256 * 1024 * 1024)))
+
 class S3Handler:
     """
     A Python class for managing interactions with an S3-compatible storage system.
@@ -41,7 +49,9 @@ class S3Handler:
             service_name='s3',
             aws_access_key_id=self.access_key,
             aws_secret_access_key=self.secret_key,
-            endpoint_url=self.url
+            endpoint_url=self.url,
+            # keep a pooled connection for every part of a parallel download
+            config=Config(max_pool_connections=max(DOWNLOAD_CONCURRENCY, 10))
         )
         return client
 
@@ -158,20 +168,39 @@ class S3Handler:
             logging.error(e)
             return False, None
 
-    def download_object(self, bucket_name: str, object_name: str):
+    def download_object(self, bucket_name: str, object_name: str, part_size: int = DOWNLOAD_PART_SIZE,
+                        concurrency: int = DOWNLOAD_CONCURRENCY, retries: int = DOWNLOAD_RETRIES):
         """
-        Downloads an object as a binary buffer.
+        Downloads an object as a binary buffer using parallel ranged requests.
+
+        The object is fetched in parts of part_size bytes, up to concurrency at a time, and each
+        part is retried on its own. Objects up to DOWNLOAD_IN_MEMORY_MAX_SIZE are reassembled in
+        a pre-sized in-memory buffer, larger ones in a temporary file.
 
         Args:
             bucket_name (str): The name of the bucket.
             object_name (str): The key of the object to download.
+            part_size (int, optional): Size of each ranged request in bytes.
+            concurrency (int, optional): Number of parts downloaded at the same time.
+            retries (int, optional): Attempts per part before the download fails.
 
         Returns:
-            tuple: (bool, BytesIO or None) Success status and binary buffer of the object.
+            tuple: (bool, BytesIO or file or None) Success status and binary buffer of the object.
         """
+        config = TransferConfig(
+            multipart_threshold=part_size,
+            multipart_chunksize=part_size,
+            max_concurrency=concurrency,
+            num_download_attempts=retries,
+        )
         try:
-            buffer = io.BytesIO()
-            self.client.download_fileobj(bucket_name, object_name, buffer)
+            size = self.client.head_object(Bucket=bucket_name, Key=object_name)['ContentLength']
+            if size <= DOWNLOAD_IN_MEMORY_MAX_SIZE:
+                buffer = io.BytesIO(bytes(size))
+            else:
+                buffer = tempfile.TemporaryFile()
+                buffer.truncate(size)
+            self.client.download_fileobj(bucket_name, object_name, buffer, Config=config)
             buffer.seek(0)
             return True, buffer
         except Exception as e: